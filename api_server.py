@@ -0,0 +1,411 @@
+"""只读分析接口服务：启动时从本地开奖数据库加载一次，在内存中维护前缀和，以 HTTP/JSON 回答查询
+
+- 每期的号码计数、按开奖日的销售额与回归所需的 Σy、Σi·y 都累加为前缀和，
+  任意“最近 N 期”的频率、开奖日销售额与销售额预测都是两行前缀和相减，与历史期数无关；
+- 后台线程每隔 refresh 秒检查数据库（只读打开），有新开奖时只把新增的几期追加到前缀和末尾，不重算历史；
+- 响应体按请求缓存为字节串并带 ETag（内容哈希），新开奖时清空缓存；If-None-Match 命中返回 304。
+
+接口（GET，<game> 为 dlt / ssq / pl3 / pl5 / qxc，last 默认 100）:
+    /api/games                              已加载的彩种、期数与最新期号
+    /api/<game>/frequency?last=N            最近 N 期各号码区每个号码的出现次数
+    /api/<game>/sales-by-weekday?last=N     最近 N 期各开奖日的平均销售额
+    /api/<game>/forecast?last=N             基于最近 N 期（截至 2025-07-01）线性回归预测下一期销售额
+    /metrics                                Prometheus 文本格式指标
+
+用法:
+    python api_server.py --port 8000
+    python api_server.py --game all --refresh 10
+    curl http://127.0.0.1:8000/api/dlt/frequency?last=30
+压测见 bench_api.py。
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+from draw_store import load_draws_after
+from draw_matrix import DrawArrays
+from games import GAMES, SALES_CUTOFF_DATE, get_game, select_games
+from metrics import REGISTRY, configure as configure_metrics, log_event
+
+# 默认统计最近多少期（与 main.py analyze 默认读取的期数一致）
+DEFAULT_LAST = 100
+
+# 新开奖检查间隔（秒）
+DEFAULT_REFRESH = 30
+
+# 响应缓存最多保存的条目数（超过后整体清空）
+MAX_CACHE_ENTRIES = 4096
+
+# 路由名 -> AnalysisState 的查询方法
+ROUTES = {
+    "frequency": "frequency",
+    "sales-by-weekday": "sales_by_weekday",
+    "forecast": "forecast",
+}
+
+
+def connect_readonly(path):
+    """以只读方式打开本地开奖数据库"""
+    return sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True, check_same_thread=False)
+
+
+def parse_last(query):
+    """解析查询参数 last（正整数，默认 DEFAULT_LAST）"""
+    values = parse_qs(query).get("last")
+    if not values:
+        return DEFAULT_LAST
+    try:
+        last = int(values[0])
+    except ValueError:
+        last = 0
+    if last < 1:
+        raise ValueError(f"last 必须为正整数: {values[0]!r}")
+    return last
+
+
+def make_etag(body):
+    """响应体内容哈希作为 ETag（内容不变时新开奖后仍可返回 304）"""
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+class GrowingArray:
+    """按行追加的数组：容量不足时倍增，追加 k 行的摊还开销为 O(k)"""
+
+    def __init__(self, width=None, dtype=np.float64, capacity=1024):
+        shape = (capacity,) if width is None else (capacity, width)
+        self.data = np.zeros(shape, dtype=dtype)
+        self.size = 0
+
+    def extend(self, rows):
+        """在末尾追加若干行"""
+        end = self.size + len(rows)
+        if end > len(self.data):
+            grown = np.zeros((max(end, 2 * len(self.data)),) + self.data.shape[1:], dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:end] = rows
+        self.size = end
+
+    def view(self):
+        """已填充的部分"""
+        return self.data[:self.size]
+
+
+class PrefixSums(GrowingArray):
+    """前缀和：第 i 行为前 i 行数据之和（第 0 行为 0），window(a, b) 即第 a..b-1 行之和"""
+
+    def __init__(self, width, dtype=np.float64):
+        super().__init__(width, dtype)
+        self.extend(np.zeros((1, width), dtype=dtype))
+
+    def add(self, rows):
+        """追加若干行数据（只计算新增部分的累加）"""
+        if len(rows):
+            self.extend(self.data[self.size - 1] + np.cumsum(rows, axis=0, dtype=self.data.dtype))
+
+    def window(self, start, end):
+        return self.data[end] - self.data[start]
+
+
+class AnalysisState:
+    """某彩种的常驻分析状态：按期号升序追加的开奖日期与各项前缀和"""
+
+    def __init__(self, game, db_path):
+        self.game = get_game(game)
+        self.db_path = db_path
+        self.version = 0
+        self.issues = GrowingArray(dtype=np.int64)
+        self.dates = GrowingArray(dtype='datetime64[D]')
+        self.zone_counts = {zone.key: PrefixSums(zone.size, np.int32) for zone in self.game.zones}
+        self.day_sales = PrefixSums(7)
+        self.day_draws = PrefixSums(7, np.int32)
+        # 线性回归所需的 Σy 与 Σi·y（i 为全局序号；缺失的销售额按 0 计）
+        self.regression = PrefixSums(2)
+
+    def __len__(self):
+        return self.issues.size
+
+    @property
+    def latest_issue(self):
+        """最新期号（与数据库中的文本格式一致），尚无数据时为 None"""
+        if not len(self):
+            return None
+        return f"{self.issues.data[len(self) - 1]:0{self.game.issue_digits}d}"
+
+    def fetch_new(self):
+        """从数据库读取比内存中最新期号更新的开奖数据，没有时返回 None"""
+        conn = connect_readonly(self.db_path)
+        try:
+            df = load_draws_after(conn, self.latest_issue)
+        finally:
+            conn.close()
+        return DrawArrays.from_dataframe(df, self.game) if len(df) else None
+
+    def apply(self, draws):
+        """追加新开奖（DrawArrays，期号须比已有的都新）：只累加新增各期，返回追加的期数"""
+        k = len(draws)
+        if not k:
+            return 0
+        rows = np.arange(k)
+        for zone, matrix in zip(self.game.zones, (draws.front, draws.back)):
+            counts = np.zeros((k, zone.size), dtype=np.int32)
+            np.add.at(counts, (rows[:, None], matrix.astype(np.intp) - zone.low), 1)
+            self.zone_counts[zone.key].add(counts)
+
+        weekday = draws.weekday()
+        valid = ~np.isnan(draws.sales)
+        sales = np.where(valid, draws.sales, 0.0)
+        day_sales = np.zeros((k, 7))
+        day_sales[rows, weekday] = sales
+        day_draws = np.zeros((k, 7), dtype=np.int32)
+        day_draws[rows, weekday] = valid
+        self.day_sales.add(day_sales)
+        self.day_draws.add(day_draws)
+        self.regression.add(np.column_stack([sales, (len(self) + rows) * sales]))
+
+        self.issues.extend(draws.issue)
+        self.dates.extend(draws.date)
+        self.version += 1
+        return k
+
+    def window(self, last):
+        """最近 last 期对应的 [起, 止) 序号"""
+        end = len(self)
+        return max(0, end - last), end
+
+    def header(self, last, start, end):
+        return {"game": self.game.key, "name": self.game.name, "latest_issue": self.latest_issue,
+                "last": last, "draws": end - start}
+
+    def frequency(self, last):
+        """最近 last 期各号码区每个号码的出现次数"""
+        start, end = self.window(last)
+        zones = [{
+            "key": zone.key,
+            "label": zone.label,
+            "numbers": zone.numbers(),
+            "counts": self.zone_counts[zone.key].window(start, end).tolist(),
+        } for zone in self.game.zones]
+        return {**self.header(last, start, end), "zones": zones}
+
+    def sales_by_weekday(self, last):
+        """最近 last 期各开奖日的平均销售额（与 main.py 的 sales_by_day.csv 一致）"""
+        start, end = self.window(last)
+        totals = self.day_sales.window(start, end)
+        draws = self.day_draws.window(start, end)
+        days = [{"day": name, "draws": int(draws[day]), "average_sales": totals[day] / draws[day]}
+                for day, name in self.game.weekday_names().items() if draws[day]]
+        return {**self.header(last, start, end), "weekdays": days}
+
+    def forecast(self, last):
+        """基于最近 last 期中截至 SALES_CUTOFF_DATE 的销售额做线性回归，预测下一期（与 main.py 任务1 一致）"""
+        start, end = self.window(last)
+        result = self.header(last, start, end)
+        if end == start:
+            return {**result, "history_draws": 0, "next_date": None, "next_sale": None}
+        # 开奖日期随期号递增，截止日期之前的各期是窗口的前缀；不足 10 期时使用全部数据
+        cutoff = int(np.searchsorted(self.dates.view(), np.datetime64(SALES_CUTOFF_DATE, 'D')))
+        stop = min(end, cutoff)
+        if stop - start < 10:
+            stop = end
+        # x = 0..m-1 的最小二乘闭式解：Σx、Σx² 由 m 直接算出，Σy、Σx·y 由前缀和相减得到
+        m = stop - start
+        sum_y, sum_iy = self.regression.window(start, stop)
+        sum_xy = sum_iy - start * sum_y
+        sum_x = m * (m - 1) / 2
+        sum_xx = (m - 1) * m * (2 * m - 1) / 6
+        denom = m * sum_xx - sum_x * sum_x
+        slope = (m * sum_xy - sum_x * sum_y) / denom if denom else 0.0
+        intercept = (sum_y - slope * sum_x) / m
+        next_date = self.dates.data[stop - 1] + np.timedelta64(self.game.draw_gap_days, 'D')
+        return {**result, "cutoff": SALES_CUTOFF_DATE, "history_draws": m, "next_date": str(next_date),
+                "next_sale": round(intercept + slope * m, 2), "slope": slope}
+
+    def summary(self):
+        return {"game": self.game.key, "name": self.game.name, "draws": len(self),
+                "latest_issue": self.latest_issue, "version": self.version}
+
+
+class AnalysisApi:
+    """路由与响应缓存：响应体按 (路径, 查询) 缓存为字节串，新开奖时清空（线程安全）"""
+
+    def __init__(self, states):
+        self.states = {state.game.key: state for state in states}
+        self.lock = threading.Lock()
+        self.cache = {}
+        self.stop = threading.Event()
+
+    def handle(self, path, query=""):
+        """返回 (路由名, 状态码, 响应体字节串, ETag)"""
+        parts = path.strip("/").split("/")
+        if parts == ["api", "games"]:
+            route, state, method = "games", None, None
+        elif len(parts) == 3 and parts[0] == "api" and parts[1] in self.states and parts[2] in ROUTES:
+            route, state, method = parts[2], self.states[parts[1]], ROUTES[parts[2]]
+        else:
+            return "unknown", 404, self.error_body(f"未知接口: {path}"), None
+
+        key = (path, query)
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is None:
+                if state is None:
+                    payload = {"games": [s.summary() for s in self.states.values()]}
+                else:
+                    try:
+                        last = parse_last(query)
+                    except ValueError as e:
+                        return route, 400, self.error_body(str(e)), None
+                    payload = getattr(state, method)(last)
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                if len(self.cache) >= MAX_CACHE_ENTRIES:
+                    self.cache.clear()
+                cached = self.cache[key] = (body, make_etag(body))
+        return (route, 200) + cached
+
+    def error_body(self, message):
+        return json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+
+    def warm(self):
+        """预先生成各彩种默认参数的响应"""
+        self.handle("/api/games")
+        for key in self.states:
+            for route in ROUTES:
+                self.handle(f"/api/{key}/{route}")
+
+    def refresh(self):
+        """检查各彩种的新开奖并增量追加，返回 {彩种: 新增期数}"""
+        added = {}
+        for key, state in self.states.items():
+            start = time.perf_counter()
+            # 读库在锁外进行，只有追加前缀和与清空缓存时阻塞请求
+            draws = state.fetch_new()
+            if draws is None:
+                continue
+            with self.lock:
+                added[key] = state.apply(draws)
+                self.cache.clear()
+            seconds = time.perf_counter() - start
+            REGISTRY.inc("api_draws_applied_total", added[key], game=key)
+            log_event("api_refreshed", game=key, added=added[key], latest_issue=state.latest_issue,
+                      seconds=round(seconds, 6))
+            print(f"[信息] {state.game.name}新增 {added[key]} 期（最新第 {state.latest_issue} 期），"
+                  f"增量更新耗时 {seconds * 1000:.2f}ms")
+        if added:
+            self.warm()
+        return added
+
+    def start_refresh(self, interval=DEFAULT_REFRESH):
+        """启动后台线程，每隔 interval 秒检查一次新开奖"""
+        def loop():
+            while not self.stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"[错误] 检查新开奖失败: {e}")
+
+        thread = threading.Thread(target=loop, name="api-refresh", daemon=True)
+        thread.start()
+        return thread
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """只读 JSON 接口；响应带 ETag 与 Server-Timing（服务端处理耗时）"""
+
+    protocol_version = "HTTP/1.1"
+    # 头部与响应体分两次写出，关闭 Nagle 算法以免 keep-alive 连接上出现延迟确认的等待
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        start = time.perf_counter()
+        parsed = urlparse(self.path)
+        content_type = "application/json; charset=utf-8"
+        if parsed.path == "/metrics":
+            route, status, body, etag = "metrics", 200, REGISTRY.to_prometheus().encode("utf-8"), None
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            route, status, body, etag = self.server.api.handle(parsed.path, parsed.query)
+        if etag and etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            status, body = 304, b""
+        seconds = time.perf_counter() - start
+
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.send_header("Server-Timing", f"app;dur={seconds * 1000:.3f}")
+        self.end_headers()
+        self.wfile.write(body)
+        REGISTRY.inc("api_requests_total", route=route, status=status)
+        REGISTRY.observe("api_request_seconds", seconds, route=route)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def load_states(games, db_path=None):
+    """从本地数据库加载各彩种的分析状态（数据库不存在的彩种跳过）"""
+    states = []
+    for game in games:
+        path = db_path or game.db_path
+        if not os.path.exists(path):
+            print(f"[警告] {game.name}数据库不存在，跳过: {path}")
+            continue
+        start = time.perf_counter()
+        state = AnalysisState(game, path)
+        draws = state.fetch_new()
+        if draws is not None:
+            state.apply(draws)
+        print(f"[信息] 已加载{game.name} {len(state)} 期（最新第 {state.latest_issue} 期），"
+              f"耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+        states.append(state)
+    return states
+
+
+def start_api_server(api, host="127.0.0.1", port=0):
+    """在后台线程启动接口服务，返回 (server, 根地址)"""
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.api = api
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="只读分析接口服务")
+    parser.add_argument("--game", choices=list(GAMES) + ["all"], default="dlt", help="加载的彩种（all 为全部）")
+    parser.add_argument("--db", default=None, help="本地开奖数据库路径（默认 <彩种>_draws.db，仅限单个彩种）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--refresh", type=float, default=DEFAULT_REFRESH, help="新开奖检查间隔（秒），0 表示不检查")
+    parser.add_argument("--metrics-log", default=None, help="结构化 JSON 日志文件")
+    args = parser.parse_args()
+    if args.game == "all" and args.db:
+        parser.error("--game all 时不能指定 --db")
+
+    configure_metrics(args.metrics_log)
+    api = AnalysisApi(load_states(select_games(args.game), args.db))
+    if not api.states:
+        parser.exit(1, "[错误] 没有可加载的开奖数据库，请先运行 main.py crawl\n")
+    api.warm()
+    if args.refresh > 0:
+        api.start_refresh(args.refresh)
+
+    server = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    server.api = api
+    print(f"[启动] 分析接口服务已启动: http://{args.host}:{args.port}/api/games")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[停止] 分析接口服务已停止")
+        api.stop.set()
+        server.shutdown()
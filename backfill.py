@@ -0,0 +1,178 @@
+"""全量历史回填：按期号区间分页抓取大乐透开奖数据，逐页写入本地数据库并记录断点
+
+用法:
+    python backfill.py                         # 从 07001 期回填到当前最新一期
+    python backfill.py --workers 4 --rate 5    # 并发抓取，每秒最多 5 次请求
+中断后重新运行同一命令即可从断点继续；断点记录的起始期号、每页条数或数据库与本次参数不一致时拒绝运行，
+加 --reset 丢弃旧断点重新开始。
+
+同时在途的页面最多为线程数的两倍，每页逐行校验后分批写入（不合格的行进入隔离表），
+内存占用与回填的总期数无关。
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from http_crawler import create_session, fetch_page, build_params, raw_record, PAGE_SIZE
+from draw_store import open_store, count_draws, DEFAULT_DB_PATH
+from draw_stream import BatchWriter, validate_rows
+from rate_limit import HostRateLimiter
+
+# 大乐透首期期号（2007年）
+FIRST_ISSUE = "07001"
+
+DEFAULT_CHECKPOINT_PATH = "backfill_checkpoint.json"
+
+# 续传前需与本次参数一致的断点字段
+CHECKPOINT_KEYS = ("start_issue", "page_size", "db_path")
+
+
+def load_checkpoint(path):
+    """读取断点文件，不存在时返回 None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    """原子写入断点文件（先写临时文件再替换），避免中断时损坏"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def checkpoint_mismatches(checkpoint, expected):
+    """断点与本次参数不一致的字段，返回 [(字段, 断点中的值, 本次的值), ...]"""
+    return [(key, checkpoint.get(key), expected[key]) for key in CHECKPOINT_KEYS
+            if checkpoint.get(key) != expected[key]]
+
+
+def new_checkpoint(session, start_issue, page_size, db_path, base_url=None, limiter=None):
+    """创建新断点：固定回填的期号区间，保证中断前后分页一致"""
+    latest = fetch_page(session, build_params(1, 1, issue_count=1), base_url, limiter=limiter)
+    end_issue = str(latest["data"][0]["issue"])
+    first = fetch_page(session, build_params(1, page_size, start_issue=start_issue, end_issue=end_issue),
+                       base_url, limiter=limiter)
+    return {
+        "start_issue": start_issue,
+        "end_issue": end_issue,
+        "page_size": page_size,
+        "db_path": db_path,
+        "total_pages": int(first.get("pages") or 1),
+        "completed_pages": [],
+        "periods": 0,
+        "elapsed": 0.0,
+    }
+
+
+def backfill(db_path=DEFAULT_DB_PATH, checkpoint_path=DEFAULT_CHECKPOINT_PATH, start_issue=FIRST_ISSUE,
+             page_size=PAGE_SIZE, max_workers=1, rate_limit=None, base_url=None, reset=False):
+    """回填完整历史数据，每页写库后更新断点，返回本次新写入的期数
+
+    已有断点与本次的起始期号、每页条数或数据库路径不一致时抛出 ValueError；reset=True 时丢弃旧断点重新开始。
+    """
+    db_path = os.path.abspath(db_path)
+    checkpoint = None if reset else load_checkpoint(checkpoint_path)
+    if checkpoint is not None:
+        mismatches = checkpoint_mismatches(checkpoint, {"start_issue": start_issue, "page_size": page_size,
+                                                        "db_path": db_path})
+        if mismatches:
+            details = "；".join(f"{key} 断点为 {old!r}，本次为 {new!r}" for key, old, new in mismatches)
+            raise ValueError(f"[错误] 断点文件 {checkpoint_path} 与本次参数不一致（{details}），"
+                             f"请使用相同参数续传，或加 --reset 重新开始回填")
+
+    session = create_session(pool_size=max(10, max_workers))
+    limiter = HostRateLimiter(rate_limit) if rate_limit else None
+    conn = open_store(db_path)
+
+    try:
+        if checkpoint is None:
+            checkpoint = new_checkpoint(session, start_issue, page_size, db_path, base_url, limiter)
+            save_checkpoint(checkpoint_path, checkpoint)
+            print(f"[回填] 新建断点: {checkpoint['start_issue']} ~ {checkpoint['end_issue']}，"
+                  f"共 {checkpoint['total_pages']} 页")
+        else:
+            print(f"[回填] 从断点继续: 已完成 {len(checkpoint['completed_pages'])}/{checkpoint['total_pages']} 页")
+
+        done = set(checkpoint["completed_pages"])
+        pending = [p for p in range(1, checkpoint["total_pages"] + 1) if p not in done]
+
+        def fetch_one(page):
+            params = build_params(page, checkpoint["page_size"], start_issue=checkpoint["start_issue"],
+                                  end_issue=checkpoint["end_issue"])
+            payload = fetch_page(session, params, base_url, limiter=limiter)
+            return [raw_record(r) for r in payload.get("data") or []]
+
+        started = time.perf_counter()
+        periods = 0
+        window = max(1, max_workers) * 2
+        writer = BatchWriter(conn, source="backfill")
+        with writer, ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            pages, running = iter(pending), {}
+            while True:
+                # 补满在途窗口，取回已完成的页面后立即释放其结果
+                for page in pages:
+                    running[executor.submit(fetch_one, page)] = page
+                    if len(running) >= window:
+                        break
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page = running.pop(future)
+                    try:
+                        raw_rows = future.result()
+                    except Exception as e:
+                        print(f"[警告] 第 {page} 页获取失败，下次运行时重试: {e}")
+                        continue
+
+                    # 各页到达顺序不定，不检查跨页的期号顺序（重复期号按主键覆盖）
+                    written = 0
+                    for row in validate_rows(raw_rows, writer.reject, ordered=False):
+                        writer.write(row)
+                        written += 1
+                    # 先落库再记录断点：中断时最多重复写入一页（按期号覆盖，不会重复）
+                    writer.flush()
+                    periods += written
+                    elapsed = time.perf_counter() - started
+                    checkpoint["completed_pages"].append(page)
+                    checkpoint["periods"] += written
+                    save_checkpoint(checkpoint_path, {**checkpoint, "elapsed": checkpoint["elapsed"] + elapsed})
+                    print(f"[回填] 第 {page} 页完成 ({len(checkpoint['completed_pages'])}/{checkpoint['total_pages']})，"
+                          f"{periods / elapsed:.1f} 期/秒")
+
+        elapsed = time.perf_counter() - started
+        checkpoint["elapsed"] += elapsed
+        save_checkpoint(checkpoint_path, checkpoint)
+
+        rate = periods / elapsed if elapsed > 0 else 0.0
+        remaining = checkpoint["total_pages"] - len(checkpoint["completed_pages"])
+        print(f"[成功] 本次写入 {periods} 期，隔离 {writer.quarantined} 行，用时 {elapsed:.1f} 秒，吞吐 {rate:.1f} 期/秒")
+        print(f"[信息] 本地共 {count_draws(conn)} 期，剩余 {remaining} 页未完成")
+        return periods
+    finally:
+        conn.close()
+        session.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="大乐透全量历史回填（支持断点续传）")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="本地开奖数据库路径")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH, help="断点文件路径")
+    parser.add_argument("--start-issue", default=FIRST_ISSUE, help="起始期号")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="每页条数")
+    parser.add_argument("--workers", type=int, default=1, help="并发线程数")
+    parser.add_argument("--rate", type=float, default=None, help="每秒最多请求数")
+    parser.add_argument("--reset", action="store_true", help="丢弃已有断点，按本次参数重新开始回填")
+    args = parser.parse_args()
+
+    try:
+        backfill(args.db, args.checkpoint, args.start_issue, args.page_size, args.workers, args.rate,
+                 reset=args.reset)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
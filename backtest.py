@@ -0,0 +1,123 @@
+"""销售额预测的逐期滚动回测（walk-forward）
+
+在每一期都只用该期之前的数据重新拟合模型并预测该期销售额，统计各模型的 MAE / MAPE。
+线性模型通过正规方程的前缀和增量更新（每期只需解一个 p×p 方程组），
+不必在每一步重新调用 sklearn 拟合。
+
+用法:
+    python backtest.py --source dlt_draws.npz
+"""
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from draw_matrix import DrawArrays, as_draw_arrays
+from games import get_game
+
+# 数值缩放：金额以亿元为单位参与拟合，避免正规方程病态
+AMOUNT_SCALE = 1e8
+
+# 正规方程的岭项，仅用于训练样本不足时保证可解
+RIDGE = 1e-9
+
+MODELS = ("linear", "rolling_mean", "weekday_linear", "prize_pool_linear")
+
+
+def design_matrix(draws, model):
+    """构造各回归模型的特征矩阵（每行只含该期开奖前已知的信息）"""
+    n = len(draws)
+    index = np.arange(n, dtype=np.float64)
+    columns = [np.ones(n), index / max(n, 1)]
+    if model == "weekday_linear":
+        # 彩种的开奖日中除第一个以外各设一个哑变量（大乐透为周三、周六）
+        weekday = draws.weekday()
+        columns += [(weekday == day).astype(np.float64) for day in get_game(draws.game).draw_weekdays[1:]]
+    elif model == "prize_pool_linear":
+        # 上一期开奖后的奖池金额（本期开奖前已知），首期用本期值代替
+        pool = np.nan_to_num(draws.prize_pool / AMOUNT_SCALE)
+        columns.append(np.concatenate([pool[:1], pool[:-1]]))
+    elif model != "linear":
+        raise ValueError(f"未知模型: {model}")
+    return np.column_stack(columns)
+
+
+def walk_forward_ols(X, y, min_train):
+    """逐期最小二乘预测：第 t 期使用前 t 期样本拟合，返回长度为 n 的预测（前 min_train 期为 NaN）
+
+    XᵀX 与 Xᵀy 用前缀和一次算出，所有期的 p×p 方程组批量求解。
+    """
+    n, p = X.shape
+    pred = np.full(n, np.nan)
+    if n <= min_train:
+        return pred
+    xtx = np.cumsum(X[:, :, None] * X[:, None, :], axis=0)
+    xty = np.cumsum(X * y[:, None], axis=0)
+    t = np.arange(min_train, n)
+    # 第 t 期使用前 t 个样本，即前缀和的第 t-1 项
+    beta = np.linalg.solve(xtx[t - 1] + RIDGE * np.eye(p), xty[t - 1][:, :, None])[:, :, 0]
+    pred[t] = np.einsum('ij,ij->i', X[t], beta)
+    return pred
+
+
+def walk_forward_rolling_mean(y, min_train, window):
+    """逐期滚动均值预测：第 t 期的预测为之前 window 期的平均值"""
+    n = len(y)
+    pred = np.full(n, np.nan)
+    cum = np.concatenate([[0.0], np.cumsum(y)])
+    t = np.arange(min_train, n)
+    start = np.maximum(t - window, 0)
+    pred[t] = (cum[t] - cum[start]) / (t - start)
+    return pred
+
+
+def sales_backtest(draws, models=MODELS, min_train=10, window=10):
+    """对各模型做逐期回测，返回 (逐期预测 DataFrame, 误差汇总 DataFrame)"""
+    draws = as_draw_arrays(draws)
+    valid = ~np.isnan(draws.sales)
+    draws = draws[valid]
+    y = draws.sales / AMOUNT_SCALE
+    digits = get_game(draws.game).issue_digits
+
+    predictions = pd.DataFrame({
+        '期号': [f'{i:0{digits}d}' for i in draws.issue.tolist()],
+        '开奖日期': pd.to_datetime(draws.date),
+        '实际销售额(元)': draws.sales,
+    })
+    summary = []
+    for model in models:
+        start = time.perf_counter()
+        if model == "rolling_mean":
+            pred = walk_forward_rolling_mean(y, min_train, window)
+        else:
+            pred = walk_forward_ols(design_matrix(draws, model), y, min_train)
+        elapsed = time.perf_counter() - start
+
+        pred = pred * AMOUNT_SCALE
+        predictions[f'{model}预测(元)'] = pred
+        scored = ~np.isnan(pred)
+        error = np.abs(pred[scored] - draws.sales[scored])
+        summary.append({
+            '模型': model,
+            '回测期数': int(scored.sum()),
+            'MAE(元)': error.mean() if len(error) else np.nan,
+            'MAPE': (error / draws.sales[scored]).mean() if len(error) else np.nan,
+            '耗时(秒)': elapsed,
+        })
+
+    summary = pd.DataFrame(summary).sort_values('MAE(元)', kind='stable').reset_index(drop=True)
+    return predictions, summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="销售额预测逐期滚动回测")
+    parser.add_argument("--source", default="dlt_draws.npz", help="列式开奖数据（DrawArrays.save 输出）")
+    parser.add_argument("--min-train", type=int, default=10, help="开始预测前至少需要的历史期数")
+    parser.add_argument("--window", type=int, default=10, help="滚动均值窗口")
+    args = parser.parse_args()
+
+    predictions, summary = sales_backtest(DrawArrays.load(args.source), min_train=args.min_train,
+                                          window=args.window)
+    predictions.to_csv("sales_backtest.csv", index=False, encoding="utf_8_sig")
+    summary.to_csv("sales_backtest_summary.csv", index=False, encoding="utf_8_sig")
+    print(summary.to_string(index=False))
+    print("[数据] 回测结果已保存: sales_backtest.csv, sales_backtest_summary.csv")
@@ -0,0 +1,175 @@
+"""分析接口服务压测：多个线程各自保持一条 keep-alive 连接循环请求，统计每秒请求数与延迟分位数
+
+不指定 --url 时在子进程中启动 api_server.py（读取 --db），压测结束后关闭；
+客户端延迟包含网络与 Python 客户端开销，服务端处理耗时取自响应头 Server-Timing。
+每次运行结果追加到历史文件，便于跟踪变化。
+
+用法:
+    python bench_api.py                                   # 启动本地服务并压测 10 秒
+    python bench_api.py --threads 8 --duration 30
+    python bench_api.py --url http://127.0.0.1:8000 --etag   # 压测已运行的服务，带 If-None-Match（304 路径）
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+from datetime import datetime
+from urllib.parse import urlparse
+import numpy as np
+
+API_SERVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_server.py")
+
+# 轮流请求的接口（{game} 替换为彩种代码）
+DEFAULT_PATHS = [
+    "/api/{game}/frequency?last=100",
+    "/api/{game}/frequency?last=30",
+    "/api/{game}/sales-by-weekday",
+    "/api/{game}/forecast",
+]
+
+DEFAULT_HISTORY_PATH = "api_bench_history.jsonl"
+
+
+def free_port():
+    """取得一个空闲的本地端口"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_path, game, port):
+    """在子进程中启动 api_server.py，等待其可以响应后返回 (进程, 根地址)"""
+    proc = subprocess.Popen([sys.executable, API_SERVER_PATH, "--db", db_path, "--game", game,
+                             "--port", str(port), "--refresh", "0"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"api_server.py 启动失败: {proc.stderr.read().strip()}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/games")
+            conn.getresponse().read()
+            conn.close()
+            return proc, url
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("api_server.py 启动超时")
+
+
+def server_timing(response):
+    """解析响应头 Server-Timing: app;dur=毫秒"""
+    header = response.getheader("Server-Timing") or ""
+    for part in header.split(";"):
+        if part.startswith("dur="):
+            return float(part[4:])
+    return None
+
+
+def worker(url, paths, deadline, use_etag, results):
+    """单个压测线程：keep-alive 连接上循环请求，记录 (客户端毫秒, 服务端毫秒, 状态码)"""
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=10)
+    etags = {}
+    latencies, server_ms, statuses = [], [], {}
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            headers = {"If-None-Match": etags[path]} if use_etag and path in etags else {}
+            start = time.perf_counter()
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+            dur = server_timing(response)
+            if dur is not None:
+                server_ms.append(dur)
+            if response.getheader("ETag"):
+                etags[path] = response.getheader("ETag")
+    finally:
+        conn.close()
+        results.append((latencies, server_ms, statuses))
+
+
+def percentiles(values):
+    """p50 / p90 / p99（毫秒）"""
+    if not values:
+        return {}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"p50_ms": round(p50, 3), "p90_ms": round(p90, 3), "p99_ms": round(p99, 3)}
+
+
+def bench_api(url, paths, threads=4, duration=10.0, use_etag=False):
+    """对 url 压测 duration 秒，返回结果字典"""
+    results = []
+    deadline = time.perf_counter() + duration
+    workers = [threading.Thread(target=worker, args=(url, paths, deadline, use_etag, results))
+               for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = [v for r in results for v in r[0]]
+    server_ms = [v for r in results for v in r[1]]
+    statuses = {}
+    for _, _, counts in results:
+        for status, n in counts.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + n
+    return {
+        "threads": threads,
+        "duration_s": round(elapsed, 3),
+        "requests": len(latencies),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "client": percentiles(latencies),
+        "server": percentiles(server_ms),
+        "status": statuses,
+        "etag": use_etag,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="分析接口服务压测")
+    parser.add_argument("--url", default=None, help="已运行服务的根地址（不指定时在子进程中启动 api_server.py）")
+    parser.add_argument("--db", default="dlt_draws.db", help="启动服务时读取的本地开奖数据库")
+    parser.add_argument("--game", default="dlt", help="请求的彩种")
+    parser.add_argument("--threads", type=int, default=4, help="并发连接数")
+    parser.add_argument("--duration", type=float, default=10.0, help="压测时长（秒）")
+    parser.add_argument("--etag", action="store_true", help="带 If-None-Match 请求（测试 304 路径）")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="结果历史文件（JSON Lines）")
+    args = parser.parse_args()
+
+    proc, url = None, args.url
+    if url is None:
+        proc, url = start_server(args.db, args.game, free_port())
+    try:
+        paths = [p.format(game=args.game) for p in DEFAULT_PATHS]
+        result = bench_api(url, paths, args.threads, args.duration, args.etag)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    print(f"[基准] {result['requests']} 次请求，{result['duration_s']:.1f}s，"
+          f"{result['requests_per_s']:,.0f} 请求/秒（{args.threads} 个连接）")
+    for side, name in (("client", "客户端延迟"), ("server", "服务端处理")):
+        if result[side]:
+            print(f"       {name}  p50 {result[side]['p50_ms']:.3f}ms  p90 {result[side]['p90_ms']:.3f}ms  "
+                  f"p99 {result[side]['p99_ms']:.3f}ms")
+    print(f"       状态码  {', '.join(f'{k}: {v}' for k, v in sorted(result['status'].items()))}")
+    with open(args.history, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"time": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0],
+                            "url": args.url, "paths": paths, "result": result}, ensure_ascii=False) + "\n")
+    print(f"[数据] 压测结果已追加到: {args.history}")
@@ -0,0 +1,95 @@
+"""开奖表格行提取微基准：对比逐单元格 WebDriver 读取与一次取回 HTML 后本地解析
+
+用法:
+    python bench_extract.py                                  # 仅测本地 lxml 解析
+    python bench_extract.py --driver /path/to/chromedriver   # 同时在无头浏览器中对比新旧两种方式
+"""
+import os
+import time
+import argparse
+from table_parser import parse_draw_table
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "zhcw_dlt_page1.html")
+
+
+def extract_rows_per_cell(driver):
+    """旧方式：逐行逐单元格通过 WebDriver 读取，返回 (行列表, RPC 次数)"""
+    from selenium.webdriver.common.by import By
+
+    rpc = 1
+    rows = driver.find_elements(By.XPATH, '//div[@class="flcp"]//table//tbody//tr')
+    data = []
+    for row in rows:
+        cells = row.find_elements(By.TAG_NAME, "td")
+        rpc += 1
+        if len(cells) >= 14:
+            fronts = cells[2].find_elements(By.CLASS_NAME, "jqh")
+            backs = cells[3].find_elements(By.CLASS_NAME, "jql")
+            data.append({
+                "期号": cells[0].text.strip(),
+                "开奖日期": cells[1].text.strip().split("（")[0].strip(),
+                "前区号码": ','.join(span.text for span in fronts),
+                "后区号码": ','.join(span.text for span in backs),
+                "总销售额(元)": cells[4].text.strip(),
+                "奖池奖金(元)": cells[13].text.strip(),
+            })
+            rpc += 2 + len(fronts) + len(backs) + 4
+    return data, rpc
+
+
+def extract_rows_single_pass(driver):
+    """新方式：一次取回表格 HTML 后用 lxml 解析，返回 (行列表, RPC 次数)"""
+    from selenium.webdriver.common.by import By
+
+    table_html = driver.find_element(By.CLASS_NAME, "flcp").get_attribute("outerHTML")
+    return parse_draw_table(table_html), 2
+
+
+def time_it(func, repeat):
+    """重复执行 repeat 次，返回 (最后一次结果, 每次平均耗时毫秒)"""
+    result = None
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def run_benchmark(fixture=DEFAULT_FIXTURE, driver_path=None, repeat=20):
+    """运行基准并打印每页提取耗时"""
+    with open(fixture, encoding="utf-8") as f:
+        page_html = f.read()
+
+    rows, ms = time_it(lambda: parse_draw_table(page_html), repeat * 10)
+    print(f"[基准] lxml 本地解析: {ms:.3f} ms/页 ({len(rows)} 行)")
+
+    if not driver_path or not os.path.exists(driver_path):
+        print("[跳过] 未提供 ChromeDriver，跳过浏览器内新旧方式对比")
+        return
+
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-gpu")
+    driver = webdriver.Chrome(service=Service(executable_path=driver_path), options=options)
+    try:
+        driver.get("file://" + os.path.abspath(fixture))
+        (old_rows, old_rpc), old_ms = time_it(lambda: extract_rows_per_cell(driver), repeat)
+        (new_rows, new_rpc), new_ms = time_it(lambda: extract_rows_single_pass(driver), repeat)
+        print(f"[基准] 逐单元格读取: {old_ms:.1f} ms/页, {old_rpc} 次 RPC ({len(old_rows)} 行)")
+        print(f"[基准] 单次取回+解析: {new_ms:.1f} ms/页, {new_rpc} 次 RPC ({len(new_rows)} 行)")
+        print(f"[结果] 提速 {old_ms / new_ms:.1f} 倍")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="开奖表格行提取微基准")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE, help="保存的开奖页面 HTML")
+    parser.add_argument("--driver", default=None, help="ChromeDriver 路径")
+    parser.add_argument("--repeat", type=int, default=20, help="重复次数")
+    args = parser.parse_args()
+
+    run_benchmark(args.fixture, args.driver, args.repeat)
@@ -0,0 +1,110 @@
+"""main.py 各子命令的冷启动耗时基准：以 python -X importtime 启动全新解释器，统计导入耗时与总耗时
+
+爬取与专家接口指向本地桩服务器，所有输出文件写入临时目录；每次运行结果追加到历史文件，便于跟踪变化。
+
+用法:
+    python bench_startup.py
+    python bench_startup.py --repeat 5 --commands analyze report
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+from statistics import median
+from stub_server import start_stub_server
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+# 子命令 -> main.py 参数（analyze 单进程执行，避免子进程的导入混入统计）
+COMMANDS = {
+    "help": ["--help"],
+    "crawl": ["crawl"],
+    "analyze": ["--workers", "1", "analyze"],
+    "report": ["report"],
+    "experts": ["experts"],
+}
+
+DEFAULT_HISTORY_PATH = "startup_history.jsonl"
+
+
+def parse_importtime(stderr):
+    """解析 -X importtime 输出，返回 [(顶层模块名, 累计耗时秒)]"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # 顶层导入的模块名前只有一个空格，嵌套导入每层多两个空格
+        if not name.startswith("  "):
+            modules.append((name.strip(), int(cumulative) / 1e6))
+    return modules
+
+
+def run_command(argv, cwd, env):
+    """在全新解释器中运行一次子命令，返回 (总耗时秒, 顶层导入列表, 峰值内存 MB 或 None)"""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-X", "importtime", MAIN_PATH] + argv, cwd=cwd, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, encoding="utf-8",
+                            errors="replace")
+    stderr = proc.stderr.read()
+    proc.stderr.close()
+    peak_mb = None
+    if hasattr(os, "wait4"):
+        # 直接回收子进程以取得它自己的资源占用（Linux 下 ru_maxrss 单位为 KB）
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        peak_mb = usage.ru_maxrss / 1024
+    else:
+        proc.wait()
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"main.py {' '.join(argv)} 退出码 {proc.returncode}")
+    return elapsed, parse_importtime(stderr), peak_mb
+
+
+def bench_startup(commands, repeat=3, top=5):
+    """依次基准测试各子命令，返回结果列表"""
+    server, api_url = start_stub_server()
+    env = dict(os.environ, ZHCW_API_URL=api_url, CMZJ_API_URL=api_url.split("/port/")[0], MPLBACKEND="Agg")
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for name in commands:
+                runs = [run_command(COMMANDS[name], workdir, env) for _ in range(repeat)]
+                import_times = [sum(t for _, t in modules) for _, modules, _ in runs]
+                heaviest = sorted(runs[0][1], key=lambda m: m[1], reverse=True)[:top]
+                results.append({
+                    "command": name,
+                    "cold_s": round(runs[0][0], 3),
+                    "median_s": round(median(r[0] for r in runs), 3),
+                    "import_s": round(median(import_times), 3),
+                    "peak_mb": runs[0][2] and round(runs[0][2], 1),
+                    "heaviest": [(m, round(t, 3)) for m, t in heaviest],
+                })
+                print(f"[基准] {name:<8} 首次 {runs[0][0]:.2f}s  中位数 {results[-1]['median_s']:.2f}s  "
+                      f"导入 {results[-1]['import_s']:.2f}s"
+                      + (f"  峰值内存 {runs[0][2]:.0f}MB" if runs[0][2] else ""))
+                for module, seconds in heaviest:
+                    print(f"           {module:<32} {seconds:.3f}s")
+    finally:
+        server.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="main.py 子命令冷启动耗时基准")
+    parser.add_argument("--commands", nargs="+", choices=list(COMMANDS), default=list(COMMANDS), help="要测试的子命令")
+    parser.add_argument("--repeat", type=int, default=3, help="每个子命令运行次数")
+    parser.add_argument("--top", type=int, default=5, help="显示耗时最多的顶层导入个数")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="结果历史文件（JSON Lines）")
+    args = parser.parse_args()
+
+    results = bench_startup(args.commands, repeat=args.repeat, top=args.top)
+    with open(args.history, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"time": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0],
+                            "results": results}, ensure_ascii=False) + "\n")
+    print(f"[数据] 基准结果已追加到: {args.history}")
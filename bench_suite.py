@@ -0,0 +1,234 @@
+"""分析与解析基准套件：在不同规模的合成开奖历史（synthetic.py）上计时各环节，结果追加到历史文件，
+与最近几次结果的中位数比较，超过阈值的性能回退使本次运行失败（退出码 1）
+
+计时的环节（每项重复 repeat 次取中位数，分析函数写出的 CSV 与报告落在临时目录，图表只收集不渲染）:
+    parse_html        开奖页面 HTML 解析 + 逐行校验（table_parser + draw_stream）
+    parse_json        接口 JSON 解析 + 逐行校验（http_crawler + draw_stream）
+    load              号码文本列解析为整数矩阵（DrawArrays.from_dataframe）
+    frequency         各号码区号码计数
+    gap_stats         多窗口频率、遗漏与冷热统计
+    cooccurrence      前区两两与三元组共现
+    number_frequency  任务2 number_frequency_analysis（含以上统计与 CSV 输出）
+    day_of_week       任务3 day_of_week_analysis
+    forecast          任务1 销售额趋势与线性回归预测
+    report            分析报告生成
+
+页面解析只在期号格式可以表示的规模内计时（大乐透 5 位期号，最多 99999 期），更大的规模跳过。
+
+用法:
+    python bench_suite.py                                  # 100 / 1万 / 100万 期
+    python bench_suite.py --sizes 100 10000 --repeat 5
+    python bench_suite.py --cases parse_html gap_stats --threshold 0.5
+    python bench_suite.py --no-record                      # 只比较，不写入历史
+"""
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime
+from statistics import median
+import numpy as np
+from games import GAMES, get_game
+from draw_matrix import DrawArrays, count_numbers
+from draw_stream import validate_rows
+from table_parser import iter_draw_table
+from http_crawler import parse_jsonp, raw_record
+from number_stats import compute_number_stats
+from cooccurrence import CooccurrenceCounter
+from synthetic import synthetic_draws, render_html_page, render_json_page, page_count
+from main import (zone_matrices, number_frequency_analysis, day_of_week_analysis, analyze_sales_trend,
+                  generate_report)
+
+DEFAULT_SIZES = (100, 10_000, 1_000_000)
+
+DEFAULT_HISTORY_PATH = "bench_history.jsonl"
+
+# 中位数比最近 window 次结果的中位数慢 threshold 以上（且绝对差超过 MIN_REGRESSION_SECONDS）视为回退
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_WINDOW = 5
+MIN_REGRESSION_SECONDS = 0.002
+
+
+def case_parse_html(ctx):
+    game = ctx["game"]
+    rows = sum(1 for page in ctx["html_pages"] for _ in validate_rows(iter_draw_table(page, game), game=game))
+    assert rows == len(ctx["draws"]), f"HTML 解析得到 {rows} 行，应为 {len(ctx['draws'])} 行"
+
+
+def case_parse_json(ctx):
+    game = ctx["game"]
+    rows = sum(1 for text in ctx["json_pages"]
+               for _ in validate_rows((raw_record(r, game) for r in parse_jsonp(text)["data"]), game=game))
+    assert rows == len(ctx["draws"]), f"JSON 解析得到 {rows} 行，应为 {len(ctx['draws'])} 行"
+
+
+def case_load(ctx):
+    DrawArrays.from_dataframe(ctx["df"], ctx["game"])
+
+
+def case_frequency(ctx):
+    for zone, matrix in zone_matrices(ctx["draws"], ctx["game"]):
+        count_numbers(matrix, zone.high, zone.low)
+
+
+def case_gap_stats(ctx):
+    for zone, matrix in zone_matrices(ctx["draws"], ctx["game"]):
+        compute_number_stats(matrix, zone.high, zone.pick, low=zone.low)
+
+
+def case_cooccurrence(ctx):
+    if ctx["game"].front.combinable:
+        CooccurrenceCounter.from_matrix(ctx["draws"].front, ctx["game"].front.high)
+
+
+def case_number_frequency(ctx):
+    number_frequency_analysis(ctx["draws"], [], ctx["game"])
+
+
+def case_day_of_week(ctx):
+    day_of_week_analysis(ctx["draws"], [], ctx["game"])
+
+
+def case_forecast(ctx):
+    analyze_sales_trend(ctx["df"], [], ctx["game"])
+
+
+def case_report(ctx):
+    draws, game = ctx["draws"], ctx["game"]
+    picks = [zone.numbers()[:zone.pick] for zone in game.zones] + [[]]
+    generate_report(ctx["df"], float(np.nanmean(draws.sales)), picks[0], picks[1], game)
+
+
+# 名称 -> (函数, 是否需要渲染页面)
+CASES = {
+    "parse_html": (case_parse_html, True),
+    "parse_json": (case_parse_json, True),
+    "load": (case_load, False),
+    "frequency": (case_frequency, False),
+    "gap_stats": (case_gap_stats, False),
+    "cooccurrence": (case_cooccurrence, False),
+    "number_frequency": (case_number_frequency, False),
+    "day_of_week": (case_day_of_week, False),
+    "forecast": (case_forecast, False),
+    "report": (case_report, False),
+}
+
+
+def build_context(size, game, cases, seed=0):
+    """生成某规模的合成数据及各环节的输入"""
+    draws = synthetic_draws(size, seed, game)
+    ctx = {"game": game, "draws": draws, "df": draws.to_dataframe()}
+    if any(CASES[name][1] for name in cases):
+        pages = range(1, page_count(draws) + 1)
+        ctx["html_pages"] = [render_html_page(draws, p) for p in pages]
+        ctx["json_pages"] = [render_json_page(draws, p) for p in pages]
+    return ctx
+
+
+def time_case(func, ctx, repeat):
+    """执行 repeat 次（屏蔽打印输出），返回每次耗时（秒）"""
+    times = []
+    for _ in range(repeat):
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func(ctx)
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def run_suite(sizes, cases, game, repeat=3, seed=0):
+    """在各规模上运行基准，返回 {规模: {环节: 中位数秒}}"""
+    # 预先导入惰性依赖（任务1 用到 sklearn），避免首次导入计入耗时
+    import sklearn.linear_model  # noqa: F401
+
+    max_page_draws = 10 ** game.issue_digits - 1
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for size in sizes:
+                runnable = [name for name in cases if not (CASES[name][1] and size > max_page_draws)]
+                start = time.perf_counter()
+                ctx = build_context(size, game, runnable, seed)
+                print(f"\n[基准] {game.name} {size:,} 期（生成数据 {time.perf_counter() - start:.1f}s）")
+                results[str(size)] = {}
+                for name in cases:
+                    if name not in runnable:
+                        print(f"       {name:<18} 跳过（超过 {game.issue_digits} 位期号可表示的期数）")
+                        continue
+                    times = time_case(CASES[name][0], ctx, repeat)
+                    results[str(size)][name] = median(times)
+                    print(f"       {name:<18} 中位数 {median(times) * 1000:10.3f}ms  最快 {min(times) * 1000:10.3f}ms")
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def load_history(path):
+    """读取历史记录（JSON Lines），文件不存在时返回空列表"""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_regressions(results, history, game, threshold=DEFAULT_THRESHOLD, window=DEFAULT_WINDOW):
+    """与同一彩种最近 window 次记录的中位数比较，返回 [(规模, 环节, 本次秒, 基线秒), ...]"""
+    previous = [record["results"] for record in history if record.get("game", "dlt") == game.key]
+    regressions = []
+    for size, timings in results.items():
+        for name, seconds in timings.items():
+            past = [r[size][name] for r in previous if name in r.get(size, {})][-window:]
+            if not past:
+                continue
+            baseline = median(past)
+            if seconds > baseline * (1 + threshold) and seconds - baseline > MIN_REGRESSION_SECONDS:
+                regressions.append((size, name, seconds, baseline))
+    return regressions
+
+
+def git_commit():
+    """当前代码的 git 提交（不在 git 仓库中时为 None）"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="分析与解析基准套件")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="合成历史的期数")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES), help="要计时的环节")
+    parser.add_argument("--game", choices=list(GAMES), default="dlt", help="彩种")
+    parser.add_argument("--repeat", type=int, default=3, help="每个环节重复次数")
+    parser.add_argument("--seed", type=int, default=0, help="合成数据的随机种子")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="判定回退的相对变慢比例")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="基线取最近几次记录")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="结果历史文件（JSON Lines）")
+    parser.add_argument("--no-record", action="store_true", help="不把本次结果追加到历史文件")
+    args = parser.parse_args()
+
+    game = get_game(args.game)
+    results = run_suite(args.sizes, args.cases, game, args.repeat, args.seed)
+    regressions = find_regressions(results, load_history(args.history), game, args.threshold, args.window)
+
+    if not args.no_record:
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"time": datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+                                "python": sys.version.split()[0], "numpy": np.__version__, "game": game.key,
+                                "repeat": args.repeat, "results": results}, ensure_ascii=False) + "\n")
+        print(f"\n[数据] 基准结果已追加到: {args.history}")
+
+    if regressions:
+        for size, name, seconds, baseline in regressions:
+            print(f"[错误] 性能回退: {int(size):,} 期 {name} {seconds * 1000:.3f}ms，"
+                  f"基线 {baseline * 1000:.3f}ms（+{(seconds / baseline - 1) * 100:.0f}%）")
+        sys.exit(1)
+    print("[成功] 未发现超过阈值的性能回退")
@@ -0,0 +1,187 @@
+"""常驻浏览器池：预热若干 ChromeDriver 实例反复使用，避免每次爬取都冷启动浏览器
+
+- 取用前做健康检查，失效的实例自动替换；
+- 使用 max_uses 次或内存超过 max_memory_mb 后回收重建，防止长时间运行后内存膨胀；
+- 通过 CDP Network.setBlockedURLs 拦截图片、样式表和字体请求，减小页面加载量。
+"""
+import os
+import time
+import queue
+import threading
+from contextlib import contextmanager
+from metrics import REGISTRY, log_event, count_webdriver_rpcs
+
+USER_AGENT = ("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/91.0.4472.124 Safari/537.36")
+
+# 拦截的资源（图片、样式表、字体）
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.css",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+]
+
+
+def chrome_options(block_resources=False):
+    """无头 Chrome 启动参数；block_resources=True 时同时在浏览器设置中禁用图片"""
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--disable-infobars")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--headless=new")
+    options.add_argument(USER_AGENT)
+    if block_resources:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+
+def create_driver(driver_path, block_resources=False):
+    """启动一个 ChromeDriver 实例（统计 WebDriver 往返次数），可选拦截图片/样式表/字体"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    if not os.path.exists(driver_path):
+        raise FileNotFoundError(f"[错误] ChromeDriver 不存在，请下载并放置到路径: {driver_path}")
+
+    service = Service(executable_path=driver_path)
+    service.log_path = "chromedriver.log"
+    start = time.perf_counter()
+    driver = webdriver.Chrome(service=service, options=chrome_options(block_resources))
+    if block_resources:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    REGISTRY.observe("browser_start_seconds", time.perf_counter() - start)
+    return count_webdriver_rpcs(driver)
+
+
+def driver_memory_mb(driver):
+    """浏览器占用的内存（MB）：有 psutil 时统计 chromedriver 及其子进程的 RSS，否则取页面 JS 堆大小"""
+    try:
+        import psutil
+        process = psutil.Process(driver.service.process.pid)
+        procs = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs if p.is_running()) / 1024 / 1024
+    except ImportError:
+        used = driver.execute_script("return window.performance.memory ? performance.memory.usedJSHeapSize : 0")
+        return (used or 0) / 1024 / 1024
+    except Exception:
+        return 0.0
+
+
+class PooledDriver:
+    """池中的一个浏览器实例及其使用次数"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+
+class BrowserPool:
+    """预热的 ChromeDriver 池（线程安全）
+
+    用法:
+        with BrowserPool(driver_path, size=2) as pool:
+            with pool.acquire() as driver:
+                driver.get(url)
+    """
+
+    def __init__(self, driver_path, size=1, max_uses=50, max_memory_mb=1024, block_resources=True):
+        self.driver_path = driver_path
+        self.size = size
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.block_resources = block_resources
+        self.idle = queue.LifoQueue()  # 后进先出：优先复用最近用过的（最“热”的）实例
+        self.slots = threading.Semaphore(size)
+        self.lock = threading.Lock()
+        self.live = 0
+
+    def __enter__(self):
+        return self.warm()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def spawn(self):
+        """新建一个实例"""
+        pooled = PooledDriver(create_driver(self.driver_path, self.block_resources))
+        with self.lock:
+            self.live += 1
+        REGISTRY.inc("browser_pool_created_total")
+        return pooled
+
+    def retire(self, pooled, reason):
+        """关闭实例"""
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+        with self.lock:
+            self.live -= 1
+        REGISTRY.inc("browser_pool_retired_total", reason=reason)
+        log_event("browser_retired", reason=reason, uses=pooled.uses,
+                  age_seconds=round(time.monotonic() - pooled.created_at, 1))
+
+    def warm(self):
+        """预先启动 size 个实例"""
+        while self.live < self.size:
+            self.idle.put(self.spawn())
+        print(f"[浏览器池] 已预热 {self.size} 个浏览器实例")
+        return self
+
+    def healthy(self, pooled):
+        """健康检查：会话仍然可以执行脚本"""
+        try:
+            return pooled.driver.execute_script("return document.readyState") is not None
+        except Exception:
+            return False
+
+    def checkout(self):
+        """取出一个健康的实例（没有空闲实例时新建）"""
+        while True:
+            try:
+                pooled = self.idle.get_nowait()
+            except queue.Empty:
+                return self.spawn()
+            if self.healthy(pooled):
+                return pooled
+            self.retire(pooled, "unhealthy")
+
+    def checkin(self, pooled, failed=False):
+        """归还实例：出错、达到使用次数或内存超限时回收"""
+        pooled.uses += 1
+        if failed:
+            self.retire(pooled, "error")
+        elif pooled.uses >= self.max_uses:
+            self.retire(pooled, "max_uses")
+        elif self.max_memory_mb and driver_memory_mb(pooled.driver) > self.max_memory_mb:
+            self.retire(pooled, "memory")
+        else:
+            self.idle.put(pooled)
+
+    @contextmanager
+    def acquire(self):
+        """借出一个浏览器实例，用完自动归还"""
+        with self.slots:
+            pooled = self.checkout()
+            failed = True
+            try:
+                yield pooled.driver
+                failed = False
+            finally:
+                self.checkin(pooled, failed)
+
+    def close(self):
+        """关闭所有空闲实例"""
+        while True:
+            try:
+                self.retire(self.idle.get_nowait(), "shutdown")
+            except queue.Empty:
+                break
+        print("[浏览器池] 浏览器已全部关闭")
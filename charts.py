@@ -0,0 +1,153 @@
+"""无界面图表渲染：只使用 Agg 后端与面向对象的 Figure API，不经过 pyplot 全局状态
+
+每个渲染函数只接收可序列化的数据并在保存后立即释放图形，
+因此可以放进进程池并行渲染，长时间运行时内存也不会累积。
+matplotlib 与 seaborn 导入耗时较长，只在真正渲染时才导入，导入本模块本身几乎没有开销。
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from metrics import REGISTRY, log_event
+
+
+def new_figure(figsize):
+    """创建绑定 Agg 画布的独立 Figure（不注册到 pyplot）"""
+    import matplotlib
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    # 设置中文字体支持
+    matplotlib.rcParams['font.sans-serif'] = ['SimHei']  # 用来正常显示中文标签
+    matplotlib.rcParams['axes.unicode_minus'] = False  # 用来正常显示负号
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def save_figure(fig, path):
+    """保存并释放图形"""
+    try:
+        fig.tight_layout()
+        fig.savefig(path)
+    finally:
+        fig.clear()
+    return path
+
+
+def style_axes(ax, title, xlabel, ylabel, title_size=15, grid_axis='both'):
+    """统一设置标题、坐标轴标签与网格"""
+    ax.set_title(title, fontsize=title_size)
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.grid(axis=grid_axis, linestyle='--', alpha=0.7)
+
+
+def render_sales_trend(path, dates, sales, title):
+    """销售额趋势图"""
+    fig = new_figure((14, 7))
+    ax = fig.add_subplot()
+    ax.plot(dates, [s / 1e6 for s in sales], 'o-', label='实际销售额')
+    style_axes(ax, title, '开奖日期', '总销售额(百万元)')
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.legend()
+    return save_figure(fig, path)
+
+
+def render_sales_prediction(path, dates, sales, next_date, next_sale, trend_dates, trend_sales,
+                            title='大乐透总销售额趋势与预测'):
+    """销售额趋势与预测图"""
+    fig = new_figure((14, 7))
+    ax = fig.add_subplot()
+    ax.plot(dates, [s / 1e6 for s in sales], 'o-', label='历史销售额')
+    # 预测点
+    ax.scatter([next_date], [next_sale / 1e6], color='red', s=100, label='预测销售额')
+    # 预测趋势线
+    ax.plot(trend_dates, [s / 1e6 for s in trend_sales], 'r--', label='预测趋势')
+    style_axes(ax, title, '开奖日期', '总销售额(百万元)')
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.legend()
+    return save_figure(fig, path)
+
+
+def render_number_frequency(path, label, numbers, counts, title, figsize):
+    """号码出现频率柱状图"""
+    import seaborn as sns
+    fig = new_figure(figsize)
+    ax = fig.add_subplot()
+    data = pd.DataFrame({label: numbers, '出现频率': counts})
+    sns.barplot(x=label, y='出现频率', data=data, hue=label, palette='coolwarm', legend=False, ax=ax)
+    style_axes(ax, title, label, '出现次数', grid_axis='y')
+    ax.tick_params(axis='x', labelrotation=0)
+    return save_figure(fig, path)
+
+
+def render_sales_by_day(path, days, values):
+    """不同开奖日平均销售额对比图"""
+    fig = new_figure((10, 6))
+    ax = fig.add_subplot()
+    pd.Series(values, index=days).plot(kind='bar', color=['skyblue', 'lightgreen', 'salmon'], ax=ax)
+    style_axes(ax, '不同开奖日平均销售额对比', '开奖日', '平均销售额(元)', grid_axis='y')
+    ax.tick_params(axis='x', labelrotation=0)
+    return save_figure(fig, path)
+
+
+def render_numbers_by_day(path, label, numbers, counts_by_day, figsize):
+    """各开奖日号码分布（每个开奖日一个子图，排成一行）"""
+    import seaborn as sns
+    fig = new_figure(figsize)
+    axes = fig.subplots(1, len(counts_by_day))
+    for ax, (day, counts) in zip(axes, counts_by_day.items()):
+        data = pd.DataFrame({label: numbers, '出现频率': counts})
+        sns.barplot(x=label, y='出现频率', data=data, hue=label, palette='coolwarm', legend=False, ax=ax)
+        style_axes(ax, f'{day} - {label}分布', label, '出现次数', title_size=14, grid_axis='y')
+    return save_figure(fig, path)
+
+
+def render_scatter(path, data, x, y, title):
+    """散点图"""
+    import seaborn as sns
+    fig = new_figure((10, 6))
+    ax = fig.add_subplot()
+    sns.scatterplot(data=data, x=x, y=y, ax=ax)
+    ax.set_title(title)
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    return save_figure(fig, path)
+
+
+def run_chart_job(job):
+    """执行单个图表任务 (说明, 渲染函数, 参数)，返回 (说明, 输出路径, 耗时秒)"""
+    description, func, kwargs = job
+    start = time.perf_counter()
+    path = func(**kwargs)
+    return description, path, time.perf_counter() - start
+
+
+def record_render(description, path, seconds):
+    """记录图表渲染耗时并打印保存信息"""
+    REGISTRY.observe("chart_render_seconds", seconds, chart=os.path.basename(path))
+    log_event("chart_rendered", chart=description, path=path, seconds=round(seconds, 6))
+    print(f"[图表] {description}已保存: {path}")
+
+
+def submit_chart(jobs, description, func, **kwargs):
+    """jobs 为 None 时立即渲染，否则加入任务列表稍后统一渲染"""
+    job = (description, func, kwargs)
+    if jobs is None:
+        record_render(*run_chart_job(job))
+    else:
+        jobs.append(job)
+
+
+def render_charts(jobs, workers=None):
+    """并行渲染一批相互独立的图表任务；workers=1 时在当前进程内顺序渲染"""
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [run_chart_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_chart_job, jobs))
+    for result in results:
+        record_render(*result)
+    return [path for _, path, _ in results]
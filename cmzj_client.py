@@ -0,0 +1,116 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from urllib3.util.retry import Retry
+from http_crawler import create_session
+from rate_limit import HostRateLimiter
+from metrics import REGISTRY, log_event
+
+# 彩民之家专家接口，可通过环境变量指向本地桩服务器
+CMZJ_API_URL = os.environ.get("CMZJ_API_URL", "https://i.cmzj.net")
+
+# 定义请求头（host 由 requests 根据 URL 自动填写）
+HEADERS = {
+    'accept': '*/*',
+    'accept-encoding': 'gzip, deflate, br, zstd',
+    'accept-language': 'zh-CN,zh;q=0.9,en;q=0.8,en-GB;q=0.7,en-US;q=0.6',
+    'authorization_code': '',  # 如果有的话，填入授权码
+    'connection': 'keep-alive',
+    'origin': 'https://www.cmzj.net',
+    'referer': 'https://www.cmzj.net/',
+    'sec-ch-ua': '"Not)A;Brand";v="8", "Chromium";v="138", "Microsoft Edge";v="138"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"Windows"',
+    'sec-fetch-dest': 'empty',
+    'sec-fetch-mode': 'cors',
+    'sec-fetch-site': 'same-site',
+    'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36 Edg/138.0.0.0'
+}
+
+
+def create_cmzj_session(pool_size=8, retries=3, backoff=0.5):
+    """创建专家接口会话：连接池复用 + 429/5xx 指数退避重试（遵循 Retry-After）"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return create_session(pool_size=pool_size, headers=HEADERS, retries=retry)
+
+
+def parse_expert(expert_data):
+    """解析单个专家的基本信息和表现"""
+    return {
+        '专家ID': expert_data['data']['expertId'],
+        '姓名': expert_data['data']['name'],
+        '彩龄': expert_data['data']['age'],  # 彩龄
+        '发文量': expert_data['data']['articles'],  # 发文量
+        '大乐透中奖次数': expert_data['data']['dltOne'],  # 大乐透中奖次数
+    }
+
+
+def fetch_expert(session, expert_id, base_url=None, timeout=10, limiter=None, cache=None):
+    """获取单个专家的 JSON 数据，失败时打印原因并返回 None
+
+    提供 cache 时：新鲜条目直接返回；过期条目带 If-None-Match / If-Modified-Since 重新验证，
+    服务器返回 304 时沿用缓存内容。
+    """
+    entry = cache.get(expert_id) if cache is not None else None
+    if entry and entry["fresh"]:
+        cache.record_hit(expert_id, entry)
+        REGISTRY.inc("cmzj_cache_total", result="hit")
+        return json.loads(entry["body"])
+
+    url = f"{base_url or CMZJ_API_URL}/expert/queryExpertById"
+    if limiter is not None:
+        limiter.acquire(url)
+    headers = cache.conditional_headers(entry) if cache is not None else {}
+    start = time.perf_counter()
+    try:
+        response = session.get(url, params={'expertId': expert_id}, headers=headers, timeout=timeout)
+    except Exception as e:
+        REGISTRY.inc("cmzj_http_errors_total")
+        log_event("cmzj_request_failed", expert_id=expert_id, error=str(e))
+        print(f"专家ID {expert_id} 请求异常: {e}")
+        return None
+    seconds = time.perf_counter() - start
+    REGISTRY.observe("cmzj_http_request_seconds", seconds, status=response.status_code)
+    log_event("cmzj_request", expert_id=expert_id, status=response.status_code, seconds=round(seconds, 6),
+              bytes=len(response.content))
+
+    if response.status_code == 304 and entry:
+        cache.record_hit(expert_id, entry, revalidated=True)
+        REGISTRY.inc("cmzj_cache_total", result="revalidated")
+        return json.loads(entry["body"])
+    if response.status_code == 200:
+        if cache is not None:
+            REGISTRY.inc("cmzj_cache_total", result="miss")
+            cache.put(expert_id, response.content, response.headers.get("ETag"),
+                      response.headers.get("Last-Modified"))
+        return response.json()  # 获取JSON格式的数据
+    print(f"专家ID {expert_id} 请求失败，状态码: {response.status_code}")
+    return None
+
+
+def fetch_experts(expert_ids, max_workers=8, rate_limit=10.0, timeout=10, retries=3, base_url=None,
+                  cache=None):
+    """并发获取一批专家数据，按 expert_ids 的顺序返回 DataFrame（失败的专家被跳过）"""
+    session = create_cmzj_session(pool_size=max_workers, retries=retries)
+    limiter = HostRateLimiter(rate_limit) if rate_limit else None
+
+    def fetch_one(expert_id):
+        return fetch_expert(session, expert_id, base_url, timeout, limiter, cache)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(fetch_one, expert_ids))
+    finally:
+        session.close()
+
+    expert_data_list = [parse_expert(data) for data in results if data is not None]
+    return pd.DataFrame(expert_data_list)
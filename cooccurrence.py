@@ -0,0 +1,94 @@
+from functools import lru_cache
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from draw_matrix import one_hot, as_draw_arrays
+from games import get_game
+
+# 整体构建时每批处理的期数（三元组的中间数组为 pool×批大小×pool，分批以限制内存占用）
+BUILD_CHUNK = 4096
+
+
+@lru_cache(maxsize=None)
+def triple_indices(pool):
+    """所有 i<j<k 的下标三元组（按列返回三个数组）"""
+    return tuple(np.array(list(combinations(range(pool), 3)), dtype=np.intp).T)
+
+
+class CooccurrenceCounter:
+    """号码共现计数：pool×pool 两两共现矩阵与（可选）三元组计数，支持逐期 O(1) 增量更新
+
+    pairs[i, j] 为号码 i+1 与 j+1 同期开出的次数，对角线为单个号码的出现次数；
+    triples[i, j, k] 同理（只在 i<j<k 的位置读取）。
+    """
+
+    def __init__(self, pool, track_triples=True):
+        self.pool = pool
+        self.draws = 0
+        self.pairs = np.zeros((pool, pool), dtype=np.int64)
+        self.triples = np.zeros((pool, pool, pool), dtype=np.int64) if track_triples else None
+
+    @classmethod
+    def from_matrix(cls, matrix, pool, track_triples=True):
+        """由 N×pick 号码矩阵整体构建：两两共现为 HᵀH，三元组为按号码加权的 HᵀH 堆叠"""
+        counter = cls(pool, track_triples)
+        counter.draws = len(matrix)
+        for start in range(0, len(matrix), BUILD_CHUNK):
+            hot = one_hot(matrix[start:start + BUILD_CHUNK], pool).astype(np.float64)
+            counter.pairs += np.rint(hot.T @ hot).astype(np.int64)
+            if track_triples:
+                # triples[i] = Hᵀ diag(H[:, i]) H，每批一次批量矩阵乘法完成
+                weighted = hot.T[:, :, None] * hot[None, :, :]
+                counter.triples += np.rint(np.matmul(weighted.transpose(0, 2, 1), hot)).astype(np.int64)
+        return counter
+
+    def update(self, numbers):
+        """加入一期开奖号码（号码从 1 开始），只更新该期涉及的 pick² / pick³ 个格子"""
+        idx = np.asarray(numbers, dtype=np.intp) - 1
+        self.pairs[np.ix_(idx, idx)] += 1
+        if self.triples is not None:
+            self.triples[np.ix_(idx, idx, idx)] += 1
+        self.draws += 1
+
+    def top_pairs(self, k=20):
+        """共现次数最多的 k 个号码对"""
+        i, j = np.triu_indices(self.pool, 1)
+        counts = self.pairs[i, j]
+        order = np.argsort(-counts, kind='stable')[:k]
+        return pd.DataFrame({'号码1': i[order] + 1, '号码2': j[order] + 1, '共现次数': counts[order]})
+
+    def top_triples(self, k=20):
+        """共现次数最多的 k 个三元组"""
+        if self.triples is None:
+            raise ValueError("未开启三元组统计")
+        i, j, l = triple_indices(self.pool)
+        counts = self.triples[i, j, l]
+        order = np.argsort(-counts, kind='stable')[:k]
+        return pd.DataFrame({'号码1': i[order] + 1, '号码2': j[order] + 1, '号码3': l[order] + 1,
+                             '共现次数': counts[order]})
+
+
+def build_cooccurrence(draws, history=True, by_day=True, track_triples=True):
+    """全部历史及各开奖日子集的共现计数：返回 {'全部'|'周一'|...: (前区计数器, 后区计数器)}
+
+    只统计号码互不相同的号码区（按位开奖的号码区及不存在的后区为 None）；history / by_day 控制是否包含
+    全部历史与各开奖日子集，track_triples 控制前区是否统计三元组。
+    """
+    draws = as_draw_arrays(draws)
+    game = get_game(draws.game)
+    subsets = {'全部': np.ones(len(draws), dtype=bool)} if history else {}
+    if by_day:
+        weekday = draws.weekday()
+        for day, name in game.weekday_names().items():
+            subsets[name] = weekday == day
+
+    def counter(matrix, zone, triples):
+        if zone is None or not zone.combinable:
+            return None
+        return CooccurrenceCounter.from_matrix(matrix, zone.high, triples and zone.pick >= 3)
+
+    return {
+        name: (counter(draws.front[mask], game.front, track_triples),
+               counter(draws.back[mask], game.back, False))
+        for name, mask in subsets.items()
+    }
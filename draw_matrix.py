@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+from games import DLT, get_game
+
+# 大乐透号码规则：前区 35 选 5，后区 12 选 2（其他彩种见 games.py）
+FRONT_POOL, FRONT_PICK = DLT.front.high, DLT.front.pick
+BACK_POOL, BACK_PICK = DLT.back.high, DLT.back.pick
+
+
+def parse_number_column(column, width):
+    """将逗号分隔的号码列一次性解析为 N×width 的 uint8 矩阵"""
+    values = list(column)
+    if not values or not width:
+        return np.zeros((len(values), width), dtype=np.uint8)
+    flat = np.array(','.join(values).split(','), dtype=np.uint8)
+    return flat.reshape(len(values), width)
+
+
+def format_number_column(matrix):
+    """将号码矩阵还原为逗号分隔的两位数字符串列表"""
+    return [','.join(f'{n:02d}' for n in row) for row in matrix.tolist()]
+
+
+def to_bitmask(matrix, low=1):
+    """号码矩阵转位掩码：号码 n 对应第 n-low 位（大乐透前区 35 位、后区 12 位）"""
+    bits = np.left_shift(np.uint64(1), matrix.astype(np.uint64) - np.uint64(low))
+    return np.bitwise_or.reduce(bits, axis=1) if len(matrix) else np.zeros(0, dtype=np.uint64)
+
+
+# 0..255 每个字节中 1 的个数，用于不支持 np.bitwise_count 的 numpy 版本
+BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(masks):
+    """逐元素统计 uint64 位掩码中 1 的个数"""
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks)
+    return BYTE_POPCOUNT[masks.view(np.uint8)].reshape(*masks.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+
+def one_hot(matrix, pool, low=1):
+    """号码矩阵转 N×(pool-low+1) 的 0/1 矩阵（第 n-low 列表示号码 n 是否开出）"""
+    hot = np.zeros((len(matrix), pool - low + 1), dtype=np.uint8)
+    hot[np.arange(len(matrix))[:, None], matrix.astype(np.intp) - low] = 1
+    return hot
+
+
+def count_numbers(matrix, pool, low=1):
+    """统计号码 low..pool 各自出现的次数（含未出现的号码，计数为 0；按位开奖时重复号码分别计数）"""
+    return np.bincount(matrix.ravel(), minlength=pool + 1)[low:pool + 1]
+
+
+class DrawArrays:
+    """列式开奖数据：按期号升序（从早到晚）排列，号码以整数矩阵保存；game 为彩种代码（见 games.py）"""
+
+    def __init__(self, issue, date, front, back, sales, prize_pool, game=DLT.key):
+        self.issue = np.asarray(issue, dtype=np.int32)
+        self.date = np.asarray(date, dtype='datetime64[D]')
+        self.front = np.asarray(front, dtype=np.uint8)
+        self.back = np.asarray(back, dtype=np.uint8)
+        self.sales = np.asarray(sales, dtype=np.float64)
+        self.prize_pool = np.asarray(prize_pool, dtype=np.float64)
+        self.game = get_game(game).key
+
+    def __len__(self):
+        return len(self.issue)
+
+    @classmethod
+    def from_dataframe(cls, df, game=DLT):
+        """从爬虫输出的 DataFrame 构建（号码字符串只在此处解析一次）"""
+        game = get_game(game)
+        df = df.sort_values('期号')
+        return cls(
+            issue=df['期号'].astype(int).to_numpy(),
+            date=pd.to_datetime(df['开奖日期']).to_numpy().astype('datetime64[D]'),
+            front=parse_number_column(df['前区号码'], game.front.pick),
+            back=parse_number_column(df['后区号码'].fillna(''), game.back.pick if game.back else 0),
+            sales=pd.to_numeric(df['总销售额(元)']).to_numpy(dtype=np.float64),
+            prize_pool=pd.to_numeric(df['奖池奖金(元)']).to_numpy(dtype=np.float64),
+            game=game.key,
+        )
+
+    def to_dataframe(self):
+        """还原为与爬虫输出一致的 DataFrame（按期号降序）"""
+        digits = get_game(self.game).issue_digits
+        df = pd.DataFrame({
+            '期号': [f'{i:0{digits}d}' for i in self.issue.tolist()],
+            '开奖日期': pd.to_datetime(self.date).strftime('%Y-%m-%d'),
+            '前区号码': format_number_column(self.front),
+            '后区号码': format_number_column(self.back),
+            '总销售额(元)': self.sales,
+            '奖池奖金(元)': self.prize_pool,
+        })
+        return df.iloc[::-1].reset_index(drop=True)
+
+    def tail(self, n):
+        """取最近 n 期"""
+        return self[-n:] if n else self[:0]
+
+    def __getitem__(self, index):
+        return DrawArrays(self.issue[index], self.date[index], self.front[index], self.back[index],
+                          self.sales[index], self.prize_pool[index], self.game)
+
+    def weekday(self):
+        """开奖日是星期几（0=周一 ... 6=周日）"""
+        return (self.date.astype(np.int64) + 3) % 7
+
+    def front_mask(self):
+        """每期前区号码的位掩码（大乐透 35 位）"""
+        return to_bitmask(self.front, get_game(self.game).front.low)
+
+    def back_mask(self):
+        """每期后区号码的位掩码（大乐透 12 位）；没有后区的彩种抛出 ValueError"""
+        game = get_game(self.game)
+        if game.back is None:
+            raise ValueError(f"[错误] {game.name}没有后区号码")
+        return to_bitmask(self.back, game.back.low)
+
+    def save(self, path):
+        """保存为 .npz（二进制数组，读取时无需解析字符串）"""
+        np.savez(path, issue=self.issue, date=self.date.astype(np.int64), front=self.front,
+                 back=self.back, sales=self.sales, prize_pool=self.prize_pool, game=np.array(self.game))
+
+    @classmethod
+    def load(cls, path):
+        """从 save 保存的 .npz 文件读取（没有彩种信息的旧文件按大乐透处理）"""
+        with np.load(path) as data:
+            game = str(data['game']) if 'game' in data else DLT.key
+            return cls(data['issue'], data['date'].astype('datetime64[D]'), data['front'], data['back'],
+                       data['sales'], data['prize_pool'], game)
+
+
+def as_draw_arrays(draws, game=DLT):
+    """接受 DataFrame 或 DrawArrays，统一返回 DrawArrays（DataFrame 按 game 解析号码）"""
+    if isinstance(draws, DrawArrays):
+        return draws
+    return DrawArrays.from_dataframe(draws, game)
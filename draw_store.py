@@ -0,0 +1,114 @@
+import sqlite3
+import pandas as pd
+
+# 本地开奖数据库路径
+DEFAULT_DB_PATH = "dlt_draws.db"
+
+# 数据库列名与 DataFrame 中文列名的对应关系
+COLUMN_MAP = {
+    "issue": "期号",
+    "open_date": "开奖日期",
+    "front": "前区号码",
+    "back": "后区号码",
+    "sales": "总销售额(元)",
+    "prize_pool": "奖池奖金(元)",
+}
+
+INSERT_SQL = ("INSERT OR REPLACE INTO draws (issue, open_date, front, back, sales, prize_pool) "
+              "VALUES (?, ?, ?, ?, ?, ?)")
+
+
+def open_store(path=DEFAULT_DB_PATH):
+    """打开（必要时创建）以期号为主键的本地开奖数据库"""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS draws (
+            issue      TEXT PRIMARY KEY,
+            open_date  TEXT NOT NULL,
+            front      TEXT NOT NULL,
+            back       TEXT NOT NULL,
+            sales      REAL,
+            prize_pool REAL
+        )
+    """)
+    # 校验不合格的原始行及原因（见 draw_stream.py）
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS quarantine (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            issue       TEXT,
+            source      TEXT,
+            reasons     TEXT NOT NULL,
+            raw         TEXT NOT NULL,
+            captured_at TEXT NOT NULL
+        )
+    """)
+    conn.commit()
+    return conn
+
+
+def latest_period(conn):
+    """返回库中最新的期号，空库返回 None"""
+    row = conn.execute("SELECT MAX(issue) FROM draws").fetchone()
+    return row[0] if row else None
+
+
+def count_draws(conn):
+    """返回库中已存储的期数"""
+    return conn.execute("SELECT COUNT(*) FROM draws").fetchone()[0]
+
+
+def save_draws(conn, df):
+    """写入开奖数据（已存在的期号会被覆盖），返回新增期数"""
+    if df is None or df.empty:
+        return 0
+    before = count_draws(conn)
+    rows = df.rename(columns={v: k for k, v in COLUMN_MAP.items()})[list(COLUMN_MAP)]
+    rows = rows.astype(object).where(rows.notna(), None)
+    conn.executemany(INSERT_SQL, rows.itertuples(index=False, name=None))
+    conn.commit()
+    return count_draws(conn) - before
+
+
+def insert_rows(conn, rows):
+    """写入一批行字典（中文列名，已校验），不提交"""
+    conn.executemany(INSERT_SQL, ([row[v] for v in COLUMN_MAP.values()] for row in rows))
+
+
+def insert_quarantine(conn, records):
+    """写入一批隔离记录 (期号, 来源, 原因, 原始行 JSON, 时间)，不提交"""
+    conn.executemany(
+        "INSERT INTO quarantine (issue, source, reasons, raw, captured_at) VALUES (?, ?, ?, ?, ?)",
+        records,
+    )
+
+
+def load_quarantine(conn, limit=None):
+    """按时间倒序读取隔离记录"""
+    sql = "SELECT issue, source, reasons, raw, captured_at FROM quarantine ORDER BY id DESC"
+    params = ()
+    if limit:
+        sql += " LIMIT ?"
+        params = (int(limit),)
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def load_draws(conn, limit=None):
+    """按期号降序读取开奖数据；limit 指定只取最近若干期"""
+    sql = "SELECT issue, open_date, front, back, sales, prize_pool FROM draws ORDER BY issue DESC"
+    params = ()
+    if limit:
+        sql += " LIMIT ?"
+        params = (int(limit),)
+    df = pd.read_sql_query(sql, conn, params=params)
+    return df.rename(columns=COLUMN_MAP)
+
+
+def load_draws_after(conn, issue=None):
+    """按期号升序读取比 issue 更新的开奖数据（issue 为 None 时读取全部）"""
+    sql = "SELECT issue, open_date, front, back, sales, prize_pool FROM draws"
+    params = ()
+    if issue is not None:
+        sql += " WHERE issue > ?"
+        params = (str(issue),)
+    df = pd.read_sql_query(sql + " ORDER BY issue", conn, params=params)
+    return df.rename(columns=COLUMN_MAP)
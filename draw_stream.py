@@ -0,0 +1,196 @@
+"""开奖数据流式入库：爬虫逐页产出原始行 → 逐行校验 → 分批写入本地数据库
+
+- 爬虫以生成器按页产出原始行（文本，不做类型转换），整条链路只在内存中保留一页数据和一个写入批次，
+  占用与历史期数无关；
+- 校验阶段把原始行转换为规范化的行，不合格的行连同原因写入隔离表（quarantine），不影响同页其他行；
+- 写入器每累积 batch_size 行执行一次 executemany 并提交，出错中断时已校验的行仍会落库。
+
+校验规则（号码区与期号位数按彩种，见 games.py；以下为大乐透）：
+    期号        5 位数字，流中严格递减（爬取顺序为期号降序，重复期号同样被隔离）
+    开奖日期    可解析为 YYYY-MM-DD
+    前区号码    5 个互不相同的号码，范围 1–35
+    后区号码    2 个互不相同的号码，范围 1–12（没有后区的彩种必须为空）
+    金额        为空或可解析的非负数
+"""
+import re
+import json
+import math
+from datetime import datetime
+from games import DLT, get_game
+from draw_store import insert_rows, insert_quarantine, count_draws
+from metrics import REGISTRY, log_event
+
+# 每批写入的行数
+DEFAULT_BATCH_SIZE = 500
+
+
+def parse_numbers(text, zone):
+    """按号码区规则解析号码文本（逗号或空白分隔），返回 (两位数逗号分隔文本, 错误原因)"""
+    parts = [p for p in re.split(r"[,\s]+", str(text or "").strip()) if p]
+    if not all(p.isdigit() for p in parts):
+        return None, f"{zone.name}含非数字: {text!r}"
+    numbers = [int(p) for p in parts]
+    if len(numbers) != zone.pick:
+        return None, f"{zone.name}应为 {zone.pick} 个号码，实际 {len(numbers)} 个: {text!r}"
+    if zone.distinct and len(set(numbers)) != zone.pick:
+        return None, f"{zone.name}号码重复: {text!r}"
+    out_of_range = [n for n in numbers if not zone.low <= n <= zone.high]
+    if out_of_range:
+        return None, f"{zone.name}号码超出 {zone.low}–{zone.high}: {out_of_range}"
+    return ",".join(f"{n:02d}" for n in numbers), None
+
+
+def parse_money(value, label):
+    """解析金额（数值或带逗号的文本），返回 (浮点数或 None, 错误原因)"""
+    if value is None or isinstance(value, float) and math.isnan(value):
+        return None, None
+    text = str(value).strip().replace(",", "")
+    if not text:
+        return None, None
+    try:
+        amount = float(text)
+    except ValueError:
+        return None, f"{label}无法解析: {value!r}"
+    if amount < 0 or math.isnan(amount):
+        return None, f"{label}无效: {value!r}"
+    return amount, None
+
+
+def validate_row(raw, previous_issue=None, game=DLT):
+    """按彩种规则校验并规范化一行原始数据，返回 (行字典, 原因列表)；不合格时行字典为 None
+
+    previous_issue 为流中上一条合格行的期号，用于检查期号严格递减。
+    """
+    game = get_game(game)
+    cells = raw.get("列数")
+    if cells is not None and cells < game.min_cells:
+        return None, [f"表格列数不足: {cells} < {game.min_cells}"]
+
+    reasons = []
+    issue = str(raw.get("期号") or "").strip()
+    if not (len(issue) == game.issue_digits and issue.isdigit()):
+        reasons.append(f"期号格式错误: {issue!r}")
+    elif previous_issue is not None and issue >= previous_issue:
+        reasons.append(f"期号未严格递减: {issue} 不早于上一期 {previous_issue}")
+
+    date = str(raw.get("开奖日期") or "").strip()[:10]
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        reasons.append(f"开奖日期无法解析: {raw.get('开奖日期')!r}")
+
+    front, reason = parse_numbers(raw.get("前区号码"), game.front)
+    reasons += [reason] if reason else []
+    if game.back is not None:
+        back, reason = parse_numbers(raw.get("后区号码"), game.back)
+        reasons += [reason] if reason else []
+    else:
+        back = ""
+        if str(raw.get("后区号码") or "").strip():
+            reasons.append(f"{game.name}没有后区，但后区号码不为空: {raw.get('后区号码')!r}")
+    sales, reason = parse_money(raw.get("总销售额(元)"), "销售额")
+    reasons += [reason] if reason else []
+    prize_pool, reason = parse_money(raw.get("奖池奖金(元)"), "奖池奖金")
+    reasons += [reason] if reason else []
+
+    if reasons:
+        return None, reasons
+    return {
+        "期号": issue,
+        "开奖日期": date,
+        "前区号码": front,
+        "后区号码": back,
+        "总销售额(元)": sales,
+        "奖池奖金(元)": prize_pool,
+    }, []
+
+
+def validate_rows(rows, on_reject=None, ordered=True, game=DLT):
+    """按彩种规则校验行流（生成器）：产出合格的行，不合格的行交给 on_reject(raw, reasons)
+
+    ordered=False 时不检查期号顺序（例如并发回填时各页到达顺序不定）。
+    """
+    game = get_game(game)
+    previous, valid, rejected = None, 0, 0
+    try:
+        for raw in rows:
+            row, reasons = validate_row(raw, previous if ordered else None, game)
+            if reasons:
+                rejected += 1
+                if on_reject is not None:
+                    on_reject(raw, reasons)
+                else:
+                    print(f"[警告] 丢弃第 {raw.get('期号')!r} 期: {'; '.join(reasons)}")
+                continue
+            valid += 1
+            previous = row["期号"]
+            yield row
+    finally:
+        REGISTRY.inc("dlt_rows_validated_total", valid, result="valid", game=game.key)
+        REGISTRY.inc("dlt_rows_validated_total", rejected, result="quarantined", game=game.key)
+
+
+class BatchWriter:
+    """分批写入器：合格行与隔离行各自累积到 batch_size 后一次写入并提交
+
+    用法:
+        with BatchWriter(conn, source="http") as writer:
+            for row in validate_rows(rows, writer.reject):
+                writer.write(row)
+    """
+
+    def __init__(self, conn, batch_size=DEFAULT_BATCH_SIZE, source=""):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.source = source
+        self.rows = []
+        self.rejected = []
+        self.written = 0
+        self.quarantined = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # 出错中断时也提交已校验的行
+        self.flush()
+
+    def write(self, row):
+        """加入一条合格行，返回该行"""
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+        return row
+
+    def reject(self, raw, reasons):
+        """加入一条隔离行及原因"""
+        print(f"[隔离] 第 {raw.get('期号')!r} 期数据不合格: {'; '.join(reasons)}")
+        self.rejected.append((str(raw.get("期号") or ""), self.source, "; ".join(reasons),
+                              json.dumps(raw, ensure_ascii=False, default=str),
+                              datetime.now().isoformat(timespec="seconds")))
+        if len(self.rejected) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """写入并提交当前批次"""
+        if not self.rows and not self.rejected:
+            return
+        insert_rows(self.conn, self.rows)
+        insert_quarantine(self.conn, self.rejected)
+        self.conn.commit()
+        self.written += len(self.rows)
+        self.quarantined += len(self.rejected)
+        self.rows, self.rejected = [], []
+
+
+def store_stream(conn, rows, batch_size=DEFAULT_BATCH_SIZE, source="", ordered=True, game=DLT):
+    """校验原始行流并分批写入数据库，返回 {"written": 写入行数, "added": 新增期数, "quarantined": 隔离行数}"""
+    before = count_draws(conn)
+    with BatchWriter(conn, batch_size, source) as writer:
+        for row in validate_rows(rows, writer.reject, ordered, game):
+            writer.write(row)
+    stats = {"written": writer.written, "added": count_draws(conn) - before, "quarantined": writer.quarantined}
+    log_event("stream_stored", source=source, game=get_game(game).key, **stats)
+    if writer.quarantined:
+        print(f"[隔离] 共 {writer.quarantined} 行不合格数据已写入隔离表 quarantine")
+    return stats
@@ -0,0 +1,175 @@
+"""开奖结果轮询服务：开奖夜按较短间隔检查最新开奖，发现新一期立即写入本地数据库
+
+优先使用 HTTP 接口；接口失败或指定 --engine selenium 时，从常驻浏览器池借出已预热的实例，
+只读取开奖页面首页（不点击“近100期”、不翻页、没有固定等待），省去每次冷启动浏览器的开销。
+浏览器只用于开奖表格列布局已核实的彩种（games.py 中 table_verified），其余彩种只使用 HTTP 接口。
+
+用法:
+    python draw_watcher.py                                   # 持续轮询
+    python draw_watcher.py --once                            # 只检查一次（适合 cron 调用）
+    python draw_watcher.py --engine selenium --pool-size 2
+    python draw_watcher.py --game pl3                        # 其他彩种（开奖页面、开奖日与开奖时刻取自 games.py）
+"""
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+import pandas as pd
+from draw_store import open_store, latest_period, count_draws
+from draw_stream import BatchWriter, validate_rows
+from games import GAMES, DLT, get_game
+from metrics import REGISTRY, configure as configure_metrics, log_event, timer, write_prometheus
+
+# 彩种开奖日的开奖时刻后 DRAW_WINDOW_HOURS 小时内按短间隔轮询（大乐透每周一、三、六 21:25 开奖）
+DRAW_WINDOW_HOURS = 3
+
+# 轮询间隔（秒）：开奖时段 / 其他时段
+DEFAULT_INTERVAL = 60
+DEFAULT_IDLE_INTERVAL = 1800
+
+
+def draw_datetime(day, game=DLT):
+    """某天的开奖时刻"""
+    return datetime(day.year, day.month, day.day, *get_game(game).draw_time)
+
+
+def in_draw_window(now=None, game=DLT):
+    """当前是否处于开奖后的短间隔轮询时段"""
+    game = get_game(game)
+    now = now or datetime.now()
+    start = draw_datetime(now, game)
+    return now.weekday() in game.draw_weekdays and start <= now < start + timedelta(hours=DRAW_WINDOW_HOURS)
+
+
+def scrape_latest_draws(driver, game=DLT, timeout=15):
+    """读取彩种开奖页面首页的开奖表格（已在该页面时直接刷新），返回原始行列表"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from table_parser import ROW_XPATH, iter_draw_table
+
+    game = get_game(game)
+    game.require_table_layout()
+    url = game.page_url
+    with timer("dlt_page_load_seconds", event="page_load", engine="selenium", step="poll"):
+        if driver.current_url.rstrip("/") == url.rstrip("/"):
+            driver.refresh()
+        else:
+            driver.get(url)
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.XPATH, ROW_XPATH)))
+    with timer("dlt_page_extract_seconds", event="page_extract", engine="selenium"):
+        return list(iter_draw_table(driver.find_element(By.CLASS_NAME, "flcp").get_attribute("outerHTML"), game))
+
+
+def poll_once(conn, engine="http", get_pool=None, game=DLT):
+    """检查一次彩种最新开奖并写入新增期数，返回新增期数（获取失败时为 None）"""
+    game = get_game(game)
+    start = time.perf_counter()
+    latest = latest_period(conn)
+    raw_rows, used = None, engine
+    if engine == "http":
+        from http_crawler import iter_draw_rows_http
+        try:
+            raw_rows = list(iter_draw_rows_http(latest, game=game))
+        except Exception as e:
+            print(f"[错误] HTTP 接口增量请求失败: {e}")
+            if get_pool is not None:
+                print("[回退] HTTP 接口获取失败，改用浏览器池")
+    if raw_rows is None and get_pool is not None:
+        used = "selenium"
+        try:
+            with get_pool().acquire() as driver:
+                raw_rows = scrape_latest_draws(driver, game)
+        except Exception as e:
+            print(f"[错误] 浏览器读取开奖页面失败: {e}")
+        if raw_rows is not None and latest:
+            issues = [row["期号"] for row in raw_rows if row["期号"]]
+            if issues and not any(issue <= latest for issue in issues):
+                print(f"[警告] 首页未包含本地最新期号 {latest}，中间可能存在缺失，请运行 main.py crawl 补齐")
+            raw_rows = [row for row in raw_rows if not row["期号"] or row["期号"] > latest]
+    if raw_rows is None:
+        REGISTRY.inc("watcher_poll_failures_total", engine=used)
+        return None
+
+    before = count_draws(conn)
+    with BatchWriter(conn, source=used) as writer:
+        new_rows = [writer.write(row) for row in validate_rows(raw_rows, writer.reject, game=game)]
+    added = count_draws(conn) - before
+    seconds = time.perf_counter() - start
+    REGISTRY.observe("watcher_poll_seconds", seconds, engine=used)
+    REGISTRY.inc("watcher_draws_stored_total", added, engine=used)
+    # 空库首次填充时不逐期报告
+    now = datetime.now()
+    for row in new_rows if latest else []:
+        # 开奖时刻到写入本地库的时间差
+        lag = (now - draw_datetime(pd.Timestamp(row["开奖日期"]), game)).total_seconds()
+        REGISTRY.observe("watcher_publish_to_store_seconds", max(lag, 0.0))
+        log_event("draw_stored", issue=row["期号"], engine=used, poll_seconds=round(seconds, 3),
+                  publish_to_store_seconds=round(lag, 1))
+        print(f"[新开奖] {game.name}第 {row['期号']} 期已写入（开奖后 {lag / 60:.1f} 分钟，本次轮询 {seconds:.2f}s）")
+    log_event("poll_finished", engine=used, added=added, seconds=round(seconds, 3))
+    return added
+
+
+def watch(db_path=None, engine="http", interval=DEFAULT_INTERVAL, idle_interval=DEFAULT_IDLE_INTERVAL,
+          driver_path=None, pool_size=1, max_uses=50, max_memory_mb=1024, once=False, game=DLT):
+    """持续轮询彩种最新开奖（db_path 默认 <彩种>_draws.db）；engine="selenium" 时启动即预热浏览器池，
+    HTTP 模式下首次回退时才创建"""
+    from browser_pool import BrowserPool
+
+    game = get_game(game)
+    if engine == "selenium":
+        game.require_table_layout()
+    conn = open_store(db_path or game.db_path)
+    pool = None
+
+    def get_pool():
+        nonlocal pool
+        if pool is None:
+            pool = BrowserPool(driver_path, size=pool_size, max_uses=max_uses, max_memory_mb=max_memory_mb).warm()
+        return pool
+
+    try:
+        if engine == "selenium":
+            get_pool()
+        while True:
+            added = poll_once(conn, engine, get_pool if driver_path and game.table_verified else None, game)
+            if added:
+                print(f"[存储] {game.name}新增 {added} 期，本地共 {count_draws(conn)} 期")
+            write_prometheus()
+            if once:
+                return added
+            time.sleep(interval if in_draw_window(game=game) else idle_interval)
+    except KeyboardInterrupt:
+        print("\n[停止] 轮询服务已停止")
+    finally:
+        if pool is not None:
+            pool.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    from main import chrome_driver_path
+
+    parser = argparse.ArgumentParser(description="开奖结果轮询服务")
+    parser.add_argument("--game", choices=list(GAMES), default="dlt", help="彩种")
+    parser.add_argument("--db", default=None, help="本地开奖数据库路径（默认 <彩种>_draws.db）")
+    parser.add_argument("--engine", choices=("http", "selenium"), default="http", help="首选获取方式")
+    parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL, help="开奖时段轮询间隔（秒）")
+    parser.add_argument("--idle-interval", type=int, default=DEFAULT_IDLE_INTERVAL, help="其他时段轮询间隔（秒）")
+    parser.add_argument("--driver", default=chrome_driver_path, help="ChromeDriver 路径")
+    parser.add_argument("--pool-size", type=int, default=1, help="浏览器池大小")
+    parser.add_argument("--max-uses", type=int, default=50, help="单个浏览器实例最多使用次数")
+    parser.add_argument("--max-memory", type=int, default=1024, help="单个浏览器实例内存上限（MB）")
+    parser.add_argument("--once", action="store_true", help="只检查一次")
+    parser.add_argument("--metrics-log", default=None, help="结构化 JSON 日志文件")
+    parser.add_argument("--metrics-file", default=None, help="Prometheus 文本格式指标文件")
+    args = parser.parse_args()
+
+    configure_metrics(args.metrics_log, args.metrics_file)
+    try:
+        watch(args.db, args.engine, args.interval, args.idle_interval, args.driver, args.pool_size,
+              args.max_uses, args.max_memory, args.once, args.game)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
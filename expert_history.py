@@ -0,0 +1,124 @@
+import sqlite3
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+# 专家快照库路径
+DEFAULT_HISTORY_PATH = "expert_history.db"
+
+# 排名使用的时间窗口（天）
+DEFAULT_WINDOWS = (7, 30, 90)
+
+# Wilson 下界的置信系数（95%）
+WILSON_Z = 1.96
+
+
+def open_history(path=DEFAULT_HISTORY_PATH):
+    """打开（必要时创建）只追加写入的专家快照库"""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS expert_snapshots (
+            expert_id   INTEGER NOT NULL,
+            captured_at TEXT NOT NULL,
+            name        TEXT,
+            age         INTEGER,
+            articles    INTEGER,
+            dlt_wins    INTEGER,
+            PRIMARY KEY (expert_id, captured_at)
+        )
+    """)
+    conn.commit()
+    return conn
+
+
+def record_snapshots(conn, expert_df, captured_at=None):
+    """把一次抓取的 expert_df 以同一时间戳追加到快照库，返回写入条数"""
+    if expert_df is None or expert_df.empty:
+        return 0
+    captured_at = captured_at or datetime.now().isoformat(timespec='seconds')
+    rows = [(int(r['专家ID']), captured_at, r['姓名'], int(r['彩龄']), int(r['发文量']), int(r['大乐透中奖次数']))
+            for r in expert_df.to_dict('records')]
+    conn.executemany(
+        "INSERT OR IGNORE INTO expert_snapshots (expert_id, captured_at, name, age, articles, dlt_wins) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    return len(rows)
+
+
+def load_window(conn, since):
+    """只读取 since 之后的快照，以及每个专家在 since 之前的最后一条快照（作为窗口基线）"""
+    sql = """
+        SELECT expert_id, captured_at, name, articles, dlt_wins FROM expert_snapshots
+        WHERE captured_at >= :since
+        UNION ALL
+        SELECT s.expert_id, s.captured_at, s.name, s.articles, s.dlt_wins
+        FROM expert_snapshots s
+        JOIN (SELECT expert_id, MAX(captured_at) AS captured_at FROM expert_snapshots
+              WHERE captured_at < :since GROUP BY expert_id) b
+          ON s.expert_id = b.expert_id AND s.captured_at = b.captured_at
+    """
+    df = pd.read_sql_query(sql, conn, params={"since": since})
+    df['captured_at'] = pd.to_datetime(df['captured_at'])
+    return df.sort_values(['captured_at', 'expert_id'], kind='stable').reset_index(drop=True)
+
+
+def wilson_lower_bound(wins, trials, z=WILSON_Z):
+    """二项比例的 Wilson 置信下界：样本少的"运气好"专家会被压低"""
+    wins = np.asarray(wins, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = wins / trials
+        denom = 1 + z * z / trials
+        centre = p + z * z / (2 * trials)
+        margin = z * np.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials))
+        bound = (centre - margin) / denom
+    return np.where(trials > 0, np.clip(bound, 0, 1), 0.0)
+
+
+def rank_experts(conn, windows=DEFAULT_WINDOWS, now=None):
+    """按时间窗口计算每位专家的新增发文、新增中奖、每篇中奖数与 Wilson 下界，并按最长窗口排名"""
+    now = pd.Timestamp(now or datetime.now())
+    longest = max(windows)
+    snapshots = load_window(conn, (now - timedelta(days=longest)).isoformat(timespec='seconds'))
+    if snapshots.empty:
+        return pd.DataFrame()
+
+    latest = snapshots.groupby('expert_id', sort=True).last()
+    earliest = snapshots.groupby('expert_id', sort=True).first()
+    ranking = pd.DataFrame({
+        '专家ID': latest.index,
+        '姓名': latest['name'].to_numpy(),
+        '最新发文量': latest['articles'].to_numpy(),
+        '最新中奖次数': latest['dlt_wins'].to_numpy(),
+    })
+    ranking['累计每篇中奖'] = (ranking['最新中奖次数'] / ranking['最新发文量'].replace(0, np.nan)).fillna(0.0)
+
+    for w in windows:
+        # 每位专家在 (最新时间 - w 天) 时刻或之前的最后一条快照作为基线，没有则取窗口内最早一条
+        targets = pd.DataFrame({'expert_id': latest.index,
+                                'target': latest['captured_at'].to_numpy() - np.timedelta64(w, 'D')})
+        base = pd.merge_asof(targets.sort_values('target'), snapshots, left_on='target', right_on='captured_at',
+                             by='expert_id', direction='backward').set_index('expert_id').reindex(latest.index)
+        base_articles = base['articles'].fillna(earliest['articles']).to_numpy()
+        base_wins = base['dlt_wins'].fillna(earliest['dlt_wins']).to_numpy()
+
+        new_articles = np.maximum(ranking['最新发文量'].to_numpy() - base_articles, 0)
+        new_wins = np.maximum(ranking['最新中奖次数'].to_numpy() - base_wins, 0)
+        ranking[f'近{w}天新增发文'] = new_articles.astype(np.int64)
+        ranking[f'近{w}天新增中奖'] = new_wins.astype(np.int64)
+        ranking[f'近{w}天每篇中奖'] = np.divide(new_wins, new_articles, out=np.zeros(len(new_wins)),
+                                           where=new_articles > 0)
+        ranking[f'近{w}天中奖率下限'] = wilson_lower_bound(np.minimum(new_wins, new_articles), new_articles)
+
+    # 相邻快照之间每篇中奖数的波动：波动大说明成绩集中在少数时段
+    snapshots = snapshots.sort_values(['expert_id', 'captured_at'], kind='stable')
+    diffs = snapshots.groupby('expert_id')[['articles', 'dlt_wins']].diff()
+    rates = (diffs['dlt_wins'] / diffs['articles'].where(diffs['articles'] > 0))
+    ranking['每篇中奖波动'] = rates.groupby(snapshots['expert_id']).std().reindex(latest.index).fillna(0).to_numpy()
+
+    key = f'近{longest}天中奖率下限'
+    ranking = ranking.sort_values([key, f'近{longest}天新增中奖'], ascending=False, kind='stable')
+    ranking.insert(0, '排名', np.arange(1, len(ranking) + 1))
+    return ranking.reset_index(drop=True)
@@ -0,0 +1,156 @@
+"""专家推荐号码与真实开奖结果的批量比对
+
+推荐号码与开奖号码都转换为位掩码（前区 35 位、后区 12 位），按期号用 searchsorted 连接，
+命中数为两个掩码按位与后的 1 的个数；复式推荐（多于 5+2 个号码）按其中最好的一注计奖级。
+号码缺失、不是整数或超出号码区范围（前区 1-35、后区 1-12）的推荐不参与比对，打印警告后跳过；
+奖级按大乐透规则，其他彩种的开奖数据抛出 ValueError。
+
+用法:
+    python expert_picks.py --picks 专家推荐.csv --draws dlt_draws.npz
+    python expert_picks.py --fetch --draws dlt_draws.npz
+"""
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from draw_matrix import DrawArrays, popcount
+from games import DLT
+from simulate import TIER_TABLE, PRIZE_TIERS, require_dlt
+from cmzj_client import CMZJ_API_URL, create_cmzj_session
+from rate_limit import HostRateLimiter
+
+# 专家推荐列表接口（路径与返回结构以实际抓包为准，返回 data: [{issue, front, back}, ...]）
+PICKS_PATH = "/expert/queryExpertPredict"
+
+PICK_COLUMNS = ['专家ID', '期号', '前区号码', '后区号码']
+
+
+def parse_pick_masks(column, zone=DLT.front):
+    """将号码字符串列（空格或逗号分隔，个数不限）批量转换为 uint64 位掩码，返回 (掩码, 是否合格)
+
+    缺失、含非整数或超出 zone.low..zone.high 的号码的推荐不合格，其掩码为 0。
+    """
+    tokens = pd.Series(column, copy=False, dtype=object).reset_index(drop=True)
+    tokens = tokens.str.strip().str.split(r'[\s,]+', regex=True).explode()
+    tokens = tokens[tokens != '']
+    numbers = pd.to_numeric(tokens, errors='coerce')
+    in_range = numbers.between(zone.low, zone.high) & (numbers % 1 == 0)
+
+    valid = np.zeros(len(column), dtype=bool)
+    valid[numbers.index.to_numpy()] = True
+    valid[numbers.index[~in_range.to_numpy()].to_numpy()] = False
+
+    # 按位或天然去重：同一推荐内的重复号码只计一次
+    numbers = numbers[in_range.to_numpy() & valid[numbers.index.to_numpy()]]
+    bits = np.left_shift(np.uint64(1), (numbers.to_numpy() - zone.low).astype(np.uint64))
+    masks = np.zeros(len(column), dtype=np.uint64)
+    np.bitwise_or.at(masks, numbers.index.to_numpy(), bits)
+    return masks, valid
+
+
+def score_picks(pick_issue, pick_front, pick_back, draws):
+    """按期号连接推荐与开奖结果，返回 (是否有开奖结果, 前区命中数, 后区命中数, 奖级序号)"""
+    require_dlt(draws, "推荐比对")
+    pick_issue = np.asarray(pick_issue, dtype=np.int32)
+    if len(draws) == 0:
+        # 没有开奖数据：全部推荐都未开奖
+        zeros = np.zeros(len(pick_issue), dtype=np.int8)
+        return np.zeros(len(pick_issue), dtype=bool), zeros, zeros.copy(), zeros.copy()
+    pos = np.clip(np.searchsorted(draws.issue, pick_issue), 0, len(draws) - 1)
+    matched = draws.issue[pos] == pick_issue
+
+    front_hits = np.where(matched, popcount(pick_front & draws.front_mask()[pos]), 0).astype(np.int8)
+    back_hits = np.where(matched, popcount(pick_back & draws.back_mask()[pos]), 0).astype(np.int8)
+    tier = np.where(matched, TIER_TABLE[front_hits, back_hits], 0)
+    return matched, front_hits, back_hits, tier
+
+
+def expert_tier_table(expert_ids, matched, front_hits, back_hits, tier):
+    """按专家汇总：已开奖推荐数、各奖级次数、平均命中数与中奖率"""
+    codes, experts = pd.factorize(pd.Series(expert_ids)[matched], sort=True)
+    n, n_tiers = len(experts), len(PRIZE_TIERS) + 1
+    counts = np.bincount(codes * n_tiers + tier[matched], minlength=n * n_tiers).reshape(n, n_tiers)
+    picks = counts.sum(axis=1)
+
+    table = pd.DataFrame({'专家ID': experts, '已开奖推荐数': picks})
+    for i, (name, _, _) in enumerate(PRIZE_TIERS, start=1):
+        table[name] = counts[:, i]
+    table['前区平均命中'] = np.bincount(codes, weights=front_hits[matched], minlength=n) / np.maximum(picks, 1)
+    table['后区平均命中'] = np.bincount(codes, weights=back_hits[matched], minlength=n) / np.maximum(picks, 1)
+    table['中奖率'] = 1 - counts[:, 0] / np.maximum(picks, 1)
+    return table.sort_values(['中奖率', '已开奖推荐数'], ascending=False, kind='stable').reset_index(drop=True)
+
+
+def score_expert_picks(picks, draws):
+    """对推荐 DataFrame（专家ID, 期号, 前区号码, 后区号码）逐条计分并生成专家奖级汇总表（不合格的推荐跳过）"""
+    require_dlt(draws, "推荐比对")
+    picks = picks.reset_index(drop=True)
+    issue = pd.to_numeric(picks['期号'], errors='coerce')
+    front, front_ok = parse_pick_masks(picks['前区号码'], DLT.front)
+    back, back_ok = parse_pick_masks(picks['后区号码'], DLT.back)
+    valid = front_ok & back_ok & (issue.notna() & (issue % 1 == 0)).to_numpy()
+    for expert_id, pick_issue, front_text, back_text in picks.loc[~valid, PICK_COLUMNS].itertuples(index=False,
+                                                                                                name=None):
+        print(f"[警告] 专家ID {expert_id} 第 {pick_issue!r} 期推荐不合格，已跳过: "
+              f"前区 {front_text!r} 后区 {back_text!r}")
+    if not valid.all():
+        print(f"[警告] 共 {int((~valid).sum())} 条推荐号码不合格，未参与比对")
+    picks = picks[valid].reset_index(drop=True)
+
+    matched, front_hits, back_hits, tier = score_picks(
+        issue[valid].astype(int).to_numpy(), front[valid], back[valid], draws)
+    scored = picks.assign(前区命中=front_hits, 后区命中=back_hits, 奖级=tier, 已开奖=matched)
+    return scored, expert_tier_table(picks['专家ID'].to_numpy(), matched, front_hits, back_hits, tier)
+
+
+def fetch_expert_picks(expert_ids, max_workers=8, rate_limit=10.0, base_url=None, timeout=10):
+    """从专家接口获取各专家的大乐透推荐号码，返回推荐 DataFrame"""
+    session = create_cmzj_session(pool_size=max_workers)
+    limiter = HostRateLimiter(rate_limit) if rate_limit else None
+    url = f"{base_url or CMZJ_API_URL}{PICKS_PATH}"
+
+    def fetch_one(expert_id):
+        if limiter is not None:
+            limiter.acquire(url)
+        try:
+            response = session.get(url, params={'expertId': expert_id, 'lotteryType': 'dlt'}, timeout=timeout)
+            response.raise_for_status()
+            return [(expert_id, str(p['issue']), p['front'], p['back']) for p in response.json().get('data') or []]
+        except Exception as e:
+            print(f"专家ID {expert_id} 推荐获取失败: {e}")
+            return []
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            rows = [row for rows in executor.map(fetch_one, expert_ids) for row in rows]
+    finally:
+        session.close()
+    return pd.DataFrame(rows, columns=PICK_COLUMNS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="专家推荐号码与开奖结果比对")
+    parser.add_argument("--draws", default="dlt_draws.npz", help="列式开奖数据（DrawArrays.save 输出）")
+    parser.add_argument("--picks", default=None, help="推荐号码 CSV（专家ID, 期号, 前区号码, 后区号码）")
+    parser.add_argument("--fetch", action="store_true", help="从专家接口获取推荐号码")
+    args = parser.parse_args()
+
+    if args.fetch:
+        from zhaunjia import expert_ids
+        picks = fetch_expert_picks(expert_ids)
+    elif args.picks and os.path.exists(args.picks):
+        picks = pd.read_csv(args.picks, dtype={'期号': str, '前区号码': str, '后区号码': str})
+    else:
+        parser.error("请通过 --picks 指定推荐号码文件，或使用 --fetch 从接口获取")
+
+    try:
+        scored, table = score_expert_picks(picks, DrawArrays.load(args.draws))
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    scored.to_csv("专家推荐命中明细.csv", index=False, encoding="utf-8-sig")
+    table.to_csv("专家推荐奖级汇总.csv", index=False, encoding="utf-8-sig")
+    print(table.head(20).to_string(index=False))
+    print("[数据] 比对结果已保存: 专家推荐命中明细.csv, 专家推荐奖级汇总.csv")
@@ -0,0 +1,177 @@
+"""彩种注册表：各彩种的开奖页面、接口编号、号码区规则与开奖表格列布局
+
+爬虫、校验、本地数据库与分析流程都按 Game 参数化；新增彩种只需在 GAMES 中登记。
+
+    dlt  大乐透  前区 35 选 5 + 后区 12 选 2        每周一、三、六开奖
+    ssq  双色球  红球 33 选 6 + 蓝球 16 选 1        每周二、四、日开奖
+    pl3  排列3   3 位数字，每位 0–9（可重复）        每天开奖
+    pl5  排列5   5 位数字，每位 0–9（可重复）        每天开奖
+    qxc  七星彩  前 6 位每位 0–9 + 后 1 位 0–14      每周二、五、日开奖
+
+HTTP 接口按字段名（frontWinningNum / backWinningNum 等）读取号码，与开奖表格的列布局无关；
+开奖表格的列布局只有大乐透经过核实（table_verified），其余彩种的列号仅用于 synthetic.py 生成的页面，
+这些彩种不支持 Selenium 表格爬取。
+"""
+
+# 星期编号（datetime.weekday()：0=周一 ... 6=周日）到中文名
+WEEKDAY_NAMES = {0: '周一', 1: '周二', 2: '周三', 3: '周四', 4: '周五', 5: '周六', 6: '周日'}
+
+# 开奖页面地址前缀
+ZHCW_KJXX_URL = "https://www.zhcw.com/kjxx/"
+
+# 销售额预测只使用此日期之前的历史数据（main.py 任务1 与 api_server.py 共用）
+SALES_CUTOFF_DATE = '2025-07-01'
+
+
+class Zone:
+    """号码区：每期开出 pick 个 low..high 之间的号码，distinct=False 表示按位开奖、号码可重复
+
+    key 用作输出文件前缀（red/blue），name 为中文名（如“前区”“红球”）；
+    column/css_class 为开奖表格中号码所在的列与 span 的 class，api_field 为接口中的字段名。
+    """
+
+    def __init__(self, key, name, pick, low, high, distinct=True, column=2, css_class="jqh",
+                 api_field="frontWinningNum"):
+        self.key = key
+        self.name = name
+        self.pick = pick
+        self.low = low
+        self.high = high
+        self.distinct = distinct
+        self.column = column
+        self.css_class = css_class
+        self.api_field = api_field
+
+    @property
+    def label(self):
+        """号码列的中文名，例如“前区号码”"""
+        return f"{self.name}号码"
+
+    @property
+    def size(self):
+        """可选号码个数"""
+        return self.high - self.low + 1
+
+    @property
+    def combinable(self):
+        """号码互不相同、从 1 开始（可以统计号码组合的共现）"""
+        return self.distinct and self.low == 1 and self.pick >= 2
+
+    def numbers(self):
+        """全部可选号码（升序）"""
+        return list(range(self.low, self.high + 1))
+
+
+class Game:
+    """彩种：接口编号、开奖页面、号码区与开奖表格列布局
+
+    front 为第一个号码区（存入“前区号码”列），back 为第二个号码区（存入“后区号码”列，没有时为 None）。
+    sales_column / prize_pool_column 为开奖表格中销售额与奖池所在的列，min_cells 为数据行至少的列数；
+    table_verified 表示这些列号已对照真实开奖页面核实，未核实的彩种不支持 Selenium 表格爬取。
+    """
+
+    def __init__(self, key, name, lottery_id, front, back=None, issue_digits=5, draw_weekdays=tuple(range(7)),
+                 draw_time=(21, 25), draw_gap_days=1, operator="中国体彩网", min_cells=14, sales_column=4,
+                 prize_pool_column=13, table_verified=False, output_dir=None):
+        self.key = key
+        self.name = name
+        self.lottery_id = lottery_id
+        self.front = front
+        self.back = back
+        self.issue_digits = issue_digits
+        self.draw_weekdays = tuple(draw_weekdays)
+        self.draw_time = draw_time
+        self.draw_gap_days = draw_gap_days
+        self.operator = operator
+        self.min_cells = min_cells
+        self.sales_column = sales_column
+        self.prize_pool_column = prize_pool_column
+        self.table_verified = table_verified
+        self.output_dir = output_dir or key
+
+    @property
+    def zones(self):
+        """全部号码区"""
+        return (self.front,) if self.back is None else (self.front, self.back)
+
+    @property
+    def page_url(self):
+        """中彩网开奖页面"""
+        return f"{ZHCW_KJXX_URL}{self.key}/"
+
+    @property
+    def db_path(self):
+        """默认的本地开奖数据库路径"""
+        return f"{self.key}_draws.db"
+
+    def require_table_layout(self):
+        """开奖表格列布局未核实时抛出 ValueError（Selenium 表格爬取前调用；HTTP 接口不读表格列，不受影响）"""
+        if not self.table_verified:
+            raise ValueError(f"[错误] {self.name}开奖表格的列布局未核实，不支持 Selenium 爬取，请使用 HTTP 接口")
+
+    def weekday_names(self):
+        """开奖日 {星期编号: 中文名}"""
+        return {day: WEEKDAY_NAMES[day] for day in self.draw_weekdays}
+
+
+def digit_zone(pick, high=9, key="red", name="开奖", column=2, css_class="jqh", api_field="frontWinningNum"):
+    """按位开奖的号码区（每位 0..high，可重复）"""
+    return Zone(key, name, pick, 0, high, distinct=False, column=column, css_class=css_class,
+                api_field=api_field)
+
+
+DLT = Game(
+    "dlt", "大乐透", "281",
+    front=Zone("red", "前区", 5, 1, 35, column=2, css_class="jqh"),
+    back=Zone("blue", "后区", 2, 1, 12, column=3, css_class="jql", api_field="backWinningNum"),
+    draw_weekdays=(0, 2, 5), draw_gap_days=2,
+    # 列布局与原 Selenium 爬虫一致（号码在第 3、4 列，销售额第 5 列，奖池第 14 列）
+    table_verified=True,
+    # 大乐透的输出保持在当前目录（与单彩种时的文件位置一致）
+    output_dir=".",
+)
+
+SSQ = Game(
+    "ssq", "双色球", "1",
+    front=Zone("red", "红球", 6, 1, 33, column=2, css_class="jqh"),
+    back=Zone("blue", "蓝球", 1, 1, 16, column=2, css_class="jql", api_field="backWinningNum"),
+    issue_digits=7, draw_weekdays=(1, 3, 6), draw_time=(21, 15), draw_gap_days=2, operator="中国福彩网",
+    min_cells=10, sales_column=3, prize_pool_column=9,
+)
+
+PL3 = Game(
+    "pl3", "排列3", "283",
+    front=digit_zone(3),
+    min_cells=6, sales_column=3, prize_pool_column=5,
+)
+
+PL5 = Game(
+    "pl5", "排列5", "284",
+    front=digit_zone(5),
+    min_cells=6, sales_column=3, prize_pool_column=5,
+)
+
+QXC = Game(
+    "qxc", "七星彩", "287",
+    front=digit_zone(6, name="前区"),
+    back=digit_zone(1, high=14, key="blue", name="后区", column=2, css_class="jql", api_field="backWinningNum"),
+    draw_weekdays=(1, 4, 6), draw_gap_days=2,
+    min_cells=10, sales_column=3, prize_pool_column=9,
+)
+
+GAMES = {game.key: game for game in (DLT, SSQ, PL3, PL5, QXC)}
+
+
+def get_game(game):
+    """按彩种代码（或 Game 对象）取得 Game"""
+    if isinstance(game, Game):
+        return game
+    try:
+        return GAMES[game]
+    except KeyError:
+        raise ValueError(f"[错误] 未知彩种: {game}（可选: {', '.join(GAMES)}）")
+
+
+def select_games(key):
+    """命令行 --game 参数对应的彩种列表："all" 表示全部"""
+    return list(GAMES.values()) if key == "all" else [get_game(key)]
@@ -0,0 +1,175 @@
+import os
+import re
+import json
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from rate_limit import HostRateLimiter
+from metrics import REGISTRY, timer, log_event
+from games import DLT, get_game
+
+# 中彩网开奖页面表格背后的 JSONP 数据接口，可通过环境变量指向本地桩服务器
+ZHCW_API_URL = os.environ.get("ZHCW_API_URL", "https://jc.zhcw.com/port/client_json.php")
+
+# 大乐透在接口中的彩种编号（其他彩种见 games.py）
+DLT_LOTTERY_ID = DLT.lottery_id
+
+# 每页条数（与网页表格一致）
+PAGE_SIZE = 30
+
+HTTP_HEADERS = {
+    'accept': '*/*',
+    'accept-language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'connection': 'keep-alive',
+    'referer': 'https://www.zhcw.com/',
+    'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+def create_session(pool_size=10, headers=None, retries=0):
+    """创建带连接池（keep-alive 复用）的 requests 会话
+
+    retries 可以是重试次数或 urllib3 的 Retry 对象。
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(headers or HTTP_HEADERS)
+    return session
+
+
+def parse_jsonp(text):
+    """解析 JSONP（或纯 JSON）响应为字典"""
+    text = text.strip()
+    match = re.match(r'^[\w$.]+\((.*)\)\s*;?$', text, re.S)
+    if match:
+        text = match.group(1)
+    return json.loads(text)
+
+
+def build_params(page_num, page_size=PAGE_SIZE, issue_count=100, lottery_id=DLT_LOTTERY_ID,
+                 start_issue=None, end_issue=None):
+    """构造接口查询参数：默认按最近 N 期查询，指定 start_issue/end_issue 时按期号区间查询"""
+    by_range = bool(start_issue or end_issue)
+    return {
+        'callback': 'jQuery_dlt',
+        'transactionType': '10001001',
+        'lotteryId': lottery_id,
+        'issueCount': '' if by_range else str(issue_count),
+        'startIssue': start_issue or '',
+        'endIssue': end_issue or '',
+        'startDate': '',
+        'endDate': '',
+        'type': '1' if by_range else '0',
+        'pageNum': str(page_num),
+        'pageSize': str(page_size),
+        'tt': '0.5',
+        '_': str(int(time.time() * 1000)),
+    }
+
+
+def fetch_page(session, params, base_url=None, timeout=10, limiter=None):
+    """请求单页开奖数据，返回解析后的 JSON 字典"""
+    url = base_url or ZHCW_API_URL
+    if limiter is not None:
+        limiter.acquire(url)
+    start = time.perf_counter()
+    try:
+        response = session.get(url, params=params, timeout=timeout)
+    except Exception:
+        REGISTRY.inc("zhcw_http_errors_total")
+        raise
+    REGISTRY.observe("zhcw_http_request_seconds", time.perf_counter() - start, status=response.status_code)
+    response.raise_for_status()
+    with timer("dlt_page_extract_seconds", engine="http"):
+        payload = parse_jsonp(response.text)
+    if payload.get("resCode") not in (None, "000000"):
+        raise ValueError(f"接口返回错误: {payload.get('resCode')} {payload.get('message')}")
+    return payload
+
+
+def parse_amount(text):
+    """将金额文本（可能带逗号）转换为浮点数，空值返回 None"""
+    text = str(text or "").strip().replace(",", "")
+    return float(text) if text else None
+
+
+def raw_record(record, game=DLT):
+    """将接口返回的单条记录转换为与网页表格列名一致的原始行（类型转换与校验由 draw_stream 完成）"""
+    game = get_game(game)
+    return {
+        "期号": str(record.get("issue") or "").strip(),
+        "开奖日期": str(record.get("openTime") or "").strip(),
+        "前区号码": record.get(game.front.api_field),
+        "后区号码": record.get(game.back.api_field) if game.back else "",
+        "总销售额(元)": record.get("saleMoney"),
+        "奖池奖金(元)": record.get("prizePoolMoney"),
+    }
+
+
+def record_crawl(engine, rows, pages, seconds, game=DLT.key):
+    """记录一次爬取的行数、页数与每秒行数"""
+    rows_per_second = rows / seconds if seconds > 0 else 0.0
+    REGISTRY.inc("dlt_crawl_rows_total", rows, engine=engine, game=game)
+    REGISTRY.inc("dlt_crawl_pages_total", pages, engine=engine, game=game)
+    REGISTRY.set_gauge("dlt_crawl_rows_per_second", round(rows_per_second, 3), engine=engine, game=game)
+    log_event("crawl_finished", engine=engine, game=game, rows=rows, pages=pages, seconds=round(seconds, 3),
+              rows_per_second=round(rows_per_second, 3))
+
+
+def iter_draw_rows_http(latest_period=None, issue_count=100, base_url=None, session=None,
+                        page_size=PAGE_SIZE, game=DLT, max_workers=1, rate_limit=None):
+    """按页流式产出原始行（生成器）：从最新一页向后翻页，遇到不晚于 latest_period 的期号即停止
+
+    latest_period 为 None 时产出最近 issue_count 期。max_workers>1 时由线程池预取后续至多 max_workers 页
+    （仍按页码顺序产出，停止时取消未完成的请求），rate_limit 为每个主机每秒最多请求数（None 表示不限速）。
+    """
+    game = get_game(game)
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_size=max(10, max_workers))
+    limiter = HostRateLimiter(rate_limit) if rate_limit else None
+    executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+
+    def fetch(page_num):
+        return fetch_page(session, build_params(page_num, page_size, issue_count, game.lottery_id), base_url,
+                          limiter=limiter)
+
+    start = time.perf_counter()
+    rows, page, total_pages = 0, 1, 1
+    pending = {}
+    reached_known = False
+    try:
+        while page <= total_pages and not reached_known:
+            if executor is None:
+                payload = fetch(page)
+            else:
+                for ahead in range(page, min(page + max_workers, total_pages + 1)):
+                    if ahead not in pending:
+                        pending[ahead] = executor.submit(fetch, ahead)
+                payload = pending.pop(page).result()
+            total_pages = int(payload.get("pages") or 1)
+            records = payload.get("data") or []
+            if not records:
+                break
+            for record in records:
+                row = raw_record(record, game)
+                if latest_period and row["期号"] and row["期号"] <= latest_period:
+                    reached_known = True
+                    break
+                rows += 1
+                yield row
+            page += 1
+
+        if latest_period and not reached_known:
+            print(f"[警告] {game.name}最近 {issue_count} 期内未找到本地最新期号 {latest_period}，中间可能存在缺失")
+        if latest_period:
+            print(f"[增量] {game.name}本地最新期号 {latest_period}，获取到 {rows} 期更新的数据")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        record_crawl("http", rows, min(page, total_pages), time.perf_counter() - start, game.key)
+        if own_session:
+            session.close()
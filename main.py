@@ -1,60 +1,116 @@
+"""彩票开奖数据爬取与分析（默认大乐透，彩种定义见 games.py）
+
+用法:
+    python main.py                 # 增量爬取 + 分析 + 生成报告（完整流程）
+    python main.py --game ssq      # 双色球（dlt / ssq / pl3 / pl5 / qxc）
+    python main.py --game all      # 全部彩种：并发爬取，每个彩种一个进程并行分析
+    python main.py crawl           # 只增量爬取并写入本地数据库
+    python main.py crawl --workers 4 --rate 5            # 并发预取页面，每秒最多 5 次请求
+    python main.py analyze         # 基于本地数据库分析并生成图表
+    python main.py report          # 基于本地数据库生成分析报告（不渲染图表）
+    python main.py analyze --input dlt_100_periods.csv   # 离线分析已保存的数据文件（不启动爬虫）
+    python main.py experts         # 专家数据获取与排名
+
+selenium、sklearn、matplotlib/seaborn 等导入耗时较长的依赖只在用到它们的函数内部导入，
+各子命令只加载自身需要的模块（启动耗时见 bench_startup.py）。
+"""
 import os
 import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import pandas as pd
 import numpy as np
-import matplotlib
-import matplotlib.pyplot as plt
-import seaborn as sns
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException
-from sklearn.linear_model import LinearRegression
 from datetime import datetime, timedelta
-import matplotlib.font_manager as fm
-
-# 设置中文字体支持
-plt.rcParams['font.sans-serif'] = ['SimHei']  # 用来正常显示中文标签
-plt.rcParams['axes.unicode_minus'] = False  # 用来正常显示负号
+from draw_store import DEFAULT_DB_PATH, open_store, latest_period, load_draws, count_draws
+from draw_matrix import DrawArrays, as_draw_arrays, count_numbers
+from games import GAMES, DLT, SALES_CUTOFF_DATE, get_game, select_games
+from number_stats import number_stats_table
+from cooccurrence import build_cooccurrence
+from offline import read_draw_file, file_digest, source_digest
+from pipeline import Pipeline, DEFAULT_CACHE_DIR
+from metrics import (REGISTRY, configure as configure_metrics, timer, log_event,
+                     profiled, write_prometheus)
+from charts import (submit_chart, render_charts, render_sales_trend, render_sales_prediction,
+                    render_number_frequency, render_sales_by_day, render_numbers_by_day)
 
 # 设置 ChromeDriver 路径
 chrome_driver_path = r"C:\chromedriver-win64\chromedriver.exe"
 
 
-def crawl_dlt_data():
-    """爬取大乐透开奖数据"""
-    if not os.path.exists(chrome_driver_path):
-        raise FileNotFoundError(f"[错误] ChromeDriver 不存在，请下载并放置到路径: {chrome_driver_path}")
+def update_draw_store(conn, engine="http", game=DLT, max_workers=1, rate_limit=None):
+    """增量更新某彩种的本地开奖数据库：流式爬取比库中最新期号更新的开奖数据，逐行校验后分批写入，返回新增期数
+
+    max_workers/rate_limit 仅对 HTTP 引擎生效：并发预取后续页面的线程数与每个主机每秒最多请求数。
+    Selenium 爬取中途出错时打印原因，返回出错前已提交的新增期数。
+    """
+    from draw_stream import store_stream
+
+    latest = latest_period(conn)
+    stats = None
+    if engine == "http":
+        from http_crawler import iter_draw_rows_http
+        try:
+            rows = iter_draw_rows_http(latest, game=game, max_workers=max_workers, rate_limit=rate_limit)
+            stats = store_stream(conn, rows, source="http", game=game)
+        except Exception as e:
+            print(f"[错误] {game.name} HTTP 接口增量请求失败: {e}")
+            if game.table_verified:
+                print("[回退] HTTP 接口获取失败，改用 Selenium 浏览器爬取")
+    if stats is None:
+        # 开奖表格列布局未核实的彩种不能使用 Selenium 表格爬取
+        game.require_table_layout()
+        rows = iter_draw_rows_selenium(stop_at_period=latest, game=game)
+        if latest:
+            # 只保留更新的期号；期号缺失等不合格的行交给校验阶段隔离
+            rows = (row for row in rows if not row["期号"] or row["期号"] > latest)
+        before = count_draws(conn)
+        try:
+            stats = store_stream(conn, rows, source="selenium", game=game)
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            # 出错前已校验的批次已提交，报告部分写入的期数
+            added = count_draws(conn) - before
+            print(f"[错误] {game.name} Selenium 爬取中断: {e}")
+            print(f"[存储] {game.name}中断前已新增 {added} 期，本地共 {count_draws(conn)} 期")
+            return added
+
+    print(f"[存储] {game.name}新增 {stats['added']} 期，本地共 {count_draws(conn)} 期")
+    return stats["added"]
 
-    options = webdriver.ChromeOptions()
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--disable-infobars")
-    options.add_argument("--disable-extensions")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--headless=new")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
 
-    service = Service(executable_path=chrome_driver_path)
-    service.log_path = "chromedriver.log"
+def iter_draw_rows_selenium(stop_at_period=None, game=DLT):
+    """使用 Selenium 浏览器逐页产出某彩种开奖表格的原始行（生成器）
+
+    指定 stop_at_period 时，翻页到包含该期号（或更早期号）的页面后即停止。
+    出错时打印原因、保存截图后重新抛出异常。
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from table_parser import iter_draw_table
+    from http_crawler import record_crawl
+    from browser_pool import create_driver
+
+    game.require_table_layout()
+    if not os.path.exists(chrome_driver_path):
+        raise FileNotFoundError(f"[错误] ChromeDriver 不存在，请下载并放置到路径: {chrome_driver_path}")
 
     try:
-        driver = webdriver.Chrome(service=service, options=options)
+        driver = create_driver(chrome_driver_path)
         print("[成功] 浏览器启动成功")
+        crawl_start = time.perf_counter()
 
-        url = "https://www.zhcw.com/kjxx/dlt/"
-        driver.get(url)
-        print(f"[访问] 正在加载 URL: {url}")
+        url = game.page_url
+        with timer("dlt_page_load_seconds", event="page_load", engine="selenium", step="initial"):
+            driver.get(url)
+            print(f"[访问] 正在加载 URL: {url}")
 
-        # 增加等待时间和更多容错处理
-        wait = WebDriverWait(driver, 30)
+            # 增加等待时间和更多容错处理
+            wait = WebDriverWait(driver, 30)
 
-        # 等待页面加载完成
-        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "flcp")))
+            # 等待页面加载完成
+            wait.until(EC.presence_of_element_located((By.CLASS_NAME, "flcp")))
         print("[成功] 页面加载完成")
 
         # 点击"近100期"按钮
@@ -83,7 +139,7 @@ def crawl_dlt_data():
         except Exception as e:
             print(f"[警告] 无法点击'近100期'按钮: {e}")
             print("[尝试] 直接访问100期URL...")
-            driver.get("https://www.zhcw.com/kjxx/dlt/?kjData=100")
+            driver.get(f"{url}?kjData=100")
             wait.until(EC.presence_of_element_located((By.CLASS_NAME, "flcp")))
             print("[成功] 已加载100期数据")
 
@@ -98,8 +154,8 @@ def crawl_dlt_data():
             print(f"[警告] 无法获取总页数: {e}, 默认使用1页")
             total_pages = 1
 
-        # 提取所有页面数据
-        all_data = []
+        # 逐页提取并产出数据，内存中只保留当前页
+        rows = 0
 
         for page in range(1, total_pages + 1):
             print(f"[提取] 正在处理第 {page}/{total_pages} 页...")
@@ -115,107 +171,93 @@ def crawl_dlt_data():
                     driver.execute_script("arguments[0].scrollIntoView();", page_link)
                     time.sleep(1)
                     # 点击页码
-                    page_link.click()
-                    print(f"[操作] 已跳转到第 {page} 页")
-
-                    # 等待加载完成 - 等待当前页码变为激活状态
-                    wait.until(
-                        EC.presence_of_element_located((By.XPATH, f'//li[@class="active"]/a[text()="{page}"]'))
-                    )
+                    with timer("dlt_page_load_seconds", event="page_load", engine="selenium", step="paginate"):
+                        page_link.click()
+                        print(f"[操作] 已跳转到第 {page} 页")
+
+                        # 等待加载完成 - 等待当前页码变为激活状态
+                        wait.until(
+                            EC.presence_of_element_located((By.XPATH, f'//li[@class="active"]/a[text()="{page}"]'))
+                        )
                     time.sleep(2)  # 额外等待确保数据加载
                 except Exception as e:
                     print(f"[警告] 无法跳转到第 {page} 页: {e}")
                     continue
 
-            # 提取当前页数据
+            # 提取当前页数据：一次取回表格 HTML，在本地解析（避免逐个单元格的 WebDriver 往返）
             try:
-                # 获取表格中的所有行
-                rows = driver.find_elements(By.XPATH, '//div[@class="flcp"]//table//tbody//tr')
-                print(f"  找到 {len(rows)} 行数据")
-
-                for row in rows:
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    if len(cells) >= 14:  # 确保有足够的数据列
-                        # 提取各列数据
-                        period = cells[0].text.strip()
-                        date_text = cells[1].text.strip()
-
-                        # 清理日期文本（移除星期信息）
-                        date_str = date_text.split("（")[0].strip()
-
-                        # 提取前区号码
-                        red_balls = [span.text for span in cells[2].find_elements(By.CLASS_NAME, "jqh")]
-                        red_balls_str = ','.join(red_balls)
-
-                        # 提取后区号码
-                        blue_balls = [span.text for span in cells[3].find_elements(By.CLASS_NAME, "jql")]
-                        blue_balls_str = ','.join(blue_balls)
-
-                        sales = cells[4].text.strip().replace(",", "")
-                        prize_pool = cells[13].text.strip().replace(",", "")  # 奖池奖金在第14列
-
-                        all_data.append({
-                            "期号": period,
-                            "开奖日期": date_str,
-                            "前区号码": red_balls_str,
-                            "后区号码": blue_balls_str,
-                            "总销售额(元)": float(sales) if sales else None,
-                            "奖池奖金(元)": float(prize_pool) if prize_pool else None
-                        })
+                with timer("dlt_page_extract_seconds", event="page_extract", engine="selenium",
+                           fields={"page": page}):
+                    table_html = driver.find_element(By.CLASS_NAME, "flcp").get_attribute("outerHTML")
+                    page_rows = list(iter_draw_table(table_html, game))
+                print(f"  找到 {len(page_rows)} 行数据")
 
             except Exception as e:
                 print(f"[警告] 第 {page} 页数据提取失败: {e}")
                 # 保存页面快照以便调试
-                driver.save_screenshot(f"page_{page}_error.png")
-                print(f"[已保存] 页面截图: page_{page}_error.png")
+                driver.save_screenshot(f"{game.key}_page_{page}_error.png")
+                print(f"[已保存] 页面截图: {game.key}_page_{page}_error.png")
+                continue
+
+            rows += len(page_rows)
+            yield from page_rows
 
-        if not all_data:
-            print("[错误] 未提取到任何数据")
-            return None
+            # 增量模式：已翻到本地已有的期号，无需继续翻页
+            if stop_at_period and any(row["期号"] and row["期号"] <= stop_at_period for row in page_rows):
+                print(f"[增量] 已到达本地最新期号 {stop_at_period}，停止翻页")
+                break
 
-        print(f"[成功] 总共提取到 {len(all_data)} 期开奖数据")
-        return pd.DataFrame(all_data)
+        print(f"[成功] 总共提取到 {rows} 行开奖数据")
+        record_crawl("selenium", rows, page, time.perf_counter() - crawl_start, game.key)
+        log_event("webdriver_rpcs", total=REGISTRY.total("webdriver_rpc_total"))
 
     except Exception as e:
         print(f"[错误] 浏览器启动或操作失败: {e}")
         if 'driver' in locals():
-            driver.save_screenshot("error_screenshot.png")
-            print("[已保存] 错误截图: error_screenshot.png")
-        return None
+            driver.save_screenshot(f"{game.key}_error_screenshot.png")
+            print(f"[已保存] 错误截图: {game.key}_error_screenshot.png")
+        raise
     finally:
         if 'driver' in locals():
             driver.quit()
             print("[完成] 浏览器已关闭")
 
 
-def analyze_sales_trend(df):
-    """任务1：分析销售额趋势并预测下一期销售额"""
-    print("\n===== 任务1：销售额趋势分析与预测 =====")
-
+def sales_history(df):
+    """截至 SALES_CUTOFF_DATE 的历史销售额（按日期升序的新 DataFrame，不修改传入的 df）"""
     # 转换日期格式
-    df['开奖日期'] = pd.to_datetime(df['开奖日期'])
-    df = df.sort_values('开奖日期')
+    df = df[['开奖日期', '总销售额(元)']].assign(开奖日期=pd.to_datetime(df['开奖日期']))
+    df = df.sort_values('开奖日期', kind='stable').reset_index(drop=True)
 
-    # 过滤截至2025年7月1日的数据
-    cutoff_date = pd.Timestamp('2025-07-01')
+    # 过滤截至 SALES_CUTOFF_DATE 的数据
+    cutoff_date = pd.Timestamp(SALES_CUTOFF_DATE)
     historical_df = df[df['开奖日期'] < cutoff_date]
 
     if len(historical_df) < 10:
         print("警告：历史数据不足，使用全部数据进行预测")
         historical_df = df
+    return historical_df
+
+
+def analyze_sales_trend(df, charts=None, game=DLT):
+    """任务1：分析销售额趋势并预测下一期销售额
+
+    charts 为列表时图表任务加入其中稍后统一渲染，为 None 时立即渲染。
+    """
+    return forecast_sales(sales_history(df), charts, game)
+
+
+def forecast_sales(historical_df, charts=None, game=DLT):
+    """基于 sales_history 的结果绘制趋势并用线性回归预测下一期销售额"""
+    from sklearn.linear_model import LinearRegression
+
+    game = get_game(game)
+    print("\n===== 任务1：销售额趋势分析与预测 =====")
 
     # 销售额趋势分析
-    plt.figure(figsize=(14, 7))
-    plt.plot(historical_df['开奖日期'], historical_df['总销售额(元)'] / 1e6, 'o-', label='实际销售额')
-    plt.title('大乐透总销售额趋势 (截至2025-07-01)', fontsize=15)
-    plt.xlabel('开奖日期', fontsize=12)
-    plt.ylabel('总销售额(百万元)', fontsize=12)
-    plt.grid(True, linestyle='--', alpha=0.7)
-    plt.xticks(rotation=45)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig('sales_trend.png')
-    print("[图表] 销售额趋势图已保存: sales_trend.png")
+    submit_chart(charts, "销售额趋势图", render_sales_trend, path='sales_trend.png',
+                 dates=historical_df['开奖日期'].tolist(), sales=historical_df['总销售额(元)'].tolist(),
+                 title=f'{game.name}总销售额趋势 (截至{SALES_CUTOFF_DATE})')
 
     # 销售额预测
     X = np.array(range(len(historical_df))).reshape(-1, 1)
@@ -225,129 +267,98 @@ def analyze_sales_trend(df):
     model = LinearRegression()
     model.fit(X, y)
 
-    # 预测下一期销售额
-    next_date = historical_df['开奖日期'].max() + timedelta(days=2)  # 大乐透开奖间隔通常为2-3天
+    # 预测下一期销售额（开奖间隔按彩种，大乐透通常为2-3天）
+    next_date = historical_df['开奖日期'].max() + timedelta(days=game.draw_gap_days)
     next_index = len(historical_df)
     next_sale = model.predict([[next_index]])[0]
 
-    # 绘制预测结果
-    plt.figure(figsize=(14, 7))
-    plt.plot(historical_df['开奖日期'], y / 1e6, 'o-', label='历史销售额')
-
-    # 预测点
-    plt.scatter([next_date], [next_sale / 1e6], color='red', s=100, label='预测销售额')
-
     # 预测趋势线
     future_dates = historical_df['开奖日期'].tolist() + [next_date]
     future_X = np.array(range(len(future_dates))).reshape(-1, 1)
     future_y = model.predict(future_X)
 
-    plt.plot(future_dates, future_y / 1e6, 'r--', label='预测趋势')
-
-    plt.title('大乐透总销售额趋势与预测', fontsize=15)
-    plt.xlabel('开奖日期', fontsize=12)
-    plt.ylabel('总销售额(百万元)', fontsize=12)
-    plt.grid(True, linestyle='--', alpha=0.7)
-    plt.xticks(rotation=45)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig('sales_prediction.png')
-    print("[图表] 销售额预测图已保存: sales_prediction.png")
+    # 绘制预测结果
+    submit_chart(charts, "销售额预测图", render_sales_prediction, path='sales_prediction.png',
+                 dates=historical_df['开奖日期'].tolist(), sales=y.tolist(), next_date=next_date,
+                 next_sale=next_sale, trend_dates=future_dates, trend_sales=future_y.tolist(),
+                 title=f'{game.name}总销售额趋势与预测')
 
     print(f"预测{next_date.strftime('%Y-%m-%d')}销售额: {next_sale:,.2f}元")
     return next_sale
 
 
-def number_frequency_analysis(df):
-    """任务2：号码频率统计与推荐"""
-    print("\n===== 任务2：号码频率分析与推荐 =====")
-
-    # 前区号码频率分析
-    red_numbers = []
-    for nums in df['前区号码']:
-        red_numbers.extend([int(num) for num in nums.split(',')])
-
-    # 后区号码频率分析
-    blue_numbers = []
-    for nums in df['后区号码']:
-        blue_numbers.extend([int(num) for num in nums.split(',')])
-
-    # 创建频率数据框
-    red_freq = pd.Series(red_numbers).value_counts().sort_index()
-    blue_freq = pd.Series(blue_numbers).value_counts().sort_index()
-
-    # 转换为DataFrame便于分析
-    red_df = pd.DataFrame({'前区号码': red_freq.index, '出现频率': red_freq.values})
-    blue_df = pd.DataFrame({'后区号码': blue_freq.index, '出现频率': blue_freq.values})
-
-    # 保存频率数据
-    red_df.to_csv('red_number_frequency.csv', index=False, encoding='utf_8_sig')
-    blue_df.to_csv('blue_number_frequency.csv', index=False, encoding='utf_8_sig')
-    print("[数据] 前区号码频率已保存: red_number_frequency.csv")
-    print("[数据] 后区号码频率已保存: blue_number_frequency.csv")
-
-    # 可视化前区号码频率
-    plt.figure(figsize=(14, 7))
-    sns.barplot(x='前区号码', y='出现频率', data=red_df, hue='前区号码', palette='coolwarm', legend=False)
-    plt.title('前区号码(1-35)出现频率', fontsize=15)
-    plt.xlabel('前区号码', fontsize=12)
-    plt.ylabel('出现次数', fontsize=12)
-    plt.xticks(rotation=0)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.tight_layout()
-    plt.savefig('red_number_frequency.png')
-    print("[图表] 前区号码频率图已保存: red_number_frequency.png")
-
-    # 可视化后区号码频率
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x='后区号码', y='出现频率', data=blue_df, hue='后区号码', palette='coolwarm', legend=False)
-    plt.title('后区号码(1-12)出现频率', fontsize=15)
-    plt.xlabel('后区号码', fontsize=12)
-    plt.ylabel('出现次数', fontsize=12)
-    plt.xticks(rotation=0)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.tight_layout()
-    plt.savefig('blue_number_frequency.png')
-    print("[图表] 后区号码频率图已保存: blue_number_frequency.png")
-
-    # 生成推荐号码
-    # 策略：选择高频号码，但避免全部选择最高频的号码
-    recommended_red = red_df.sort_values('出现频率', ascending=False).head(10).sample(5)['前区号码'].tolist()
-    recommended_blue = blue_df.sort_values('出现频率', ascending=False).head(5).sample(2)['后区号码'].tolist()
-
-    # 按数字大小排序
-    recommended_red.sort()
-    recommended_blue.sort()
-
-    print(f"推荐投注号码：前区 {recommended_red} + 后区 {recommended_blue}")
-    return recommended_red, recommended_blue
+def zone_matrices(draws, game):
+    """各号码区及其号码矩阵 [(Zone, N×pick 矩阵), ...]"""
+    return list(zip(game.zones, (draws.front, draws.back)))
 
 
-def day_of_week_analysis(df):
-    """任务3：不同开奖日分析"""
-    print("\n===== 任务3：开奖日对比分析 =====")
+def number_frequency_analysis(draws, charts=None, game=DLT):
+    """任务2：号码频率统计与推荐（draws 为 DrawArrays 或爬虫输出的 DataFrame）
 
-    # 转换日期并提取星期几
-    df['开奖日期'] = pd.to_datetime(df['开奖日期'])
-    df['星期'] = df['开奖日期'].dt.day_name()
+    返回各号码区的推荐号码 (前区, 后区)，没有后区的彩种后区为空列表。
+    """
+    print("\n===== 任务2：号码频率分析与推荐 =====")
+    draws = as_draw_arrays(draws, game)
+    game = get_game(draws.game)
+
+    recommended = []
+    for zone, matrix in zone_matrices(draws, game):
+        # 号码频率（对整数号码矩阵直接计数）
+        freq_df = pd.DataFrame({zone.label: zone.numbers(), '出现频率': count_numbers(matrix, zone.high, zone.low)})
+        freq_df.to_csv(f'{zone.key}_number_frequency.csv', index=False, encoding='utf_8_sig')
+        print(f"[数据] {zone.label}频率已保存: {zone.key}_number_frequency.csv")
+
+        # 多窗口频率、遗漏与冷热统计
+        number_stats_table(matrix, zone.high, zone.pick, label=zone.label, low=zone.low).to_csv(
+            f'{zone.key}_number_stats.csv', index=False, encoding='utf_8_sig')
+        print(f"[数据] {zone.label}遗漏与冷热统计已保存: {zone.key}_number_stats.csv")
+
+        # 可视化号码频率
+        submit_chart(charts, f"{zone.label}频率图", render_number_frequency,
+                     path=f'{zone.key}_number_frequency.png', label=zone.label, numbers=zone.numbers(),
+                     counts=freq_df['出现频率'].tolist(), title=f'{zone.label}({zone.low}-{zone.high})出现频率',
+                     figsize=(14, 7) if zone is game.front else (10, 6))
+
+        # 生成推荐号码
+        # 策略：选择高频号码，但避免全部选择最高频的号码
+        top = freq_df.sort_values('出现频率', ascending=False).head(max(2 * zone.pick, 5))
+        numbers = top.sample(min(zone.pick, len(top)))[zone.label].tolist()
+        # 按数字大小排序（按位开奖的号码保留位置顺序）
+        if zone.distinct:
+            numbers.sort()
+        recommended.append(numbers)
+
+    # 号码互不相同的号码区统计两两共现，前区另统计三元组共现
+    red_cooc, blue_cooc = build_cooccurrence(draws, by_day=False)['全部']
+    if red_cooc is not None:
+        red_cooc.top_pairs(20).to_csv('red_number_pairs.csv', index=False, encoding='utf_8_sig')
+        red_cooc.top_triples(20).to_csv('red_number_triples.csv', index=False, encoding='utf_8_sig')
+        print(f"[数据] {game.front.label}共现统计已保存: red_number_pairs.csv, red_number_triples.csv")
+    if blue_cooc is not None:
+        blue_cooc.top_pairs(20).to_csv('blue_number_pairs.csv', index=False, encoding='utf_8_sig')
+        print(f"[数据] {game.back.label}共现统计已保存: blue_number_pairs.csv")
+
+    print("推荐投注号码：" + " + ".join(f"{zone.name} {numbers}" for zone, numbers in zip(game.zones, recommended)))
+    recommended_red, recommended_blue = (recommended + [[]])[:2]
+    return recommended_red, recommended_blue
 
-    # 只保留周一、周三、周六
-    valid_days = ['Monday', 'Wednesday', 'Saturday']
-    df = df[df['星期'].isin(valid_days)]
 
-    # 中文星期名称映射
-    day_map = {
-        'Monday': '周一',
-        'Wednesday': '周三',
-        'Saturday': '周六'
-    }
-    df['星期'] = df['星期'].map(day_map)
+def day_of_week_analysis(draws, charts=None, game=DLT):
+    """任务3：不同开奖日分析（draws 为 DrawArrays 或爬虫输出的 DataFrame）"""
+    print("\n===== 任务3：开奖日对比分析 =====")
+    draws = as_draw_arrays(draws, game)
+    game = get_game(draws.game)
 
-    # 按星期分组
-    grouped = df.groupby('星期')
+    # 只保留该彩种的开奖日（大乐透 weekday: 0=周一, 2=周三, 5=周六）
+    day_map = game.weekday_names()
+    weekday = draws.weekday()
+    day_masks = {name: weekday == day for day, name in day_map.items() if (weekday == day).any()}
 
     # 销售额对比
-    sales_by_day = grouped['总销售额(元)'].mean()
+    sales_by_day = pd.Series(
+        {name: np.nanmean(draws.sales[mask]) for name, mask in day_masks.items()},
+        name='总销售额(元)',
+    ).rename_axis('星期')
 
     # 保存销售额对比数据
     sales_df = pd.DataFrame({
@@ -357,81 +368,40 @@ def day_of_week_analysis(df):
     sales_df.to_csv('sales_by_day.csv', index=False, encoding='utf_8_sig')
     print("[数据] 开奖日销售额对比已保存: sales_by_day.csv")
 
+    # 各开奖日各号码区两两共现（取前10，只统计号码互不相同的号码区）
+    cooc_by_day = build_cooccurrence(draws, history=False, track_triples=False)
+    for index, zone in enumerate(game.zones):
+        if not zone.combinable:
+            continue
+        pairs_by_day = pd.concat(
+            [cooc_by_day[day][index].top_pairs(10).assign(开奖日=day) for day in day_masks],
+            ignore_index=True,
+        )
+        pairs_by_day.to_csv(f'{zone.key}_pairs_by_day.csv', index=False, encoding='utf_8_sig')
+        print(f"[数据] 开奖日{zone.label}共现已保存: {zone.key}_pairs_by_day.csv")
+
     # 可视化销售额对比
-    plt.figure(figsize=(10, 6))
-    sales_by_day.plot(kind='bar', color=['skyblue', 'lightgreen', 'salmon'])
-    plt.title('不同开奖日平均销售额对比', fontsize=15)
-    plt.xlabel('开奖日', fontsize=12)
-    plt.ylabel('平均销售额(元)', fontsize=12)
-    plt.xticks(rotation=0)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.tight_layout()
-    plt.savefig('sales_by_day.png')
-    print("[图表] 开奖日销售额对比图已保存: sales_by_day.png")
-
-    # 号码分布分析
-    # 前区号码分布
-    fig, axes = plt.subplots(1, 3, figsize=(18, 6))
-
-    for i, day in enumerate(['周一', '周三', '周六']):
-        day_df = df[df['星期'] == day]
-
-        # 提取前区号码
-        red_numbers = []
-        for nums in day_df['前区号码']:
-            red_numbers.extend([int(num) for num in nums.split(',')])
-
-        # 统计频率
-        red_freq = pd.Series(red_numbers).value_counts().sort_index()
-        red_df = pd.DataFrame({'前区号码': red_freq.index, '出现频率': red_freq.values})
-
-        # 绘制分布图
-        ax = axes[i]
-        sns.barplot(x='前区号码', y='出现频率', data=red_df, hue='前区号码', palette='coolwarm', legend=False, ax=ax)
-        ax.set_title(f'{day} - 前区号码分布', fontsize=14)
-        ax.set_xlabel('前区号码', fontsize=12)
-        ax.set_ylabel('出现次数', fontsize=12)
-        ax.grid(axis='y', linestyle='--', alpha=0.7)
-
-    plt.tight_layout()
-    plt.savefig('red_number_by_day.png')
-    print("[图表] 开奖日前区号码分布图已保存: red_number_by_day.png")
-
-    # 后区号码分布
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-
-    for i, day in enumerate(['周一', '周三', '周六']):
-        day_df = df[df['星期'] == day]
-
-        # 提取后区号码
-        blue_numbers = []
-        for nums in day_df['后区号码']:
-            blue_numbers.extend([int(num) for num in nums.split(',')])
-
-        # 统计频率
-        blue_freq = pd.Series(blue_numbers).value_counts().sort_index()
-        blue_df = pd.DataFrame({'后区号码': blue_freq.index, '出现频率': blue_freq.values})
-
-        # 绘制分布图
-        ax = axes[i]
-        sns.barplot(x='后区号码', y='出现频率', data=blue_df, hue='后区号码', palette='coolwarm', legend=False, ax=ax)
-        ax.set_title(f'{day} - 后区号码分布', fontsize=14)
-        ax.set_xlabel('后区号码', fontsize=12)
-        ax.set_ylabel('出现次数', fontsize=12)
-        ax.grid(axis='y', linestyle='--', alpha=0.7)
-
-    plt.tight_layout()
-    plt.savefig('blue_number_by_day.png')
-    print("[图表] 开奖日后区号码分布图已保存: blue_number_by_day.png")
+    submit_chart(charts, "开奖日销售额对比图", render_sales_by_day, path='sales_by_day.png',
+                 days=sales_by_day.index.tolist(), values=sales_by_day.tolist())
+
+    # 号码分布分析：各开奖日各号码区的号码频率
+    no_draws = np.zeros(len(draws), dtype=bool)
+    for zone, matrix in zone_matrices(draws, game):
+        counts_by_day = {day: count_numbers(matrix[day_masks.get(day, no_draws)], zone.high, zone.low).tolist()
+                         for day in day_map.values()}
+        submit_chart(charts, f"开奖日{zone.label}分布图", render_numbers_by_day,
+                     path=f'{zone.key}_number_by_day.png', label=zone.label, numbers=zone.numbers(),
+                     counts_by_day=counts_by_day, figsize=(18, 6) if zone is game.front else (18, 5))
 
     return sales_by_day
 
 
-def generate_report(df, next_sale, recommended_red, recommended_blue):
+def generate_report(df, next_sale, recommended_red, recommended_blue, game=DLT):
     """生成分析报告"""
+    game = get_game(game)
     report = """
     ============================
-        大乐透数据分析报告
+        {game_name}数据分析报告
     ============================
 
     一、数据概况
@@ -450,26 +420,29 @@ def generate_report(df, next_sale, recommended_red, recommended_blue):
     三、号码频率分析
     -------------
     推荐投注号码:
-    前区: {red_numbers}
-    后区: {blue_numbers}
+{recommended}
 
     四、报告说明
     -------------
-    本报告基于中国体彩网公开数据分析生成
+    本报告基于{operator}公开数据分析生成
     生成时间: {report_time}
     """
 
     # 填充报告内容
+    dates = pd.to_datetime(df['开奖日期'])
+    recommended = [recommended_red, recommended_blue]
     report = report.format(
+        game_name=game.name,
         period_count=len(df),
-        start_date=df['开奖日期'].min().strftime('%Y-%m-%d'),
-        end_date=df['开奖日期'].max().strftime('%Y-%m-%d'),
+        start_date=dates.min().strftime('%Y-%m-%d'),
+        end_date=dates.max().strftime('%Y-%m-%d'),
         total_sales=df['总销售额(元)'].sum(),
         avg_sales=df['总销售额(元)'].mean(),
-        next_date=(df['开奖日期'].max() + timedelta(days=2)).strftime('%Y-%m-%d'),
+        next_date=(dates.max() + timedelta(days=game.draw_gap_days)).strftime('%Y-%m-%d'),
         next_sale=next_sale,
-        red_numbers=", ".join(map(str, recommended_red)),
-        blue_numbers=", ".join(map(str, recommended_blue)),
+        recommended="\n".join(f"    {zone.name}: {', '.join(map(str, numbers))}"
+                              for zone, numbers in zip(game.zones, recommended)),
+        operator=game.operator,
         report_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     )
 
@@ -481,32 +454,278 @@ def generate_report(df, next_sale, recommended_red, recommended_blue):
     print("\n[报告] 分析报告已保存: analysis_report.txt")
 
 
-if __name__ == "__main__":
-    # 1. 爬取大乐透数据
-    df = crawl_dlt_data()
+def load_analysis_data(db_path=DEFAULT_DB_PATH, limit=100, game=DLT):
+    """从本地数据库读取最近 limit 期，保存 CSV 与列式数据，返回 (df, draws)；库为空时返回 (None, None)"""
+    conn = open_store(db_path)
+    df = load_draws(conn, limit=limit) if count_draws(conn) else None
+    conn.close()
+    if df is None:
+        return None, None
+
+    print("\n[数据预览]")
+    print(df.head())
+    print(f"总共获取 {len(df)} 期数据")
+
+    # 保存原始数据
+    csv_filename = f"{game.key}_100_periods.csv"
+    df.to_csv(csv_filename, index=False, encoding='utf_8_sig')
+    print(f"原始数据已保存到: {csv_filename}")
+
+    # 号码转换为整数矩阵（只解析一次），并保存列式数据
+    draws = DrawArrays.from_dataframe(df, game)
+    draws.save(f"{game.key}_draws.npz")
+    print(f"列式数据已保存到: {game.key}_draws.npz")
+    return df, draws
+
+
+def stage_data(input_path, limit, game):
+    """阶段：读取数据文件，返回 (df, draws)"""
+    return read_draw_file(input_path, limit=limit, game=game)
+
+
+def stage_sales_history(data):
+    """阶段：截取历史销售额"""
+    return sales_history(data[0])
+
+
+def stage_sales_trend(history, game):
+    """阶段：任务1 销售额趋势分析与预测"""
+    charts = []
+    next_sale = forecast_sales(history, charts, game)
+    return {'next_sale': next_sale, 'charts': charts}
+
+
+def stage_number_frequency(data):
+    """阶段：任务2 号码频率分析与推荐"""
+    charts = []
+    recommended_red, recommended_blue = number_frequency_analysis(data[1], charts)
+    return {'red': recommended_red, 'blue': recommended_blue, 'charts': charts}
+
+
+def stage_day_of_week(data):
+    """阶段：任务3 开奖日对比分析"""
+    charts = []
+    sales_by_day = day_of_week_analysis(data[1], charts)
+    return {'sales_by_day': sales_by_day, 'charts': charts}
+
+
+def stage_charts(result):
+    """阶段：渲染上游分析阶段产生的图表（各图表阶段之间已并行，阶段内顺序渲染）"""
+    return render_charts(result['charts'], workers=1)
+
+
+def stage_report(data, trend, frequency):
+    """阶段：生成分析报告"""
+    generate_report(data[0], trend['next_sale'], frequency['red'], frequency['blue'], data[1].game)
+    return 'analysis_report.txt'
 
-    if df is not None:
-        print("\n[数据预览]")
-        print(df.head())
-        print(f"总共获取 {len(df)} 期数据")
 
-        # 保存原始数据
-        csv_filename = "dlt_100_periods.csv"
-        df.to_csv(csv_filename, index=False, encoding='utf_8_sig')
-        print(f"原始数据已保存到: {csv_filename}")
+def zone_files(game, pattern):
+    """按号码区展开的输出文件名，例如 red_number_stats.csv、blue_number_stats.csv"""
+    return tuple(pattern.format(zone.key) for zone in game.zones)
 
-        # 2. 任务1：销售额趋势分析与预测
-        next_sale = analyze_sales_trend(df)
 
-        # 3. 任务2：号码频率分析与推荐
-        recommended_red, recommended_blue = number_frequency_analysis(df)
+def build_analysis_pipeline(cache_dir=DEFAULT_CACHE_DIR, profile=None, profile_dir="profiles", game=DLT):
+    """分析流水线：数据 -> 三项分析任务（相互独立）-> 图表 / 报告；各阶段写出的文件随彩种的号码区而定"""
+    game = get_game(game)
+    pairs = ("red_number_pairs.csv", "red_number_triples.csv") if game.front.combinable else ()
+    if game.back is not None and game.back.combinable:
+        pairs += ("blue_number_pairs.csv",)
+    pairs_by_day = tuple(f"{zone.key}_pairs_by_day.csv" for zone in game.zones if zone.combinable)
 
-        # 4. 任务3：开奖日对比分析
-        sales_by_day = day_of_week_analysis(df)
+    pipeline = Pipeline(cache_dir, version=source_digest(), profile=profile, profile_dir=profile_dir)
+    pipeline.add("data", stage_data, inputs=("input_path", "limit", "game"))
+    pipeline.add("sales_history", stage_sales_history, inputs=("data",))
+    pipeline.add("sales_trend", stage_sales_trend, inputs=("sales_history", "game"))
+    pipeline.add("number_frequency", stage_number_frequency, inputs=("data",), files=(
+        zone_files(game, "{}_number_frequency.csv") + zone_files(game, "{}_number_stats.csv") + pairs))
+    pipeline.add("day_of_week", stage_day_of_week, inputs=("data",),
+                 files=("sales_by_day.csv",) + pairs_by_day)
+    pipeline.add("sales_charts", stage_charts, inputs=("sales_trend",),
+                 files=("sales_trend.png", "sales_prediction.png"))
+    pipeline.add("frequency_charts", stage_charts, inputs=("number_frequency",),
+                 files=zone_files(game, "{}_number_frequency.png"))
+    pipeline.add("day_charts", stage_charts, inputs=("day_of_week",),
+                 files=("sales_by_day.png",) + zone_files(game, "{}_number_by_day.png"))
+    pipeline.add("report", stage_report, inputs=("data", "sales_trend", "number_frequency"),
+                 files=("analysis_report.txt",))
+    return pipeline
 
-        # 5. 生成分析报告
-        generate_report(df, next_sale, recommended_red, recommended_blue)
 
-        print("\n所有任务已完成！所有图表和数据已保存到当前目录。")
+def game_db_path(args, game):
+    """彩种的本地数据库路径（绝对路径）：--db 只在单个彩种时生效，默认 <彩种>_draws.db"""
+    return os.path.abspath(args.db or game.db_path)
+
+
+def crawl_game(args, game):
+    """增量爬取一个彩种并写入其本地数据库，返回新增期数（失败时为 None，本地已存储的数据不受影响）"""
+    conn = open_store(game_db_path(args, game))
+    try:
+        return update_draw_store(conn, engine=args.engine, game=game, max_workers=args.crawl_workers,
+                                 rate_limit=args.rate)
+    except Exception as e:
+        # 例如 HTTP 接口失败后回退 Selenium 时 ChromeDriver 不存在
+        print(f"[错误] {game.name}爬取失败: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def cmd_crawl(args):
+    """子命令 crawl：增量爬取并写入本地数据库，返回 {彩种代码: 新增期数（失败时为 None）}
+
+    --game all 时每个彩种一个线程并发爬取（各彩种写入各自的数据库）。
+    """
+    games = select_games(args.game)
+    if len(games) == 1:
+        added = {games[0].key: crawl_game(args, games[0])}
     else:
-        print("未能获取数据，请检查错误日志")
\ No newline at end of file
+        added = {}
+        with ThreadPoolExecutor(max_workers=len(games)) as executor:
+            futures = {game.key: executor.submit(crawl_game, args, game) for game in games}
+            for key, future in futures.items():
+                added[key] = future.result()
+    for key, count in added.items():
+        if count is None:
+            print(f"[警告] {get_game(key).name}本次未能获取新数据")
+    return added
+
+
+def analyze_game(args, game_key, report=False, workers=None, collect=False):
+    """在彩种的输出目录中运行分析流水线，返回 (是否成功, 指标快照)
+
+    大乐透输出到当前目录，其他彩种输出到以彩种代码命名的子目录（阶段缓存也在其中）。
+    在工作进程中执行时 collect=True，取出本进程记录的指标交给主进程合并。
+    """
+    game = get_game(game_key)
+    db_path = game_db_path(args, game)
+    input_path = os.path.abspath(args.input) if args.input else None
+    cwd = os.getcwd()
+    os.makedirs(game.output_dir, exist_ok=True)
+    os.chdir(game.output_dir)
+    try:
+        ok = run_analysis(args, game, db_path, input_path, report, workers)
+    finally:
+        os.chdir(cwd)
+    return ok, REGISTRY.collect() if collect else None
+
+
+def run_analysis(args, game, db_path, input_path=None, report=False, workers=None):
+    """基于本地数据库或数据文件运行一个彩种的分析流水线"""
+    charts = not (report or args.no_charts)
+    report = report or args.report
+    targets = ["sales_trend", "number_frequency", "day_of_week"]
+    targets += ["sales_charts", "frequency_charts", "day_charts"] if charts else []
+    targets += ["report"] if report else []
+
+    if input_path is None:
+        df, _ = load_analysis_data(db_path, limit=args.limit, game=game)
+        if df is None:
+            print(f"未能获取{game.name}数据，请检查错误日志")
+            return False
+        input_path = f"{game.key}_draws.npz"
+
+    pipeline = build_analysis_pipeline(profile=args.profile, profile_dir=args.profile_dir, game=game)
+    _, timings = pipeline.run(
+        {"input_path": input_path, "limit": args.limit, "game": game.key}, targets=targets,
+        digests={"input_path": file_digest(input_path)}, workers=workers, use_cache=not args.no_cache)
+
+    # 报告阶段命中缓存时不会打印报告，这里补充输出
+    if report and timings["report"][1]:
+        with open('analysis_report.txt', encoding='utf-8') as f:
+            print("\n" + f.read())
+    return True
+
+
+def cmd_analyze(args, report=False):
+    """子命令 analyze / report：基于本地数据库或 --input 指定的数据文件运行分析流水线
+
+    每个阶段的输出按输入内容哈希缓存，输入未变化的阶段直接复用上次的结果和输出文件。
+    --game all 时每个彩种一个进程并行分析（进程内的流水线顺序执行），返回是否全部成功。
+    """
+    games = select_games(args.game)
+    if len(games) == 1:
+        return analyze_game(args, games[0].key, report, workers=args.workers)[0]
+
+    workers = min(len(games), args.workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {game.key: executor.submit(analyze_game, args, game.key, report, 1, True) for game in games}
+        results = {}
+        for key, future in futures.items():
+            ok, snapshot = future.result()
+            REGISTRY.merge(snapshot)
+            results[key] = ok
+    for key, ok in results.items():
+        print(f"[彩种] {get_game(key).name:<6} {'完成' if ok else '失败'}（输出目录: {get_game(key).output_dir}）")
+    return all(results.values())
+
+
+def cmd_experts(args):
+    """子命令 experts：专家数据获取、快照记录与排名"""
+    from zhaunjia import run_expert_analysis
+    run_expert_analysis()
+
+
+def build_parser():
+    """命令行参数：不带子命令时执行完整流程（爬取 + 分析 + 报告）"""
+    parser = argparse.ArgumentParser(description="彩票开奖数据爬取与分析（默认大乐透）")
+    parser.add_argument("--game", choices=list(GAMES) + ["all"], default=DLT.key,
+                        help="彩种：dlt 大乐透 / ssq 双色球 / pl3 排列3 / pl5 排列5 / qxc 七星彩 / all 全部")
+    parser.add_argument("--db", default=None, help="本地开奖数据库路径（默认 <彩种>_draws.db，仅限单个彩种）")
+    parser.add_argument("--engine", choices=("http", "selenium"), default="http", help="爬取方式")
+    parser.add_argument("--limit", type=int, default=100, help="分析最近多少期")
+    parser.add_argument("--workers", type=int, default=None, help="分析流水线并行进程数（默认按 CPU 核数）")
+    parser.add_argument("--no-cache", action="store_true", help="忽略阶段结果缓存，强制重新计算")
+    parser.add_argument("--metrics-log", default=None, help="结构化 JSON 日志文件（每行一个事件）")
+    parser.add_argument("--metrics-file", default=None, help="Prometheus 文本格式指标文件")
+    parser.add_argument("--profile", choices=("cprofile", "pyinstrument"), default=None,
+                        help="对 crawl/experts 命令或每个分析阶段做性能剖析")
+    parser.add_argument("--profile-dir", default="profiles", help="剖析结果保存目录")
+    parser.set_defaults(input=None, no_charts=False, report=False, crawl_workers=1, rate=None)
+    subparsers = parser.add_subparsers(dest="command")
+
+    # analyze / report 共用：--input 指定已保存的数据文件时不读取数据库，也不需要爬虫
+    data_source = argparse.ArgumentParser(add_help=False)
+    data_source.add_argument("--input", default=None,
+                             help="离线数据文件（.csv / .feather / .parquet / .npz），默认读取本地数据库")
+
+    crawl = subparsers.add_parser("crawl", help="增量爬取开奖数据并写入本地数据库")
+    crawl.add_argument("--workers", dest="crawl_workers", type=int, default=1, metavar="N",
+                       help="HTTP 接口并发预取页面的线程数")
+    crawl.add_argument("--rate", type=float, default=None, help="每个主机每秒最多请求数（默认不限速）")
+    analyze = subparsers.add_parser("analyze", parents=[data_source], help="分析并生成图表")
+    analyze.add_argument("--no-charts", action="store_true", help="不渲染图表")
+    analyze.add_argument("--report", action="store_true", help="同时生成分析报告")
+    subparsers.add_parser("report", parents=[data_source], help="生成分析报告（不渲染图表）")
+    subparsers.add_parser("experts", help="专家数据获取与排名")
+    return parser
+
+
+if __name__ == "__main__":
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.game == "all" and (args.db or args.input):
+        parser.error("--db / --input 只能与单个彩种一起使用")
+    configure_metrics(args.metrics_log, args.metrics_file)
+
+    # crawl / experts 整体作为一个阶段剖析；analyze / report 由流水线逐阶段剖析
+    if args.command in ("crawl", "experts"):
+        command = cmd_crawl if args.command == "crawl" else cmd_experts
+        with timer("command_seconds", event="command_finished", command=args.command), \
+                profiled(f"command_{args.command}", args.profile, args.profile_dir):
+            command(args)
+    elif args.command in ("analyze", "report"):
+        with timer("command_seconds", event="command_finished", command=args.command):
+            cmd_analyze(args, report=args.command == "report")
+    else:
+        with timer("command_seconds", event="command_finished", command="all"):
+            # 1. 增量爬取开奖数据并写入本地数据库（失败时使用本地已存储的数据继续分析）
+            with profiled("command_crawl", args.profile, args.profile_dir):
+                cmd_crawl(args)
+
+            # 2~5. 分析最近100期（本地库保存完整历史）并生成报告
+            args.report = True
+            if cmd_analyze(args):
+                print("\n所有任务已完成！所有图表和数据已保存到当前目录（大乐透以外的彩种保存在各自的子目录）。")
+
+    write_prometheus()
@@ -0,0 +1,225 @@
+"""结构化指标：计数器、仪表与延迟直方图，输出为 JSON 日志与 Prometheus 文本格式
+
+默认不写任何文件，只在内存中累计；调用 configure() 指定 JSON 日志或 Prometheus 文件后才输出。
+多进程执行（分析流水线）时，工作进程用 collect() 取出本进程的指标，由主进程 merge() 合并。
+
+用法:
+    from metrics import REGISTRY, timer
+    with timer("dlt_page_extract_seconds", engine="http"):
+        ...
+    REGISTRY.inc("webdriver_rpc_total", command="findElement")
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# JSON 日志与 Prometheus 文件路径的环境变量（子进程自动继承）
+METRICS_LOG_ENV = "DLT_METRICS_LOG"
+METRICS_FILE_ENV = "DLT_METRICS_FILE"
+
+# 延迟直方图的默认分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def label_key(labels):
+    """标签字典转为可哈希、顺序固定的键"""
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def format_labels(key, extra=()):
+    """Prometheus 标签文本，例如 {host="a",le="0.1"}"""
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class MetricsRegistry:
+    """线程安全的指标注册表"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        """计数器加 value"""
+        key = (name, label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """设置仪表当前值"""
+        with self.lock:
+            self.gauges[(name, label_key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        """记录一次观测值（直方图：各分桶计数、总和、次数）"""
+        key = (name, label_key(labels))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist[0][i] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def total(self, name):
+        """计数器 name 在所有标签组合下的合计"""
+        with self.lock:
+            return sum(v for (n, _), v in self.counters.items() if n == name)
+
+    def collect(self, reset=True):
+        """取出全部指标的快照（可 pickle），reset=True 时清空本注册表"""
+        with self.lock:
+            snapshot = {
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "histograms": {k: [list(v[0]), v[1], v[2]] for k, v in self.histograms.items()},
+            }
+            if reset:
+                self.counters, self.gauges, self.histograms = {}, {}, {}
+        return snapshot
+
+    def merge(self, snapshot):
+        """合并其他进程 collect() 得到的快照"""
+        with self.lock:
+            for key, value in snapshot["counters"].items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            self.gauges.update(snapshot["gauges"])
+            for key, (counts, total, n) in snapshot["histograms"].items():
+                hist = self.histograms.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+                hist[0] = [a + b for a, b in zip(hist[0], counts)]
+                hist[1] += total
+                hist[2] += n
+
+    def to_prometheus(self):
+        """Prometheus 文本格式"""
+        snapshot = self.collect(reset=False)
+        lines = []
+        for kind, series in (("counter", snapshot["counters"]), ("gauge", snapshot["gauges"])):
+            for name in sorted({name for name, _ in series}):
+                lines.append(f"# TYPE {name} {kind}")
+                for (n, key), value in sorted(series.items()):
+                    if n == name:
+                        lines.append(f"{name}{format_labels(key)} {value}")
+        histograms = snapshot["histograms"]
+        for name in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (n, key), (counts, total, count) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                for bound, c in zip(self.buckets, counts):
+                    lines.append(f"{name}_bucket{format_labels(key, [('le', bound)])} {c}")
+                lines.append(f"{name}_bucket{format_labels(key, [('le', '+Inf')])} {count}")
+                lines.append(f"{name}_sum{format_labels(key)} {total}")
+                lines.append(f"{name}_count{format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+# 进程内默认注册表
+REGISTRY = MetricsRegistry()
+
+# 同一进程内多个线程写日志时加锁，保证每条 JSON 占一整行
+LOG_LOCK = threading.Lock()
+
+
+def configure(log_path=None, metrics_path=None):
+    """启用 JSON 日志 / Prometheus 文件输出（通过环境变量传递给子进程，转为绝对路径以免子进程切换目录）"""
+    if log_path:
+        os.environ[METRICS_LOG_ENV] = os.path.abspath(log_path)
+    if metrics_path:
+        os.environ[METRICS_FILE_ENV] = os.path.abspath(metrics_path)
+
+
+def log_event(event, **fields):
+    """写一条 JSON 日志（未启用时不做任何事）"""
+    path = os.environ.get(METRICS_LOG_ENV)
+    if not path:
+        return
+    record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "event": event, "pid": os.getpid()}
+    record.update(fields)
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with LOG_LOCK, open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+@contextmanager
+def timer(name, event=None, fields=None, **labels):
+    """计时上下文：耗时记入直方图 name，指定 event 时同时写一条 JSON 日志
+
+    labels 同时作为直方图标签和日志字段；fields 只写入日志（避免页码等高基数值成为标签）。
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        REGISTRY.observe(name, seconds, **labels)
+        if event:
+            log_event(event, seconds=round(seconds, 6), **labels, **(fields or {}))
+
+
+def write_prometheus(path=None):
+    """把当前指标写入 Prometheus 文本文件（node_exporter textfile 格式），返回路径"""
+    path = path or os.environ.get(METRICS_FILE_ENV)
+    if not path:
+        return None
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(REGISTRY.to_prometheus())
+    os.replace(tmp, path)
+    print(f"[指标] Prometheus 指标已保存: {path}")
+    return path
+
+
+def count_webdriver_rpcs(driver, registry=REGISTRY):
+    """统计 WebDriver 往返次数：所有驱动与元素操作最终都经过 driver.execute"""
+    execute = driver.execute
+
+    def counted(driver_command, params=None):
+        registry.inc("webdriver_rpc_total", command=driver_command)
+        return execute(driver_command, params)
+
+    driver.execute = counted
+    return driver
+
+
+@contextmanager
+def profiled(name, mode=None, out_dir="profiles"):
+    """可选的性能剖析：mode 为 "cprofile" 时保存 .prof，为 "pyinstrument" 时保存 .html"""
+    if not mode:
+        yield
+        return
+    os.makedirs(out_dir, exist_ok=True)
+    if mode == "pyinstrument":
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            path = os.path.join(out_dir, f"{name}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+            log_event("profile_saved", name=name, path=path)
+        return
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = os.path.join(out_dir, f"{name}.prof")
+        profiler.dump_stats(path)
+        log_event("profile_saved", name=name, path=path)
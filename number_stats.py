@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from draw_matrix import one_hot
+
+# 默认统计窗口（最近 N 期）
+DEFAULT_WINDOWS = (10, 30, 50, 100)
+
+# 冷热判定阈值：窗口内出现次数相对期望值的 z 分数
+HOT_Z, COLD_Z = 1.0, -1.0
+
+
+def window_frequencies(hot, windows=DEFAULT_WINDOWS):
+    """对逆序 one-hot 矩阵做一次累加，得到各窗口内每个号码的出现次数"""
+    n = len(hot)
+    if n == 0:
+        return {w: np.zeros(hot.shape[1], dtype=np.int64) for w in windows}
+    depth = min(max(windows), n)
+    cum = np.cumsum(hot[:-depth - 1:-1], axis=0, dtype=np.int64)
+    return {w: cum[min(w, n) - 1] for w in windows}
+
+
+def gap_stats(matrix, pool, low=1):
+    """号码 low..pool 的当前遗漏与最大遗漏（含开头与当前遗漏），返回 (current_gap, max_gap, total)
+
+    将所有号码出现位置按 (号码, 期序) 稳定排序后，同一号码相邻出现的期序差减 1 即为一段遗漏；
+    从未开出的号码两种遗漏均为总期数。
+    """
+    n, pick = matrix.shape
+    flat = matrix.ravel()
+    # 对 uint8 做稳定排序走基数排序，比转换为 intp 后排序快一个数量级
+    order = np.argsort(flat, kind='stable')
+    rows = order // pick
+    total = np.bincount(flat, minlength=pool + 1)[low:pool + 1]
+    ends = np.cumsum(total)
+    starts = ends - total
+    seen = total > 0
+
+    current = np.full(len(total), n, dtype=np.int64)
+    longest = np.full(len(total), n, dtype=np.int64)
+    if not seen.any():
+        return current, longest, total
+
+    # 相邻差值中跨号码边界的位置置为 -1，再按号码分段取最大值
+    gaps = np.append(np.diff(rows) - 1, -1)
+    gaps[ends[seen] - 1] = -1
+    inner = np.maximum.reduceat(gaps, starts[seen])
+
+    lead = rows[starts[seen]]
+    trail = n - 1 - rows[ends[seen] - 1]
+    current[seen] = trail
+    longest[seen] = np.maximum(np.maximum(lead, trail), inner)
+    return current, longest, total
+
+
+def classify_hot_cold(freq, window, pick, pool):
+    """按二项分布期望判定冷热：z>=1 为热号，z<=-1 为冷号，其余为温号"""
+    p = pick / pool
+    std = np.sqrt(window * p * (1 - p))
+    z = (freq - window * p) / std if std else np.zeros(len(freq))
+    return np.where(z >= HOT_Z, '热', np.where(z <= COLD_Z, '冷', '温'))
+
+
+def compute_number_stats(matrix, pool, pick, windows=DEFAULT_WINDOWS, low=1):
+    """一次计算全部窗口的频率、当前遗漏、最大遗漏与冷热分类，返回 numpy 数组字典
+
+    matrix 为按时间升序排列的 N×pick 号码矩阵（如 DrawArrays.front），号码范围 low..pool。
+    """
+    n = len(matrix)
+    # 窗口统计只需最近 max(windows) 期的 one-hot 矩阵
+    freq = window_frequencies(one_hot(matrix[-max(windows):], pool, low), windows)
+    current, longest, total = gap_stats(matrix, pool, low)
+    return {
+        "total": total,
+        "frequency": freq,
+        "status": {w: classify_hot_cold(freq[w], min(w, n), pick, pool - low + 1) for w in windows},
+        "current_gap": current,
+        "max_gap": longest,
+    }
+
+
+def number_stats_table(matrix, pool, pick, windows=DEFAULT_WINDOWS, label='号码', low=1):
+    """将 compute_number_stats 的结果整理为按号码排列的 DataFrame"""
+    stats = compute_number_stats(matrix, pool, pick, windows, low)
+    table = {label: np.arange(low, pool + 1), '全部期数出现次数': stats["total"]}
+    for w in windows:
+        table[f'近{w}期出现次数'] = stats["frequency"][w]
+        table[f'近{w}期冷热'] = stats["status"][w]
+    table['当前遗漏'] = stats["current_gap"]
+    table['最大遗漏'] = stats["max_gap"]
+    return pd.DataFrame(table)
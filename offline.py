@@ -0,0 +1,91 @@
+"""离线分析：直接读取已保存的开奖数据文件（不启动爬虫），并提供输入内容与分析代码的哈希
+
+支持的输入格式：
+    .csv               爬虫输出的 dlt_100_periods.csv
+    .feather / .arrow  Arrow IPC 列式文件，内存映射读取（需要 pyarrow）
+    .parquet           Parquet 列式文件，内存映射读取（需要 pyarrow）
+    .npz               DrawArrays.save 保存的二进制数组
+
+文件内容哈希与分析代码哈希用作分析流水线（pipeline.py）的缓存键：输入与代码都未变化时，
+各阶段直接复用上次的结果和输出文件，不再重新计算和渲染。
+"""
+import os
+import hashlib
+import pandas as pd
+from draw_matrix import DrawArrays
+from games import DLT, get_game
+
+# 参与代码哈希计算的分析代码：代码变化后旧缓存自动失效
+ANALYSIS_SOURCES = ("main.py", "charts.py", "draw_matrix.py", "number_stats.py", "cooccurrence.py", "offline.py",
+                    "games.py")
+
+CHUNK_SIZE = 1 << 20
+
+
+def read_columnar(path, fmt):
+    """以内存映射方式读取 Feather/Parquet 文件为 DataFrame"""
+    try:
+        import pyarrow.feather as feather
+        import pyarrow.parquet as parquet
+    except ImportError:
+        raise ImportError(f"[错误] 读取 {fmt} 文件需要安装 pyarrow: pip install pyarrow")
+    if fmt == "feather":
+        table = feather.read_table(path, memory_map=True)
+    else:
+        table = parquet.read_table(path, memory_map=True)
+    return table.to_pandas()
+
+
+def read_draw_file(path, limit=None, game=DLT):
+    """读取开奖数据文件，返回最近 limit 期的 (df, draws)；df 与爬虫输出格式一致（按期号降序）
+
+    .npz 文件自带彩种信息，其他格式按 game 解析期号与号码。
+    """
+    game = get_game(game)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npz":
+        draws = DrawArrays.load(path)
+        if limit:
+            draws = draws.tail(limit)
+        return draws.to_dataframe(), draws
+
+    if ext == ".csv":
+        df = pd.read_csv(path, dtype={'期号': str, '前区号码': str, '后区号码': str})
+    elif ext in (".feather", ".arrow"):
+        df = read_columnar(path, "feather")
+    elif ext == ".parquet":
+        df = read_columnar(path, "parquet")
+    else:
+        raise ValueError(f"[错误] 不支持的数据文件格式: {path}")
+
+    df['期号'] = df['期号'].astype(str).str.zfill(game.issue_digits)
+    df['后区号码'] = df['后区号码'].fillna('')
+    df = df.sort_values('期号', ascending=False).reset_index(drop=True)
+    if limit:
+        df = df.head(limit)
+    return df, DrawArrays.from_dataframe(df, game)
+
+
+def file_chunks(path):
+    """按块读取文件内容"""
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+def file_digest(path):
+    """数据文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    for chunk in file_chunks(path):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_digest():
+    """分析代码的 SHA-256，作为缓存的代码版本"""
+    digest = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in ANALYSIS_SOURCES:
+        for chunk in file_chunks(os.path.join(here, name)):
+            digest.update(chunk)
+    return digest.hexdigest()
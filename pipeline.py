@@ -0,0 +1,196 @@
+"""按依赖关系执行的分析流水线：每个阶段显式声明输入与输出，结果按输入内容哈希记忆在磁盘上
+
+- 阶段函数只接收上游阶段的输出作为参数并返回新对象，不修改共享数据；
+- 所有输入都已就绪的阶段可以在进程池中并行执行；
+- 阶段的缓存键由阶段名、代码版本和各输入内容的 SHA-256 组成。输出内容的哈希单独记录，
+  上游重新计算但结果不变时，下游阶段仍然命中缓存；
+- 阶段写出的文件（CSV、图表、报告）随输出一起缓存，命中时复制回工作目录；
+- 各阶段耗时记入 metrics 注册表，profile 参数可对每个阶段做 cProfile / pyinstrument 剖析。
+"""
+import os
+import time
+import pickle
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from metrics import REGISTRY, log_event, profiled
+
+# 阶段结果缓存目录
+DEFAULT_CACHE_DIR = "pipeline_cache"
+
+
+def value_digest(value):
+    """对象内容的 SHA-256（基于 pickle 序列化结果）"""
+    return hashlib.sha256(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+class Stage:
+    """流水线阶段：func(*inputs) -> 输出；files 为阶段写出的文件"""
+
+    def __init__(self, name, func, inputs=(), files=(), memo=True):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.files = tuple(files)
+        self.memo = memo
+
+
+def run_stage(name, func, args, profile=None, profile_dir="profiles", collect=False):
+    """执行阶段函数，返回 (输出, 耗时秒, 指标快照)
+
+    在工作进程中执行时 collect=True，取出本进程记录的指标交给主进程合并；
+    profile 为 "cprofile" / "pyinstrument" 时对本阶段做性能剖析。
+    """
+    start = time.perf_counter()
+    with profiled(f"stage_{name}", profile, profile_dir):
+        value = func(*args)
+    return value, time.perf_counter() - start, REGISTRY.collect() if collect else None
+
+
+class Pipeline:
+    """阶段依赖图与带记忆的执行器"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, version="", profile=None, profile_dir="profiles"):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.stages = {}
+
+    def add(self, name, func, inputs=(), files=(), memo=True):
+        """添加阶段；inputs 中的名字可以是其他阶段，也可以是 run() 传入的初始值"""
+        if name in self.stages:
+            raise ValueError(f"[错误] 阶段重复定义: {name}")
+        self.stages[name] = Stage(name, func, inputs, files, memo)
+        return self
+
+    def required(self, targets):
+        """计算目标阶段及其全部上游阶段"""
+        needed, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name in needed or name not in self.stages:
+                continue
+            needed.add(name)
+            pending.extend(self.stages[name].inputs)
+        return needed
+
+    def stage_key(self, stage, digests):
+        """阶段缓存键：阶段名 + 代码版本 + 各输入内容哈希"""
+        digest = hashlib.sha256(f"{self.version}\0{stage.name}".encode("utf-8"))
+        for name in stage.inputs:
+            digest.update(f"\0{name}={digests[name]}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def load_memo(self, stage, key):
+        """命中缓存时恢复阶段写出的文件并返回 (输出, 输出哈希)，否则返回 None"""
+        entry = os.path.join(self.cache_dir, stage.name, key)
+        names = ["output.pkl", "digest"] + [os.path.basename(f) for f in stage.files]
+        if not all(os.path.exists(os.path.join(entry, name)) for name in names):
+            return None
+        for path in stage.files:
+            shutil.copyfile(os.path.join(entry, os.path.basename(path)), path)
+        with open(os.path.join(entry, "output.pkl"), "rb") as f:
+            value = pickle.load(f)
+        with open(os.path.join(entry, "digest"), encoding="utf-8") as f:
+            return value, f.read()
+
+    def save_memo(self, stage, key, value):
+        """保存阶段输出与写出的文件（先写临时目录再整体改名），返回输出哈希"""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha256(data).hexdigest()
+        if not stage.memo:
+            return digest
+        entry = os.path.join(self.cache_dir, stage.name, key)
+        tmp = f"{entry}.tmp{os.getpid()}"
+        os.makedirs(tmp, exist_ok=True)
+        with open(os.path.join(tmp, "output.pkl"), "wb") as f:
+            f.write(data)
+        with open(os.path.join(tmp, "digest"), "w", encoding="utf-8") as f:
+            f.write(digest)
+        for path in stage.files:
+            if os.path.exists(path):
+                shutil.copyfile(path, os.path.join(tmp, os.path.basename(path)))
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        return digest
+
+    def start_stage(self, name, results, digests, timings, running, executor, use_cache):
+        """命中缓存时直接取回结果，否则开始执行阶段（顺序执行时立即完成）"""
+        stage = self.stages[name]
+        key = self.stage_key(stage, digests)
+        memo = self.load_memo(stage, key) if use_cache and stage.memo else None
+        if memo is not None:
+            results[name], digests[name] = memo
+            timings[name] = (0.0, True)
+            REGISTRY.inc("pipeline_stage_cache_total", stage=name, result="hit")
+            log_event("stage_finished", stage=name, seconds=0.0, cached=True)
+            print(f"[阶段] {name:<18} 命中缓存")
+            return
+        args = [results[i] for i in stage.inputs]
+        if executor is None:
+            running[name] = (key, run_stage(name, stage.func, args, self.profile, self.profile_dir))
+        else:
+            running[name] = (key, executor.submit(run_stage, name, stage.func, args, self.profile,
+                                                  self.profile_dir, True))
+
+    def run(self, values, targets=None, digests=None, workers=None, use_cache=True):
+        """执行目标阶段（默认全部），返回 (各阶段输出, 各阶段耗时 {名称: (秒, 是否命中缓存)})
+
+        values 为初始值；digests 可为初始值指定内容哈希（例如文件路径对应文件内容的哈希）。
+        workers=1 时在当前进程内顺序执行。
+        """
+        needed = self.required(targets or list(self.stages))
+        missing = {i for n in needed for i in self.stages[n].inputs if i not in self.stages and i not in values}
+        if missing:
+            raise KeyError(f"[错误] 流水线缺少初始输入: {', '.join(sorted(missing))}")
+        results = dict(values)
+        digests = {**{name: value_digest(value) for name, value in values.items()}, **(digests or {})}
+        timings = {}
+        waiting = set(needed)
+        workers = workers or min(len(needed), os.cpu_count() or 1)
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        running = {}
+        start = time.perf_counter()
+        try:
+            while waiting or running:
+                # 反复扫描，直到没有新的阶段可以开始（命中缓存的阶段可能立即解锁下游）
+                ready = True
+                while ready:
+                    ready = [n for n in sorted(waiting) if all(i in digests for i in self.stages[n].inputs)]
+                    for name in ready:
+                        waiting.discard(name)
+                        self.start_stage(name, results, digests, timings, running, executor, use_cache)
+
+                if not running:
+                    if waiting:
+                        raise RuntimeError(f"[错误] 阶段存在循环依赖: {', '.join(sorted(waiting))}")
+                    break
+
+                # 取回已完成的阶段（顺序执行时结果已就绪）
+                futures = {v[1]: n for n, v in running.items() if executor is not None}
+                if futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    finished = [(futures[f], f.result()) for f in done]
+                else:
+                    finished = [(n, v[1]) for n, v in running.items()]
+                for name, (value, seconds, snapshot) in finished:
+                    key = running.pop(name)[0]
+                    results[name] = value
+                    digests[name] = self.save_memo(self.stages[name], key, value)
+                    timings[name] = (seconds, False)
+                    if snapshot:
+                        REGISTRY.merge(snapshot)
+                    REGISTRY.observe("pipeline_stage_seconds", seconds, stage=name)
+                    REGISTRY.inc("pipeline_stage_cache_total", stage=name, result="miss")
+                    log_event("stage_finished", stage=name, seconds=round(seconds, 6), cached=False)
+                    print(f"[阶段] {name:<18} {seconds:.3f}s")
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        hits = sum(hit for _, hit in timings.values())
+        elapsed = time.perf_counter() - start
+        REGISTRY.observe("pipeline_run_seconds", elapsed)
+        log_event("pipeline_finished", stages=len(timings), cached=hits, seconds=round(elapsed, 6))
+        print(f"[流水线] 共 {len(timings)} 个阶段，{hits} 个命中缓存，总耗时 {elapsed:.2f}s")
+        return results, timings
@@ -0,0 +1,25 @@
+import time
+import threading
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """按主机限速：同一主机的两次请求之间至少间隔 1/rate 秒（线程安全）"""
+
+    def __init__(self, rate=5.0):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def acquire(self, url):
+        """阻塞直到该 URL 所在主机允许发出下一次请求"""
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,110 @@
+import time
+import sqlite3
+import threading
+
+# 默认缓存文件、新鲜期（秒）与容量上限（字节）
+DEFAULT_CACHE_PATH = "cmzj_cache.db"
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+
+class ResponseCache:
+    """磁盘 HTTP 响应缓存：按键保存响应体及 ETag/Last-Modified，TTL 判定新鲜度，超出容量时按 LRU 淘汰
+
+    线程安全（所有数据库操作在同一把锁内完成），可在并发抓取时共享。
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key           TEXT PRIMARY KEY,
+                body          BLOB NOT NULL,
+                etag          TEXT,
+                last_modified TEXT,
+                fetched_at    REAL NOT NULL,
+                last_access   REAL NOT NULL,
+                size          INTEGER NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self.counters = {"hits": 0, "misses": 0, "revalidated": 0, "bytes_saved": 0, "bytes_downloaded": 0}
+
+    def get(self, key):
+        """读取缓存条目，返回字典（含 fresh 标记）或 None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?", (str(key),)
+            ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, fetched_at = row
+        return {
+            "body": bytes(body),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": time.time() - fetched_at < self.ttl,
+        }
+
+    def conditional_headers(self, entry):
+        """根据缓存条目构造条件请求头"""
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record_hit(self, key, entry, revalidated=False):
+        """记录一次命中（直接命中或 304 重新验证），并刷新访问时间"""
+        now = time.time()
+        with self.lock:
+            if revalidated:
+                self.conn.execute("UPDATE responses SET fetched_at = ?, last_access = ? WHERE key = ?",
+                                  (now, now, str(key)))
+                self.counters["revalidated"] += 1
+            else:
+                self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, str(key)))
+                self.counters["hits"] += 1
+            self.conn.commit()
+            self.counters["bytes_saved"] += len(entry["body"])
+
+    def put(self, key, body, etag=None, last_modified=None):
+        """写入（覆盖）一条响应，必要时按 LRU 淘汰旧条目"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, fetched_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (str(key), body, etag, last_modified, now, now, len(body)),
+            )
+            self.counters["misses"] += 1
+            self.counters["bytes_downloaded"] += len(body)
+            self.evict()
+            self.conn.commit()
+
+    def evict(self):
+        """淘汰最久未访问的条目，直到总大小不超过 max_bytes（调用方需持有锁）"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def stats(self):
+        """返回命中/未命中/重新验证次数及节省、下载的字节数"""
+        with self.lock:
+            entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {**self.counters, "entries": entries, "size": size}
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,184 @@
+"""推荐策略蒙特卡洛模拟：按策略批量生成投注号码，逐期对照真实开奖结果计奖
+
+每一期只使用该期之前 lookback 期的数据确定选号权重（不使用未来数据），
+统计各策略的期望回报、各奖级命中率与每秒模拟注数。
+号码池与奖级按大乐透规则，其他彩种的开奖数据抛出 ValueError。
+
+用法:
+    python simulate.py --tickets 1000000 --workers 4 --seed 42
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from draw_matrix import DrawArrays, one_hot, FRONT_POOL, FRONT_PICK, BACK_POOL, BACK_PICK
+from games import DLT, get_game
+
+# 单注价格（元）
+TICKET_PRICE = 2
+
+# 浮动奖级（一等奖、二等奖）按估计值计算
+FIRST_PRIZE = 10_000_000
+SECOND_PRIZE = 200_000
+
+# 奖级: (名称, 单注奖金, [(前区命中, 后区命中), ...])
+PRIZE_TIERS = [
+    ("一等奖", FIRST_PRIZE, [(5, 2)]),
+    ("二等奖", SECOND_PRIZE, [(5, 1)]),
+    ("三等奖", 10000, [(5, 0)]),
+    ("四等奖", 3000, [(4, 2)]),
+    ("五等奖", 300, [(4, 1)]),
+    ("六等奖", 200, [(3, 2)]),
+    ("七等奖", 100, [(4, 0)]),
+    ("八等奖", 15, [(3, 1), (2, 2)]),
+    ("九等奖", 5, [(3, 0), (1, 2), (2, 1), (0, 2)]),
+]
+
+# 查表：TIER_TABLE[前区命中数, 后区命中数] -> 奖级序号（0 表示未中奖，1..9 对应一至九等奖）
+TIER_TABLE = np.zeros((FRONT_PICK + 1, BACK_PICK + 1), dtype=np.int8)
+for tier, (_, _, hits) in enumerate(PRIZE_TIERS, start=1):
+    for f, b in hits:
+        TIER_TABLE[f, b] = tier
+TIER_AMOUNTS = np.array([0] + [amount for _, amount, _ in PRIZE_TIERS], dtype=np.float64)
+
+STRATEGIES = ("uniform", "frequency", "cold", "top_frequency")
+
+# top_frequency 策略的候选范围（与 number_frequency_analysis 一致：前区前10、后区前5）
+TOP_FRONT, TOP_BACK = 10, 5
+
+
+def require_dlt(draws, purpose="策略模拟"):
+    """号码池与奖级按大乐透规则：其他彩种的开奖数据抛出 ValueError"""
+    if draws.game != DLT.key:
+        raise ValueError(f"[错误] {purpose}只支持大乐透（按其号码池与奖级计奖），当前数据为{get_game(draws.game).name}")
+
+
+def window_counts(matrix, pool, lookback):
+    """每一期之前 lookback 期内各号码的出现次数（第 t 行只用到第 t 期之前的数据）"""
+    cum = np.zeros((len(matrix) + 1, pool), dtype=np.int64)
+    np.cumsum(one_hot(matrix, pool), axis=0, out=cum[1:])
+    t = np.arange(len(matrix))
+    return cum[t] - cum[np.maximum(t - lookback, 0)]
+
+
+def strategy_weights(strategy, counts, top_k):
+    """根据策略将历史出现次数转换为选号权重（每行对应一期）"""
+    counts = counts.astype(np.float64)
+    if strategy == "uniform":
+        return np.ones_like(counts)
+    if strategy == "frequency":
+        return counts + 1
+    if strategy == "cold":
+        return 1.0 / (counts + 1)
+    if strategy == "top_frequency":
+        # 与 number_frequency_analysis 的推荐方式一致：从出现次数最多的 top_k 个号码中等概率选取
+        top = np.argsort(-counts, axis=1, kind='stable')[:, :top_k]
+        weights = np.zeros_like(counts)
+        np.put_along_axis(weights, top, 1.0, axis=1)
+        return weights
+    raise ValueError(f"未知策略: {strategy}")
+
+
+def sample_tickets(rng, log_weights, pick):
+    """Gumbel-top-k 按权重无放回抽样：每行独立选出 pick 个号码下标"""
+    keys = log_weights + rng.gumbel(size=log_weights.shape)
+    return np.argpartition(-keys, pick - 1, axis=1)[:, :pick]
+
+
+def simulate_chunk(draw_ids, front_logw, back_logw, front_hot, back_hot, seed, batch_size=100_000):
+    """模拟一批投注（draw_ids[i] 为第 i 注对应的开奖期序），返回各奖级命中次数"""
+    rng = np.random.default_rng(seed)
+    tier_counts = np.zeros(len(TIER_AMOUNTS), dtype=np.int64)
+    for start in range(0, len(draw_ids), batch_size):
+        ids = draw_ids[start:start + batch_size]
+        front = sample_tickets(rng, front_logw[ids], FRONT_PICK)
+        back = sample_tickets(rng, back_logw[ids], BACK_PICK)
+        front_hits = front_hot[ids[:, None], front].sum(axis=1)
+        back_hits = back_hot[ids[:, None], back].sum(axis=1)
+        tier_counts += np.bincount(TIER_TABLE[front_hits, back_hits], minlength=len(TIER_AMOUNTS))
+    return tier_counts
+
+
+def simulate_strategy(draws, strategy, total_tickets, lookback=50, seed=42, workers=1):
+    """对单个策略做逐期模拟，返回各奖级命中次数"""
+    require_dlt(draws)
+    if len(draws) <= lookback:
+        raise ValueError(f"历史期数不足: 需要多于 {lookback} 期，当前 {len(draws)} 期")
+
+    front_counts = window_counts(draws.front, FRONT_POOL, lookback)
+    back_counts = window_counts(draws.back, BACK_POOL, lookback)
+    with np.errstate(divide='ignore'):
+        front_logw = np.log(strategy_weights(strategy, front_counts, TOP_FRONT))
+        back_logw = np.log(strategy_weights(strategy, back_counts, TOP_BACK))
+    front_hot = one_hot(draws.front, FRONT_POOL)
+    back_hot = one_hot(draws.back, BACK_POOL)
+
+    # 从第 lookback 期开始，投注均匀分配到每一期
+    scored = np.arange(lookback, len(draws))
+    draw_ids = scored[np.arange(total_tickets) % len(scored)]
+
+    seeds = np.random.SeedSequence(seed).spawn(max(1, workers))
+    chunks = np.array_split(draw_ids, len(seeds))
+    args = [(chunk, front_logw, back_logw, front_hot, back_hot, s) for chunk, s in zip(chunks, seeds)]
+    if workers <= 1:
+        return simulate_chunk(*args[0])
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(simulate_chunk, *zip(*args)))
+
+
+def summarize(strategy, tier_counts, elapsed):
+    """整理单个策略的模拟结果"""
+    tickets = int(tier_counts.sum())
+    winnings = tier_counts * TIER_AMOUNTS
+    mean_return = winnings.sum() / tickets
+    # 单注奖金的方差（按奖级分布计算）
+    std_return = np.sqrt((tier_counts * (TIER_AMOUNTS - mean_return) ** 2).sum() / tickets)
+    result = {
+        "策略": strategy,
+        "模拟注数": tickets,
+        "单注期望回报(元)": mean_return,
+        "单注回报标准差(元)": std_return,
+        "回报率": mean_return / TICKET_PRICE,
+        "中奖率": 1 - tier_counts[0] / tickets,
+    }
+    for tier, (name, _, _) in enumerate(PRIZE_TIERS, start=1):
+        result[f"{name}命中率"] = tier_counts[tier] / tickets
+    result["注/秒"] = tickets / elapsed if elapsed > 0 else float('inf')
+    return result
+
+
+def run_simulation(draws, strategies=STRATEGIES, total_tickets=1_000_000, lookback=50, seed=42, workers=1):
+    """对每个策略运行模拟，返回结果 DataFrame"""
+    results = []
+    for i, strategy in enumerate(strategies):
+        start = time.perf_counter()
+        tier_counts = simulate_strategy(draws, strategy, total_tickets, lookback, seed + i, workers)
+        elapsed = time.perf_counter() - start
+        row = summarize(strategy, tier_counts, elapsed)
+        results.append(row)
+        print(f"[模拟] {strategy}: {row['模拟注数']:,} 注，回报率 {row['回报率']:.2%}，"
+              f"中奖率 {row['中奖率']:.2%}，{row['注/秒']:,.0f} 注/秒")
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="大乐透推荐策略蒙特卡洛模拟")
+    parser.add_argument("--source", default="dlt_draws.npz", help="列式开奖数据（DrawArrays.save 输出）")
+    parser.add_argument("--tickets", type=int, default=1_000_000, help="每个策略的模拟注数")
+    parser.add_argument("--lookback", type=int, default=50, help="选号权重使用的历史期数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="进程数")
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=STRATEGIES)
+    args = parser.parse_args()
+
+    draws = DrawArrays.load(args.source)
+    try:
+        result = run_simulation(draws, args.strategies, args.tickets, args.lookback, args.seed, args.workers)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    result.to_csv("strategy_simulation.csv", index=False, encoding="utf_8_sig")
+    print("[数据] 策略模拟结果已保存: strategy_simulation.csv")
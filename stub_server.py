@@ -0,0 +1,129 @@
+"""本地桩服务器：用录制的 fixtures 响应模拟中彩网开奖数据接口与彩民之家专家接口
+
+用法:
+    python stub_server.py --port 8765
+    python stub_server.py --port 8765 --fixture-dir synthetic_fixtures   # 使用 synthetic.py 生成的页面
+    ZHCW_API_URL=http://127.0.0.1:8765/port/client_json.php python main.py
+    ZHCW_API_URL=http://127.0.0.1:8765/port/client_json.php python main.py --game pl3 crawl
+    CMZJ_API_URL=http://127.0.0.1:8765 python zhaunjia.py
+"""
+import os
+import json
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from games import GAMES, DLT
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 接口 lotteryId -> 彩种代码（选择 zhcw_<彩种>_page{n}.json）
+LOTTERY_GAMES = {game.lottery_id: key for key, game in GAMES.items()}
+
+# 专家接口响应的 Last-Modified
+LAST_MODIFIED = "Wed, 09 Jul 2025 12:00:00 GMT"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """开奖接口按 lotteryId 与 pageNum 返回 fixtures/zhcw_<彩种>_page{n}.json（带 callback 时包装为 JSONP，
+    未知 lotteryId 返回错误码）；
+    专家接口以 fixtures/cmzj_expert.json 为模板返回对应 expertId 的数据，
+    推荐接口返回 fixtures/cmzj_picks.json"""
+
+    fixture_dir = FIXTURE_DIR
+
+    # 专家ID -> 在成功响应前先返回的 503 次数（用于验证退避重试）
+    expert_failures = {}
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+
+        if parsed.path == "/port/client_json.php":
+            self.serve_draw_page(query)
+        elif parsed.path == "/expert/queryExpertById":
+            self.serve_expert(query)
+        elif parsed.path == "/expert/queryExpertPredict":
+            with open(os.path.join(self.fixture_dir, "cmzj_picks.json"), encoding="utf-8") as f:
+                self.send_body(f.read(), "application/json; charset=utf-8")
+        else:
+            self.send_error(404)
+
+    def serve_draw_page(self, query):
+        page = query.get("pageNum", ["1"])[0]
+        lottery_id = query.get("lotteryId", [DLT.lottery_id])[0]
+        game = LOTTERY_GAMES.get(lottery_id)
+        fixture = os.path.join(self.fixture_dir, f"zhcw_{game}_page{page}.json")
+        if game is None:
+            body = json.dumps({"resCode": "100001", "message": f"未知彩种: lotteryId={lottery_id}", "data": []},
+                              ensure_ascii=False)
+        elif not os.path.exists(fixture):
+            body = json.dumps({"resCode": "000000", "data": []}, ensure_ascii=False)
+        else:
+            with open(fixture, encoding="utf-8") as f:
+                body = f.read()
+
+        callback = query.get("callback", [""])[0]
+        if callback:
+            body = f"{callback}({body})"
+        self.send_body(body, "application/javascript; charset=utf-8")
+
+    def serve_expert(self, query):
+        expert_id = int(query.get("expertId", ["0"])[0])
+        if self.expert_failures.get(expert_id, 0) > 0:
+            self.expert_failures[expert_id] -= 1
+            self.send_error(503)
+            return
+
+        with open(os.path.join(self.fixture_dir, "cmzj_expert.json"), encoding="utf-8") as f:
+            payload = json.load(f)
+        payload["data"]["expertId"] = expert_id
+        payload["data"]["name"] = f"{payload['data']['name']}{expert_id % 100}"
+        body = json.dumps(payload, ensure_ascii=False)
+
+        # 支持 ETag 条件请求
+        etag = '"' + hashlib.md5(body.encode("utf-8")).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_body(body, "application/json; charset=utf-8", {"ETag": etag, "Last-Modified": LAST_MODIFIED})
+
+    def send_body(self, body, content_type, extra_headers=None):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, handler=StubHandler):
+    """在后台线程启动桩服务器，返回 (server, 开奖接口 URL)；专家接口根地址为 http://127.0.0.1:端口"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/port/client_json.php"
+    return server, base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="中彩网开奖接口本地桩服务器")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixture-dir", default=FIXTURE_DIR, help="fixtures 目录（例如 synthetic.py 生成的页面）")
+    args = parser.parse_args()
+
+    StubHandler.fixture_dir = args.fixture_dir
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StubHandler)
+    print(f"[启动] 桩服务器已启动: http://127.0.0.1:{args.port}/port/client_json.php")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,175 @@
+"""合成开奖历史：按彩种号码规则生成任意期数的合法开奖数据，并可保存为开奖页面 HTML / 接口 JSON 夹具
+
+- 号码：号码互不相同的区每期不放回抽取后升序排列，按位开奖的区每位独立抽取；
+- 期号：从 1 起连续递增，按彩种期号位数补零（期数超过位数上限时不再满足期号格式校验）；
+- 开奖日期：截至 end_date 按彩种开奖日向前排列；期数超过 CALENDAR_START 以来的开奖日数时循环使用这段日期
+  （pandas 只能表示 1677 年以后的日期）；
+- 销售额：基数 + 线性趋势 + 开奖日差异 + 噪声（取整到元）；奖池为正的随机游走。
+
+保存的页面与中彩网格式一致（zhcw_<彩种>_page<N>.html / .json，每页 30 期，期号降序），
+可由 table_parser / http_crawler 解析，也可用 stub_server.py --fixture-dir 提供给爬虫（按 lotteryId 选择彩种）。
+
+用法:
+    python synthetic.py --draws 10000 --out synthetic_fixtures
+    python synthetic.py --draws 1000 --game ssq --pages 0 --out synthetic_fixtures   # 保存全部页面
+"""
+import os
+import json
+import math
+import argparse
+import numpy as np
+from draw_matrix import DrawArrays
+from games import GAMES, DLT, WEEKDAY_NAMES, get_game
+
+# 最新一期的开奖日期（早于销售额预测的截止日期）
+DEFAULT_END_DATE = "2025-06-30"
+
+# 开奖日期序列的起点
+CALENDAR_START = "1700-01-01"
+
+# 每页期数（与开奖页面及接口一致）
+PAGE_SIZE = 30
+
+# 每批生成的期数（号码区抽样的随机数矩阵按批生成，限制内存占用）
+CHUNK_SIZE = 100_000
+
+
+def draw_numbers(rng, zone, n):
+    """按号码区规则随机生成 n 期号码，返回 n×pick 的 uint8 矩阵"""
+    if not zone.distinct:
+        return rng.integers(zone.low, zone.high + 1, size=(n, zone.pick)).astype(np.uint8)
+    numbers = np.empty((n, zone.pick), dtype=np.uint8)
+    for start in range(0, n, CHUNK_SIZE):
+        keys = rng.random((min(CHUNK_SIZE, n - start), zone.size), dtype=np.float32)
+        # 每行随机键最小的 pick 个位置即为一次不放回抽样
+        picks = np.argpartition(keys, zone.pick - 1, axis=1)[:, :zone.pick]
+        numbers[start:start + len(keys)] = np.sort(picks, axis=1) + zone.low
+    return numbers
+
+
+def draw_calendar(n, game=DLT, end_date=DEFAULT_END_DATE):
+    """截至 end_date 的最近 n 个开奖日（升序）；不够时循环使用 CALENDAR_START 以来的开奖日"""
+    game = get_game(game)
+    days = np.arange(np.datetime64(CALENDAR_START, 'D'), np.datetime64(end_date, 'D') + 1)
+    weekday = (days.astype(np.int64) + 3) % 7
+    calendar = days[np.isin(weekday, game.draw_weekdays)]
+    return calendar[(np.arange(n) + len(calendar) - n) % len(calendar)]
+
+
+def synthetic_draws(n, seed=0, game=DLT, end_date=DEFAULT_END_DATE):
+    """生成 n 期合成开奖数据（DrawArrays，按期号升序）"""
+    game = get_game(game)
+    rng = np.random.default_rng(seed)
+    dates = draw_calendar(n, game, end_date)
+
+    # 销售额：3 亿基数，全程上升 20%，各开奖日相差 2%，噪声 5%
+    base = 3e8
+    weekday = (dates.astype(np.int64) + 3) % 7
+    days = len(game.draw_weekdays)
+    day_effect = np.zeros(7)
+    day_effect[list(game.draw_weekdays)] = 0.02 * (np.arange(days) - (days - 1) / 2)
+    sales = base * (1 + 0.2 * np.arange(n) / max(n, 1) + day_effect[weekday] + rng.normal(0, 0.05, n))
+    prize_pool = np.abs(8e8 + np.cumsum(rng.normal(0, 3e7, n)))
+
+    back = game.back
+    return DrawArrays(
+        issue=np.arange(1, n + 1),
+        date=dates,
+        front=draw_numbers(rng, game.front, n),
+        back=draw_numbers(rng, back, n) if back else np.zeros((n, 0), dtype=np.uint8),
+        sales=np.rint(np.maximum(sales, 0)),
+        prize_pool=np.round(prize_pool, 2),
+        game=game.key,
+    )
+
+
+def page_count(draws, page_size=PAGE_SIZE):
+    """按 page_size 分页后的页数"""
+    return math.ceil(len(draws) / page_size)
+
+
+def page_draws(draws, page_num, page_size=PAGE_SIZE):
+    """第 page_num 页（从 1 开始，期号降序）的各期，返回 [(期号, 日期, 星期, [各区号码], 销售额, 奖池), ...]"""
+    game = get_game(draws.game)
+    end = len(draws) - (page_num - 1) * page_size
+    index = np.arange(end - 1, max(end - page_size, 0) - 1, -1)
+    weekday = draws.weekday()
+    zones = [draws.front, draws.back][:len(game.zones)]
+    return [(f"{draws.issue[i]:0{game.issue_digits}d}", str(draws.date[i]), int(weekday[i]),
+             [matrix[i].tolist() for matrix in zones], float(draws.sales[i]), float(draws.prize_pool[i]))
+            for i in index.tolist()]
+
+
+def render_html_page(draws, page_num, page_size=PAGE_SIZE):
+    """渲染开奖页面表格（列布局按彩种：号码区所在列、销售额与奖池列，其余列填 0）"""
+    game = get_game(draws.game)
+    rows = []
+    for issue, date, weekday, numbers, sales, prize_pool in page_draws(draws, page_num, page_size):
+        cells = ["0"] * game.min_cells
+        cells[0] = issue
+        cells[1] = f"{date}（{WEEKDAY_NAMES[weekday][-1]}）"
+        for zone in game.zones:
+            cells[zone.column] = ""
+        for zone, values in zip(game.zones, numbers):
+            cells[zone.column] += "".join(f'<span class="{zone.css_class}">{n:02d}</span>' for n in values)
+        cells[game.sales_column] = f"{sales:,.0f}"
+        cells[game.prize_pool_column] = f"{prize_pool:,.2f}"
+        rows.append("      <tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>")
+    return ("<html>\n<body>\n<div class=\"flcp\">\n  <table>\n    <tbody>\n" + "\n".join(rows)
+            + "\n    </tbody>\n  </table>\n</div>\n</body>\n</html>\n")
+
+
+def render_json_page(draws, page_num, page_size=PAGE_SIZE):
+    """渲染开奖数据接口的一页响应（JSON 文本，与 fixtures/zhcw_dlt_page1.json 结构一致）"""
+    game = get_game(draws.game)
+    records = []
+    for issue, date, weekday, numbers, sales, prize_pool in page_draws(draws, page_num, page_size):
+        record = {"issue": issue, "openTime": date, "week": f"星期{WEEKDAY_NAMES[weekday][-1]}"}
+        for zone, values in zip(game.zones, numbers):
+            record[zone.api_field] = " ".join(f"{n:02d}" for n in values)
+        record.update({"saleMoney": f"{sales:.0f}", "prizePoolMoney": f"{prize_pool:.2f}", "winnerDetails": []})
+        records.append(record)
+    return json.dumps({
+        "resCode": "000000",
+        "message": "查询成功",
+        "total": str(len(draws)),
+        "pages": str(page_count(draws, page_size)),
+        "pageNum": str(page_num),
+        "pageSize": str(page_size),
+        "data": records,
+    }, ensure_ascii=False, indent=1)
+
+
+def save_fixtures(draws, out_dir, pages=4, page_size=PAGE_SIZE):
+    """保存合成数据（.npz 与 .csv）及前 pages 页开奖页面 HTML / 接口 JSON（pages=0 为全部页），返回写出的文件列表"""
+    game = get_game(draws.game)
+    os.makedirs(out_dir, exist_ok=True)
+    prefix = os.path.join(out_dir, f"{game.key}_synthetic_{len(draws)}")
+    draws.save(f"{prefix}.npz")
+    draws.to_dataframe().to_csv(f"{prefix}.csv", index=False, encoding='utf_8_sig')
+    paths = [f"{prefix}.npz", f"{prefix}.csv"]
+
+    total = page_count(draws, page_size)
+    for page_num in range(1, (min(pages, total) if pages else total) + 1):
+        for ext, render in (("html", render_html_page), ("json", render_json_page)):
+            path = os.path.join(out_dir, f"zhcw_{game.key}_page{page_num}.{ext}")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(render(draws, page_num, page_size))
+            paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="生成合成开奖历史与页面夹具")
+    parser.add_argument("--draws", type=int, default=10000, help="期数")
+    parser.add_argument("--game", choices=list(GAMES), default="dlt", help="彩种")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--end-date", default=DEFAULT_END_DATE, help="最新一期的开奖日期")
+    parser.add_argument("--pages", type=int, default=4, help="保存的页面数（0 为全部）")
+    parser.add_argument("--out", default="synthetic_fixtures", help="输出目录")
+    args = parser.parse_args()
+
+    draws = synthetic_draws(args.draws, args.seed, args.game, args.end_date)
+    paths = save_fixtures(draws, args.out, args.pages)
+    print(f"[数据] 已生成 {len(draws)} 期合成数据（{draws.date[0]} 至 {draws.date[-1]}），"
+          f"写出 {len(paths)} 个文件到: {args.out}")
@@ -0,0 +1,60 @@
+from lxml import html as lxml_html
+from http_crawler import parse_amount
+from games import DLT, get_game
+
+# 开奖表格行的 XPath（与 Selenium 路径中使用的一致）
+ROW_XPATH = '//div[@class="flcp"]//table//tbody//tr'
+
+
+def iter_draw_table(page_html, game=DLT):
+    """按彩种的列布局逐行解析开奖表格 HTML，产出原始行（文本，不做类型转换）
+
+    列数不足的行同样产出（带“列数”与“原始文本”），由 draw_stream 的校验阶段隔离并记录原因。
+    列布局未核实的彩种（game.table_verified 为 False）只适用于 synthetic.py 生成的页面。
+    """
+    game = get_game(game)
+    root = lxml_html.fromstring(page_html)
+
+    for tr in root.xpath(ROW_XPATH):
+        cells = tr.xpath('./td')
+        if len(cells) < game.min_cells:  # 数据列不足，交给校验阶段处理
+            yield {
+                "期号": cells[0].text_content().strip() if cells else "",
+                "列数": len(cells),
+                "原始文本": " ".join(tr.text_content().split()),
+            }
+            continue
+
+        # 清理日期文本（移除星期信息）
+        date_str = cells[1].text_content().strip().split("（")[0].strip()
+
+        # find_class 按 class 匹配，等价于 By.CLASS_NAME
+        numbers = [
+            ','.join(span.text_content().strip() for span in cells[zone.column].find_class(zone.css_class))
+            for zone in game.zones
+        ]
+
+        yield {
+            "期号": cells[0].text_content().strip(),
+            "开奖日期": date_str,
+            "前区号码": numbers[0],
+            "后区号码": numbers[1] if len(numbers) > 1 else "",
+            "总销售额(元)": cells[game.sales_column].text_content().strip(),
+            "奖池奖金(元)": cells[game.prize_pool_column].text_content().strip(),  # 大乐透奖池奖金在第14列
+            "列数": len(cells),
+        }
+
+
+def parse_draw_table(page_html, game=DLT):
+    """一次性解析开奖表格 HTML（整页源码或 flcp 片段均可），返回行字典列表（跳过列数不足的行）"""
+    return [
+        {
+            "期号": row["期号"],
+            "开奖日期": row["开奖日期"],
+            "前区号码": row["前区号码"],
+            "后区号码": row["后区号码"],
+            "总销售额(元)": parse_amount(row["总销售额(元)"]),
+            "奖池奖金(元)": parse_amount(row["奖池奖金(元)"]),
+        }
+        for row in iter_draw_table(page_html, game) if "开奖日期" in row
+    ]